@@ -3,7 +3,9 @@ import subprocess
 import time
 import random
 import psycopg
+from psycopg.types.json import Jsonb
 import config
+import plan_capture
 
 # Parameterbereiche
 H_sizes = [4096, 16384, 65536]
@@ -16,7 +18,7 @@ def measure_conversion(command_args):
     subprocess.run(command_args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     return time.time() - start_time
 
-def measure_throughput(query, params_generator, duration):
+def measure_throughput(query, params_generator, duration, cell=None):
     """
     Führt für die gegebene Dauer (in Sekunden) möglichst viele Abfragen aus und
     berechnet den Durchsatz (Queries pro Sekunde).
@@ -25,6 +27,8 @@ def measure_throughput(query, params_generator, duration):
     :param params_generator: Funktion, die bei jedem Aufruf ein Parameter-Tupel zurückgibt.
     :param duration: Messdauer in Sekunden.
     :param conn_params: Dictionary mit Verbindungsparametern für psycopg.connect.
+    :param cell: (|H|, |A|, S, Layout, Typ); wenn gesetzt, werden für eine Stichprobe der Queries
+                 die Pläne erfasst und mit dem Durchsatz gespeichert (siehe plan_capture.py).
     """
     conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
     conn.autocommit = True
@@ -37,14 +41,30 @@ def measure_throughput(query, params_generator, duration):
             _ = cur.fetchall()  # Ergebnisse holen, um die Query vollständig auszuführen
             count += 1
     conn.close()
-    return count / duration
+    qps = count / duration
+    if cell is not None:
+        samples = [(query, params_generator()) for _ in range(plan_capture.SAMPLE_SIZE)]
+        plan_capture.record_cell(cell, samples, qps)
+    return qps
+
+def storage_size(tables):
+    """Summe von pg_total_relation_size (inkl. Indizes) der angegebenen Tabellen in MB."""
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        size = 0
+        for table in tables:
+            cur.execute("SELECT pg_total_relation_size(%s);", (table.lower(),))
+            size += cur.fetchone()[0]
+    conn.close()
+    return size / (1024 * 1024)
 
 def get_random_oid(H):
     return random.randint(1, H)
 
 def main():
     # Kopfzeile der Ergebnistabelle
-    print(f"{'|H|':>5}  {'|A|':>4}  {'S':>6}  {'Layout':>6}  {'Type':>5}  {'Throughput(Q/s)':>16}  {'ConvTime(s)':>11}")
+    print(f"{'|H|':>5}  {'|A|':>4}  {'S':>6}  {'Layout':>6}  {'Type':>5}  {'Throughput(Q/s)':>16}  {'ConvTime(s)':>11}  {'Size(MB)':>9}")
 
     for H in H_sizes:
         for A in A_counts:
@@ -57,13 +77,15 @@ def main():
 
                 # 2. Umwandlung H -> V_all (h2v) und Messung der Dauer
                 conv_time_h2v = measure_conversion(["python", "phase2.py", "h2v", "H"])
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'conv':>5}  {'-':>16}  {conv_time_h2v:11.2f}")
+                size_v = storage_size(["V_string", "V_integer"])
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'conv':>5}  {'-':>16}  {conv_time_h2v:11.2f}  {size_v:9.2f}")
 
                 # 3. Query-Durchsatzmessung auf V_all, Query Typ i: SELECT * FROM V_all WHERE oid = ?
                 def params_gen_v_i():
                     return (get_random_oid(H),)
-                qps_v_i = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 1.0)
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'i':>5}  {qps_v_i:16.1f}  {'-':>11}")
+                qps_v_i = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 1.0,
+                                             cell=(H, A, S, "V_ALL", "i"))
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'i':>5}  {qps_v_i:16.1f}  {'-':>11}  {'-':>9}")
 
                 # 4. Query-Durchsatzmessung auf V_all, Query Typ ii: SELECT oid FROM V_all WHERE attribute = ? AND value = ?
                 # Hier holen wir zunächst 100 zufällige (attribute, value)-Paare aus V_all
@@ -79,18 +101,21 @@ def main():
                     sample_pairs_v = [(f"A{random.randint(1, A)}", None) for _ in range(100)]
                 def params_gen_v_ii():
                     return random.choice(sample_pairs_v)
-                qps_v_ii = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 1.0)
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'ii':>5}  {qps_v_ii:16.1f}  {'-':>11}")
+                qps_v_ii = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 1.0,
+                                              cell=(H, A, S, "V_ALL", "ii"))
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'V_ALL':>6}  {'ii':>5}  {qps_v_ii:16.1f}  {'-':>11}  {'-':>9}")
 
                 # 5. Umwandlung V_all -> H (v2h) und Messung der Dauer
                 conv_time_v2h = measure_conversion(["python", "phase2.py", "v2h", "V_all"])
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'conv':>5}  {'-':>16}  {conv_time_v2h:11.2f}")
+                size_h = storage_size(["H"])
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'conv':>5}  {'-':>16}  {conv_time_v2h:11.2f}  {size_h:9.2f}")
 
                 # 6. Query-Durchsatzmessung auf H, Query Typ i: SELECT * FROM H WHERE oid = ?
                 def params_gen_h_i():
                     return (get_random_oid(H),)
-                qps_h_i = measure_throughput("SELECT * FROM H WHERE oid = %s", params_gen_h_i, 1.0)
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'i':>5}  {qps_h_i:16.1f}  {'-':>11}")
+                qps_h_i = measure_throughput("SELECT * FROM H WHERE oid = %s", params_gen_h_i, 1.0,
+                                             cell=(H, A, S, "H", "i"))
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'i':>5}  {qps_h_i:16.1f}  {'-':>11}  {'-':>9}")
 
                 # 7. Query-Durchsatzmessung auf H, Query Typ ii: SELECT oid FROM H
                 # Für H wird das Attribut direkt als Spaltenname verwendet.
@@ -129,7 +154,39 @@ def main():
                     conn.close()
                     return count / 1.0
                 qps_h_ii = measure_H()
-                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'ii':>5}  {qps_h_ii:16.1f}  {'-':>11}")
+                samples_h = []
+                for attr, val in random.sample(sample_pairs_h, min(plan_capture.SAMPLE_SIZE, len(sample_pairs_h))):
+                    samples_h.append((f"SELECT oid FROM H WHERE {attr} = %s", (val,)))
+                plan_capture.record_cell((H, A, S, "H", "ii"), samples_h, qps_h_ii)
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'H':>6}  {'ii':>5}  {qps_h_ii:16.1f}  {'-':>11}  {'-':>9}")
+
+                # 8. Umwandlung H -> J (h2j, JSONB-Dokument pro oid) und Messung der Dauer
+                conv_time_h2j = measure_conversion(["python", "json_layout.py", "h2j", "H"])
+                size_j = storage_size(["J"])
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'J':>6}  {'conv':>5}  {'-':>16}  {conv_time_h2j:11.2f}  {size_j:9.2f}")
+
+                # 9. Query-Durchsatzmessung auf J, Query Typ i: SELECT * FROM J WHERE oid = ?
+                def params_gen_j_i():
+                    return (get_random_oid(H),)
+                qps_j_i = measure_throughput("SELECT * FROM J WHERE oid = %s", params_gen_j_i, 1.0,
+                                             cell=(H, A, S, "J", "i"))
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'J':>6}  {'i':>5}  {qps_j_i:16.1f}  {'-':>11}  {'-':>9}")
+
+                # 10. Query-Durchsatzmessung auf J, Query Typ ii: SELECT oid FROM J WHERE doc @> {attribute: value}
+                conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute("SELECT key, value FROM J, jsonb_each(doc) ORDER BY RANDOM() LIMIT 100")
+                    samples = cur.fetchall()
+                conn.close()
+                sample_docs_j = [Jsonb({key: value}) for key, value in samples]
+                if not sample_docs_j:
+                    sample_docs_j = [Jsonb({f"a{random.randint(1, A)}": None})]
+                def params_gen_j_ii():
+                    return (random.choice(sample_docs_j),)
+                qps_j_ii = measure_throughput("SELECT oid FROM J WHERE doc @> %s", params_gen_j_ii, 1.0,
+                                              cell=(H, A, S, "J", "ii"))
+                print(f"{H:5d}  {A:4d}  {S:<6.3f}  {'J':>6}  {'ii':>5}  {qps_j_ii:16.1f}  {'-':>11}  {'-':>9}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,115 @@
+import subprocess
+import threading
+import time
+import random
+import psycopg
+import config
+
+# Parameterbereiche
+H_sizes = [4096, 16384, 65536]
+A_counts = [5, 50, 100]
+sparsities = [0.5, 0.75, 0.875]
+
+# Umbaumodi von phase3.py: klassisch (DROP + Neuaufbau) und Aufbau unter Schattennamen mit Tausch
+rebuild_modes = ["h2v", "h2v_swap"]
+
+def reader(stop_event, query, params_generator, latencies, errors):
+    """
+    Führt bis zum Setzen von stop_event fortlaufend die Query aus und sammelt
+    die Latenzen erfolgreicher Aufrufe sowie die Anzahl fehlgeschlagener Aufrufe.
+    """
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        while not stop_event.is_set():
+            params = params_generator()
+            start = time.perf_counter()
+            try:
+                cur.execute(query, params)
+                _ = cur.fetchall()
+                latencies.append(time.perf_counter() - start)
+            except psycopg.Error:
+                # V_all fehlt während des klassischen Umbaus -> Fehler zählen, kurz warten
+                errors.append(time.perf_counter() - start)
+                time.sleep(0.001)
+    conn.close()
+
+def percentile(values, p):
+    """Einfaches Perzentil (Nearest-Rank) ohne zusätzliche Abhängigkeiten."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+def measure_during_rebuild(mode, table_name, params_gen_qi, params_gen_qii, pause=1.0):
+    """
+    Startet je einen Leser für q_i und q_ii, führt währenddessen den Umbau
+    (phase3.py <mode>) aus und liefert Umbauzeit sowie Latenzen/Fehler je Querytyp.
+    """
+    stop_event = threading.Event()
+    stats = {
+        "q_i": {"latencies": [], "errors": []},
+        "q_ii": {"latencies": [], "errors": []},
+    }
+    threads = [
+        threading.Thread(target=reader, args=(stop_event, "SELECT * FROM q_i(CAST(%s AS integer))",
+                                              params_gen_qi, stats["q_i"]["latencies"], stats["q_i"]["errors"])),
+        threading.Thread(target=reader, args=(stop_event, "SELECT * FROM q_ii(%s, %s)",
+                                              params_gen_qii, stats["q_ii"]["latencies"], stats["q_ii"]["errors"])),
+    ]
+    for t in threads:
+        t.start()
+
+    time.sleep(pause)
+    start_time = time.perf_counter()
+    subprocess.run(["python", "phase3.py", mode, table_name], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    rebuild_time = time.perf_counter() - start_time
+    time.sleep(pause)
+
+    stop_event.set()
+    for t in threads:
+        t.join()
+    return rebuild_time, stats
+
+def main():
+    print(f"{'|H|':>5}  {'|A|':>4}  {'S':>6}  {'Mode':>8}  {'Type':>5}  {'Queries':>8}  {'Errors':>6}  "
+          f"{'p50(ms)':>8}  {'p99(ms)':>8}  {'max(ms)':>8}  {'Rebuild(s)':>10}")
+    for H in H_sizes:
+        for A in A_counts:
+            for S in sparsities:
+                # 1. Tabelle H erzeugen, V_all aufbauen und API-Funktionen anlegen
+                subprocess.run(["python", "generate.py", str(H), str(S), str(A)],
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                subprocess.run(["python", "phase3.py", "h2v", "H"],
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                subprocess.run(["python", "create_api.py"],
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+                # 2. Zufällige (attribute, value)-Paare für q_ii aus V_all holen
+                conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute("SELECT attribute, value FROM V_all WHERE attribute IS NOT NULL ORDER BY RANDOM() LIMIT 100")
+                    sample_pairs = cur.fetchall()
+                conn.close()
+                if not sample_pairs:
+                    sample_pairs = [(f"a{random.randint(1, A)}", None)]
+
+                def params_gen_qi():
+                    return (random.randint(1, H),)
+                def params_gen_qii():
+                    return random.choice(sample_pairs)
+
+                # 3. Leserlatenz während des Umbaus je Modus messen
+                for mode in rebuild_modes:
+                    rebuild_time, stats = measure_during_rebuild(mode, "H", params_gen_qi, params_gen_qii)
+                    for qtype, s in stats.items():
+                        lat_ms = [x * 1000 for x in s["latencies"]]
+                        print(f"{H:5d}  {A:4d}  {S:<6.3f}  {mode:>8}  {qtype:>5}  {len(lat_ms):8d}  {len(s['errors']):6d}  "
+                              f"{percentile(lat_ms, 50):8.2f}  {percentile(lat_ms, 99):8.2f}  "
+                              f"{max(lat_ms) if lat_ms else float('nan'):8.2f}  {rebuild_time:10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,11 @@ import subprocess
 import time
 import random
 import psycopg
+from psycopg.types.json import Jsonb
 import config
+import refresh
+import phase3
+import plan_capture
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -10,6 +14,8 @@ import matplotlib.pyplot as plt
 H_sizes = [4096, 16384, 65536]
 A_counts = [5, 50, 100]
 sparsities = [0.5, 0.75, 0.875]
+# Anteil der Zeilen von H, die vor der Refresh-Messung geändert werden
+change_fraction = 0.01
 
 # Ergebnisse werden hier gesammelt
 results = []
@@ -20,10 +26,12 @@ def measure_conversion(command_args):
     subprocess.run(command_args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     return time.perf_counter() - start_time
 
-def measure_throughput(query, params_generator, duration):
+def measure_throughput(query, params_generator, duration, cell=None):
     """
     Führt für die gegebene Dauer (in Sekunden) möglichst viele Abfragen aus und
     berechnet den Durchsatz (Queries pro Sekunde).
+    Mit cell = (|H|, |A|, S, Layout, Typ) werden wie in benchmark.py die Pläne einer
+    Stichprobe erfasst (plan_capture.py).
     """
     conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
     conn.autocommit = True
@@ -36,11 +44,61 @@ def measure_throughput(query, params_generator, duration):
             _ = cur.fetchall()  # Ergebnisse holen, um die Query vollständig auszuführen
             count += 1
     conn.close()
-    return count / duration
+    qps = count / duration
+    if cell is not None:
+        samples = [(query, params_generator()) for _ in range(plan_capture.SAMPLE_SIZE)]
+        plan_capture.record_cell(cell, samples, qps)
+    return qps
+
+def h_view_samples(sample_pairs_h):
+    """(query, params)-Paare für Query Typ ii auf H_view, die Spalte steht in der Query."""
+    pairs = random.sample(sample_pairs_h, min(plan_capture.SAMPLE_SIZE, len(sample_pairs_h)))
+    return [(f"SELECT oid FROM H_view WHERE {attr} = %s", (val,)) for attr, val in pairs]
 
 def get_random_oid(H):
     return random.randint(1, H)
 
+def apply_changes(H, fraction=change_fraction):
+    """
+    Ändert einen Anteil der Zeilen von H (Integer +1, Text mit angehängtem '*') und überträgt
+    sie per phase3.sync_vertical in V_string/V_integer, damit der anschließende REFRESH
+    echte Änderungen einarbeiten muss. Rückgabe: (Spalten, ursprüngliche Zeilen) für restore_rows.
+    """
+    oids = random.sample(range(1, H + 1), max(1, int(H * fraction)))
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    with conn.cursor() as cur:
+        cur.execute("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'h' AND column_name <> 'oid';")
+        column_types = cur.fetchall()
+        columns = [name for name, _ in column_types]
+        cur.execute(f"SELECT {', '.join(['oid'] + columns)} FROM H WHERE oid = ANY(%s);", (oids,))
+        original = cur.fetchall()
+        assignments = [f"{name} = {name} + 1" if data_type == "integer" else f"{name} = {name} || '*'"
+                       for name, data_type in column_types]
+        if assignments:
+            cur.execute(f"UPDATE H SET {', '.join(assignments)} WHERE oid = ANY(%s);", (oids,))
+        phase3.sync_vertical(cur, "H", oids)
+    conn.commit()
+    conn.close()
+    return columns, original
+
+def restore_rows(columns, original):
+    """
+    Macht apply_changes rückgängig (H, V_string/V_integer und die Sichten), damit die folgenden
+    Messungen wieder mit den vorher gezogenen Stichproben übereinstimmen.
+    """
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    with conn.cursor() as cur:
+        if columns:
+            assignments = ", ".join(f"{name} = %s" for name in columns)
+            cur.executemany(f"UPDATE H SET {assignments} WHERE oid = %s;",
+                            [tuple(row[1:]) + (row[0],) for row in original])
+        phase3.sync_vertical(cur, "H", [row[0] for row in original])
+    conn.commit()
+    conn.close()
+    conn = refresh.connect()
+    refresh.refresh_all(conn, concurrently=True)
+    conn.close()
+
 def main():
     print(f"{'|H|':>5}  {'|A|':>4}  {'S':>6}  {'Layout':>8}  {'Type':>5}  {'Throughput(Q/s)':>16}  {'ConvTime(s)':>11}")
     for H in H_sizes:
@@ -67,7 +125,8 @@ def main():
                 # 3. Query-Durchsatzmessung auf V_all, Query Typ i: SELECT * FROM V_all WHERE oid = ?
                 def params_gen_v_i():
                     return (get_random_oid(H),)
-                qps_v_i_no_idx = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 10.0)
+                qps_v_i_no_idx = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 10.0,
+                                        cell=(H, A, S, "V_ALL/no", "i"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -91,7 +150,8 @@ def main():
                     sample_pairs_v = [(f"A{random.randint(1, A)}", None) for _ in range(100)]
                 def params_gen_v_ii():
                     return random.choice(sample_pairs_v)
-                qps_v_i_no_idx = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 10.0)
+                qps_v_i_no_idx = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 10.0,
+                                        cell=(H, A, S, "V_ALL/no", "ii"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -117,7 +177,8 @@ def main():
                 # 6. Query-Durchsatzmessung auf H_view, Query Typ i: SELECT * FROM H_view WHERE oid = ?
                 def params_gen_h_i():
                     return (get_random_oid(H),)
-                qps_h_i_no_idx = measure_throughput("SELECT * FROM H_view WHERE oid = %s", params_gen_h_i, 10.0)
+                qps_h_i_no_idx = measure_throughput("SELECT * FROM H_view WHERE oid = %s", params_gen_h_i, 10.0,
+                                        cell=(H, A, S, "H_VIEW/no", "i"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -161,6 +222,7 @@ def main():
                     conn.close()
                     return count / 10.0
                 qps_h_ii_no_idx = measure_h_view_typeii()
+                plan_capture.record_cell((H, A, S, "H_VIEW/no", "ii"), h_view_samples(sample_pairs_h), qps_h_ii_no_idx)
                 results.append({
                     "H": H,
                     "A": A,
@@ -185,7 +247,8 @@ def main():
                 })
 
                 # 3. Query-Durchsatzmessung auf V_all, Query Typ i: SELECT * FROM V_all WHERE oid = ?
-                qps_v_i_idx = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 10.0)
+                qps_v_i_idx = measure_throughput("SELECT * FROM V_all WHERE oid = %s", params_gen_v_i, 10.0,
+                                        cell=(H, A, S, "V_ALL/yes", "i"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -207,7 +270,8 @@ def main():
                     sample_pairs_v = samples
                 else:
                     sample_pairs_v = [(f"A{random.randint(1, A)}", None) for _ in range(100)]
-                qps_v_ii_idx = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 10.0)
+                qps_v_ii_idx = measure_throughput("SELECT oid FROM V_all WHERE attribute = %s AND value = %s", params_gen_v_ii, 10.0,
+                                        cell=(H, A, S, "V_ALL/yes", "ii"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -230,8 +294,28 @@ def main():
                     "Throughput": conv_time_v2h,
                 })
 
+                # 5b. Kosten von REFRESH MATERIALIZED VIEW CONCURRENTLY für V_all und H_VIEW,
+                # nachdem ein Teil der Zeilen von H geändert und in die Basistabellen übertragen wurde
+                columns, original = apply_changes(H)
+                conn = refresh.connect()
+                refresh_times = refresh.refresh_all(conn, concurrently=True)
+                conn.close()
+                # Änderungen zurücknehmen (nicht gemessen), H_VIEW entspricht wieder den Stichproben
+                restore_rows(columns, original)
+                for view_name, refresh_time in refresh_times.items():
+                    results.append({
+                        "H": H,
+                        "A": A,
+                        "S": S,
+                        "Layout": view_name.upper(),
+                        "Index": "yes",
+                        "Type": "refresh",
+                        "Throughput": refresh_time,
+                    })
+
                 # 6. Query-Durchsatzmessung auf H_view, Query Typ i: SELECT * FROM H_view WHERE oid = ?
-                qps_h_i_idx = measure_throughput("SELECT * FROM H_view WHERE oid = %s", params_gen_h_i, 10.0)
+                qps_h_i_idx = measure_throughput("SELECT * FROM H_view WHERE oid = %s", params_gen_h_i, 10.0,
+                                        cell=(H, A, S, "H_VIEW/yes", "i"))
                 results.append({
                     "H": H,
                     "A": A,
@@ -260,6 +344,7 @@ def main():
                 if not sample_pairs_h:
                     sample_pairs_h = [(f"A{random.randint(1, A)}", None) for _ in range(100)]
                 qps_h_ii_idx = measure_h_view_typeii()
+                plan_capture.record_cell((H, A, S, "H_VIEW/yes", "ii"), h_view_samples(sample_pairs_h), qps_h_ii_idx)
                 results.append({
                     "H": H,
                     "A": A,
@@ -271,6 +356,55 @@ def main():
                     "ConvTime": None
                 })
 
+                # 8. Umwandlung H -> J (h2j, JSONB-Dokument pro oid, GIN-Index) und Messung der Dauer
+                conv_time_h2j = measure_conversion(["python", "json_layout.py", "h2j", "H"])
+                results.append({
+                    "H": H,
+                    "A": A,
+                    "S": S,
+                    "Layout": "J",
+                    "Index": "yes",
+                    "Type": "conv",
+                    "Throughput": conv_time_h2j,
+                })
+
+                # 9. Query-Durchsatzmessung auf J, Query Typ i: SELECT * FROM J WHERE oid = ?
+                qps_j_i = measure_throughput("SELECT * FROM J WHERE oid = %s", params_gen_v_i, 10.0,
+                                        cell=(H, A, S, "J/yes", "i"))
+                results.append({
+                    "H": H,
+                    "A": A,
+                    "S": S,
+                    "Layout": "J",
+                    "Index": "yes",
+                    "Type": "i",
+                    "Throughput": qps_j_i,
+                })
+
+                # 10. Query-Durchsatzmessung auf J, Query Typ ii: SELECT oid FROM J WHERE doc @> {attribute: value}
+                conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute("SELECT key, value FROM J, jsonb_each(doc) ORDER BY RANDOM() LIMIT 100")
+                    samples = cur.fetchall()
+                conn.close()
+                sample_docs_j = [Jsonb({key: value}) for key, value in samples]
+                if not sample_docs_j:
+                    sample_docs_j = [Jsonb({f"a{random.randint(1, A)}": None})]
+                def params_gen_j_ii():
+                    return (random.choice(sample_docs_j),)
+                qps_j_ii = measure_throughput("SELECT oid FROM J WHERE doc @> %s", params_gen_j_ii, 10.0,
+                                        cell=(H, A, S, "J/yes", "ii"))
+                results.append({
+                    "H": H,
+                    "A": A,
+                    "S": S,
+                    "Layout": "J",
+                    "Index": "yes",
+                    "Type": "ii",
+                    "Throughput": qps_j_ii,
+                })
+
 
     # Erstelle einen Pandas DataFrame aus den gesammelten Ergebnissen
     df = pd.DataFrame(results)
@@ -290,12 +424,11 @@ def main():
                 ax = axes[i][j]
                 # Filtere Daten für aktuellen Querytyp, Attributanzahl und Sparsity
                 sub_df = df[(df['Type'] == qtype) & (df['A'] == A_val) & (df['S'] == S_val)]
-                for index_variant in ['yes', 'no']:
-                    variant_df = sub_df[sub_df['Index'] == index_variant]
-                    if not variant_df.empty:
-                        group = variant_df.groupby('H')['Throughput'].mean().reset_index()
-                        label = f"Index: {index_variant}"
-                        ax.plot(group['H'], group['Throughput'], marker='o', label=label)
+                # Eine Linie je Layout (V_ALL, H_VIEW, J) und Indexvariante
+                for (layout, index_variant), variant_df in sub_df.groupby(['Layout', 'Index']):
+                    group = variant_df.groupby('H')['Throughput'].mean().reset_index()
+                    label = f"{layout}, Index: {index_variant}"
+                    ax.plot(group['H'], group['Throughput'], marker='o', label=label)
                 ax.set_xlabel("Anzahl Tupel |H|")
                 ax.set_ylabel("Durchsatz (Q/s)")
                 ax.set_title(f"Query {qtype} - A={A_val}, S={S_val}")
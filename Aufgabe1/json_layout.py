@@ -0,0 +1,179 @@
+import psycopg
+import argparse
+import config
+
+# Horizontal zu JSONB (H2J) umwandeln: ein JSONB-Dokument pro oid, nur Nicht-NULL-Attribute.
+# Spalten, Reihenfolge und Datentypen von table_name werden in J_SCHEMA festgehalten, damit j2h
+# das Schema auch ohne die Quelltabelle und für Attribute wiederherstellt, die überall NULL sind.
+def h2j(table_name):
+    try:
+        conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+        cur = conn.cursor()
+
+        # JSONB-Tabelle löschen, falls sie existiert
+        cur.execute("DROP TABLE IF EXISTS J CASCADE;")
+        cur.execute("CREATE TABLE J (oid INTEGER PRIMARY KEY, doc JSONB NOT NULL);")
+        cur.execute("DROP TABLE IF EXISTS J_SCHEMA;")
+        cur.execute("CREATE TABLE J_SCHEMA (position INTEGER PRIMARY KEY, attribute TEXT NOT NULL, data_type TEXT NOT NULL);")
+
+        cur.execute("""
+            INSERT INTO J_SCHEMA (position, attribute, data_type)
+            SELECT ordinal_position, column_name, data_type
+            FROM information_schema.columns
+            WHERE table_name = %s AND table_schema = current_schema() AND column_name <> 'oid';
+        """, (table_name.lower(),))
+
+        # Zeile als JSON-Objekt, oid entfernen und NULL-Attribute weglassen.
+        # Integer-Spalten werden zu JSON-Zahlen, Text-Spalten zu JSON-Strings.
+        cur.execute(f"""
+            INSERT INTO J (oid, doc)
+            SELECT h.oid, jsonb_strip_nulls(to_jsonb(h) - 'oid')
+            FROM {table_name} h
+            ORDER BY h.oid;
+        """)
+
+        # GIN-Index für Enthaltensein-Anfragen (doc @> '{{"a1": 5}}')
+        cur.execute("CREATE INDEX idx_j_doc ON J USING GIN (doc jsonb_path_ops);")
+
+        print("\nH2J-Operator erfolgreich ausgeführt. Tabelle J wurde erstellt und befüllt, Schema in J_SCHEMA.")
+        print("GIN-Index (jsonb_path_ops) auf J wurde angelegt.")
+
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    except Exception as e:
+        print(f"Fehler bei der Ausführung des H2J-Operators: {e}")
+
+# JSONB zu Horizontal (J2H) umwandeln. Spalten und Typen kommen aus dem von h2j geschriebenen
+# <table_name>_SCHEMA, nicht aus den JSON-Schlüsseln: jsonb_strip_nulls entfernt Attribute,
+# die in jeder Zeile NULL sind, diese Spalten sollen in H_JVIEW trotzdem erscheinen.
+def j2h(table_name):
+    try:
+        conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+        cur = conn.cursor()
+
+        cur.execute("DROP MATERIALIZED VIEW IF EXISTS H_JVIEW CASCADE;")
+
+        # Attribute und deren Datentyp in der Spaltenreihenfolge der Quelltabelle von h2j
+        cur.execute(f"SELECT attribute, data_type FROM {table_name}_SCHEMA ORDER BY position;")
+        attributes = cur.fetchall()
+
+        # Dynamische Erstellung der SELECT-Abfrage für die Sicht
+        create_view_query = "CREATE MATERIALIZED VIEW H_JVIEW AS SELECT oid"
+        for attribute, data_type in attributes:
+            create_view_query += f", (doc->>'{attribute}')::{data_type} AS {attribute}"
+        create_view_query += f" FROM {table_name} ORDER BY oid;"
+
+        cur.execute(create_view_query)
+        cur.execute("CREATE UNIQUE INDEX idx_h_jview_oid ON H_JVIEW (oid);")
+
+        print("\nj2h-Operator erfolgreich ausgeführt. Sicht H_JVIEW wurde erstellt und Index angelegt.")
+
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    except Exception as e:
+        print(f"Fehler bei der Ausführung des J2H-Operators: {e}")
+
+# API-Funktionen q_i/q_ii auf der JSONB-Darstellung (analog zu create_api.py)
+def create_api_functions():
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    # API-Funktion: Abfrage per oid
+    sql_get_by_id = """
+    DROP FUNCTION IF EXISTS qj_i(integer) CASCADE;
+    CREATE OR REPLACE FUNCTION qj_i(search_oid integer)
+    RETURNS TABLE (oid integer, doc jsonb)
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        RETURN QUERY
+        SELECT j.oid, j.doc
+        FROM J j
+        WHERE j.oid = search_oid;
+    END;
+    $$;
+    """
+
+    # API-Funktion: Abfrage per Attributwert, über @> wird der GIN-Index genutzt
+    sql_get_by_attr_text = """
+    DROP FUNCTION IF EXISTS qj_ii(text, text) CASCADE;
+    CREATE OR REPLACE FUNCTION qj_ii(attr_name text, search_value text)
+    RETURNS TABLE (oid integer, doc jsonb)
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        RETURN QUERY
+        SELECT j.oid, j.doc
+        FROM J j
+        WHERE j.doc @> jsonb_build_object(attr_name, search_value);
+    END;
+    $$;
+    """
+
+    sql_get_by_attr_int = """
+    DROP FUNCTION IF EXISTS qj_ii(text, integer) CASCADE;
+    CREATE OR REPLACE FUNCTION qj_ii(attr_name text, search_value integer)
+    RETURNS TABLE (oid integer, doc jsonb)
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        RETURN QUERY
+        SELECT j.oid, j.doc
+        FROM J j
+        WHERE j.doc @> jsonb_build_object(attr_name, search_value);
+    END;
+    $$;
+    """
+
+    try:
+        cur.execute(sql_get_by_id)
+        print("Funktion qj_i(search_oid INTEGER) wurde erstellt.")
+        cur.execute(sql_get_by_attr_text)
+        print("Funktion qj_ii(attr_name TEXT, search_value TEXT) wurde erstellt.")
+        cur.execute(sql_get_by_attr_int)
+        print("Funktion qj_ii(attr_name TEXT, search_value INTEGER) wurde erstellt.")
+    except Exception as e:
+        print("Fehler beim Erstellen der API-Funktionen: " + str(e))
+
+    cur.close()
+    conn.close()
+
+# Überprüft, ob H und H_JVIEW identisch sind
+def checkCorrectness():
+    try:
+        conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+        cur = conn.cursor()
+
+        cur.execute("SELECT * FROM H ORDER BY oid;")
+        original_data = cur.fetchall()
+
+        cur.execute("SELECT * FROM H_JVIEW ORDER BY oid;")
+        recovered_data = cur.fetchall()
+
+        if original_data == recovered_data:
+            print("Die Daten in H und H_JVIEW sind identisch.")
+        else:
+            print("Die Daten in H und H_JVIEW sind NICHT identisch.")
+
+        cur.close()
+        conn.close()
+
+    except Exception as e:
+        print(f"Fehler bei der Überprüfung der Daten: {e}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JSONB-Darstellung")
+    parser.add_argument('operation', choices=['h2j', 'j2h', 'api', 'check'], help="Wählen Sie die Operation: h2j, j2h, api oder check")
+    parser.add_argument('table_name', nargs='?', default=None, help="Name der Tabelle, auf die die Operation angewendet werden soll")
+    args = parser.parse_args()
+
+    if args.operation == 'h2j':
+        h2j(args.table_name or "H")
+    elif args.operation == 'j2h':
+        j2h(args.table_name or "J")
+    elif args.operation == 'api':
+        create_api_functions()
+    elif args.operation == 'check':
+        checkCorrectness()
@@ -1,107 +1,300 @@
 import psycopg
 import argparse
+import time
 import config
+import refresh
+from plan_capture import walk_plan
+
+# Baut V_string, V_integer, die materialisierte Sicht V_all und deren Index auf.
+# Mit suffix (z.B. "_new") entstehen Schattenobjekte, die h2v_swap() später umbenennt.
+# Mit covering=True enthalten die (attribute, value)-Indizes zusätzlich oid (INCLUDE),
+# sodass Query Typ ii als Index-Only-Scan beantwortet werden kann.
+def build_vertical(cur, table_name, suffix="", covering=False):
+    v_string = f"V_string{suffix}"
+    v_integer = f"V_integer{suffix}"
+    v_all = f"V_all{suffix}"
+
+    # Vertikale Tabellen löschen, falls sie existieren
+    cur.execute(f"DROP TABLE IF EXISTS {v_string} CASCADE;")
+    cur.execute(f"DROP TABLE IF EXISTS {v_integer} CASCADE;")
+
+    # Erstellen der vertikalen Tabellen für String- und Integer-Werte
+    cur.execute(f"CREATE TABLE {v_string} (oid INTEGER, attribute TEXT, value TEXT);")
+    cur.execute(f"CREATE TABLE {v_integer} (oid INTEGER, attribute TEXT, value INTEGER);")
+    fill_vertical(cur, table_name, v_string, v_integer)
+
+    cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {v_all};")
+    # Eine Sicht erstellen, die die Daten aus V_string und V_integer kombiniert
+    cur.execute(f"""
+        CREATE MATERIALIZED VIEW {v_all} AS
+        SELECT oid, attribute, value::VARCHAR(50) AS value FROM {v_string}
+        UNION ALL
+        SELECT oid, attribute, value::VARCHAR(50) FROM {v_integer}
+        ORDER BY attribute;
+    """)
+    if covering:
+        cur.execute(f"CREATE INDEX idx_vall_attr_val{suffix} ON {v_all} (attribute, value) INCLUDE (oid);")
+        cur.execute(f"CREATE INDEX idx_vstring_attr_val{suffix} ON {v_string} (attribute, value) INCLUDE (oid);")
+        cur.execute(f"CREATE INDEX idx_vinteger_attr_val{suffix} ON {v_integer} (attribute, value) INCLUDE (oid);")
+    else:
+        cur.execute(f"CREATE INDEX idx_vall_attr_val{suffix} ON {v_all} (attribute, value);")
+    # Eindeutiger Index, Voraussetzung für REFRESH MATERIALIZED VIEW CONCURRENTLY (siehe refresh.py)
+    cur.execute(f"CREATE UNIQUE INDEX idx_vall_oid_attr{suffix} ON {v_all} (oid, attribute);")
+
+# Überträgt die Zeilen der horizontalen Tabelle (optional nur die mit oid in oids) in
+# V_string und V_integer, inklusive Platzhaltereintrag für vollständig leere Zeilen.
+def fill_vertical(cur, table_name, v_string, v_integer, oids=None):
+    oid_filter = "TRUE" if oids is None else "oid = ANY(%(oids)s)"
+    params = {"oids": list(oids) if oids is not None else None}
+
+    # Abfragen der Metadaten der horizontalen Tabelle, um die Spaltennamen und Datentypen zu erhalten
+    cur.execute(f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{table_name.lower()}';")
+    string_columns = []
+    integer_columns = []
+
+    for row in cur.fetchall():
+        column_name, data_type = row
+        if column_name != "oid":  # Die 'oid'-Spalte ausschließen
+            if data_type in ["character varying", "text"]:
+                string_columns.append(column_name)
+            elif data_type == "integer":
+                integer_columns.append(column_name)
+
+    # String-Werte in die Tabelle V_string einfügen
+    for column in string_columns:
+        insert_data = f"""
+            INSERT INTO {v_string} (oid, attribute, value)
+            SELECT oid, '{column}', {column}
+            FROM {table_name}
+            WHERE {column} IS NOT NULL AND {oid_filter}
+            ORDER BY oid;
+        """
+        cur.execute(insert_data, params)
+
+    # Integer-Werte in die Tabelle V_integer einfügen
+    for column in integer_columns:
+        insert_data = f"""
+            INSERT INTO {v_integer} (oid, attribute, value)
+            SELECT oid, '{column}', {column}
+            FROM {table_name}
+            WHERE {column} IS NOT NULL AND {oid_filter}
+            ORDER BY oid;
+        """
+        cur.execute(insert_data, params)
+    # Insert a dummy entry for completely empty rows (all non-oid columns are NULL)
+    # If there are no non-oid columns, we treat every row as empty.
+    if (string_columns or integer_columns):
+        condition = " AND ".join([f"{col} IS NULL" for col in (string_columns + integer_columns)])
+    else:
+        condition = "TRUE"
+
+    empty_query = f"""
+        INSERT INTO {v_string} (oid, attribute, value)
+        SELECT oid, null, null
+        FROM {table_name}
+        WHERE {condition} AND {oid_filter}
+        ORDER BY oid;
+    """
+    cur.execute(empty_query, params)
+
+# Überträgt Änderungen an den Zeilen oids von H in V_string und V_integer (ohne Refresh),
+# z.B. um anschließend die Kosten von REFRESH ... CONCURRENTLY mit echten Änderungen zu messen.
+def sync_vertical(cur, table_name, oids):
+    oids = list(oids)
+    cur.execute("DELETE FROM V_string WHERE oid = ANY(%s);", (oids,))
+    cur.execute("DELETE FROM V_integer WHERE oid = ANY(%s);", (oids,))
+    fill_vertical(cur, table_name, "V_string", "V_integer", oids)
 
 # Horizontal zu Vertikal (H2V) umwandeln
-def h2v(table_name):
+def h2v(table_name, covering=False):
     try:
         conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
         cur = conn.cursor()
 
-        # Vertikale Tabellen löschen, falls sie existieren
-        cur.execute("DROP TABLE IF EXISTS V_string CASCADE;")
-        cur.execute("DROP TABLE IF EXISTS V_integer CASCADE;")
-
-        # Erstellen der vertikalen Tabellen für String- und Integer-Werte
-        cur.execute("CREATE TABLE V_string (oid INTEGER, attribute TEXT, value TEXT);")
-        cur.execute("CREATE TABLE V_integer (oid INTEGER, attribute TEXT, value INTEGER);")
-
-        # Abfragen der Metadaten der horizontalen Tabelle, um die Spaltennamen und Datentypen zu erhalten
-        cur.execute(f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{table_name.lower()}';")
-        string_columns = []
-        integer_columns = []
-
-        for row in cur.fetchall():
-            column_name, data_type = row
-            if column_name != "oid":  # Die 'oid'-Spalte ausschließen
-                if data_type in ["character varying", "text"]:
-                    string_columns.append(column_name)
-                elif data_type == "integer":
-                    integer_columns.append(column_name)
-
-        # String-Werte in die Tabelle V_string einfügen
-        for column in string_columns:
-            insert_data = f"""
-                INSERT INTO V_string (oid, attribute, value)
-                SELECT oid, '{column}', {column}
-                FROM {table_name}
-                WHERE {column} IS NOT NULL
-                ORDER BY oid;
-            """
-            cur.execute(insert_data)
-
-        # Integer-Werte in die Tabelle V_integer einfügen
-        for column in integer_columns:
-            insert_data = f"""
-                INSERT INTO V_integer (oid, attribute, value)
-                SELECT oid, '{column}', {column}
-                FROM {table_name}
-                WHERE {column} IS NOT NULL
-                ORDER BY oid;
-            """
-            cur.execute(insert_data)
-# Insert a dummy entry for completely empty rows (all non-oid columns are NULL)
-        # If there are no non-oid columns, we treat every row as empty.
-        if (string_columns or integer_columns):
-            condition = " AND ".join([f"{col} IS NULL" for col in (string_columns + integer_columns)])
-        else:
-            condition = "TRUE"
-        
-        empty_query = f"""
-            INSERT INTO V_string (oid, attribute, value)
-            SELECT oid, null, null
-            FROM {table_name}
-            WHERE {condition}
-            ORDER BY oid;
-        """
-        cur.execute(empty_query)
-        cur.execute("DROP MATERIALIZED VIEW IF EXISTS V_ALL;")
-        # Eine Sicht erstellen, die die Daten aus V_string und V_integer kombiniert
-        cur.execute("""
-            CREATE MATERIALIZED VIEW V_all AS
-            SELECT oid, attribute, value::VARCHAR(50) AS value FROM V_string
-            UNION ALL
-            SELECT oid, attribute, value::VARCHAR(50) FROM V_integer
-            ORDER BY attribute;
-        """)
-        cur.execute("CREATE INDEX idx_vall_attr_val ON V_ALL (attribute, value);")
+        build_vertical(cur, table_name, covering=covering)
 
         print("\nH2V-Operator erfolgreich ausgeführt. Tabellen V_string und V_integer wurden erstellt und befüllt.")
         print("Sicht V_all wurde erstellt, um die Daten aus V_string und V_integer zu kombinieren.")
         print("Index auf V_all wurde angelegt.")
 
         conn.commit()
+        if covering:
+            prepare_index_only(conn)
         cur.close()
         conn.close()
 
     except Exception as e:
         print(f"Fehler bei der Ausführung des H2V-Operators: {e}")
 
+# Aktualisiert V_all und H_VIEW, ohne sie neu zu erstellen: V_string und V_integer werden aus
+# table_name neu befüllt, danach laufen REFRESH MATERIALIZED VIEW CONCURRENTLY (refresh.py).
+# Leser von V_all und H_VIEW lesen die materialisierten Sichten und werden nicht blockiert,
+# Indizes (auch die von --covering) bleiben wie beim letzten h2v bestehen.
+def refresh_views(table_name):
+    try:
+        conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+        cur = conn.cursor()
+        # TRUNCATE statt DELETE, damit keine toten Tupel in den Basistabellen zurückbleiben
+        cur.execute("TRUNCATE V_string, V_integer;")
+        fill_vertical(cur, table_name, "V_string", "V_integer")
+        conn.commit()
+        cur.close()
+        conn.close()
+
+        conn = refresh.connect()
+        durations = refresh.refresh_all(conn, concurrently=True)
+        conn.close()
+        print("\nRefresh erfolgreich ausgeführt. Tabellen V_string und V_integer wurden neu befüllt.")
+        for view_name, d in durations.items():
+            print(f"{view_name} per REFRESH MATERIALIZED VIEW CONCURRENTLY aktualisiert in {d:.3f}s")
+
+    except Exception as e:
+        print(f"Fehler bei der Ausführung des Refresh-Operators: {e}")
+
+# Art einer Sicht laut pg_class.relkind ('v': Sicht aus phase2.py, 'm': materialisierte Sicht)
+VIEW_KINDS = {"v": "VIEW", "m": "MATERIALIZED VIEW"}
+
+def view_kind(cur, view_name):
+    """Liefert "VIEW" bzw. "MATERIALIZED VIEW" für eine vorhandene Sicht, sonst None."""
+    cur.execute("""
+        SELECT relkind FROM pg_class
+        WHERE relname = %s AND relnamespace = current_schema()::regnamespace;
+    """, (view_name.lower(),))
+    row = cur.fetchone()
+    return VIEW_KINDS.get(row[0]) if row else None
+
+# Entfernt die Schattenobjekte eines abgebrochenen h2v_swap (V_all_new hängt an den Tabellen)
+def drop_shadow_objects(cur):
+    cur.execute("DROP TABLE IF EXISTS V_string_new CASCADE;")
+    cur.execute("DROP TABLE IF EXISTS V_integer_new CASCADE;")
+
+# H2V ohne Ausfallzeit: Schattenobjekte (Suffix _new) in eigener Transaktion aufbauen und
+# anschließend in einer kurzen Transaktion per RENAME gegen die aktiven Objekte tauschen.
+# Leser (q_i, q_ii, Benchmarks) arbeiten während des Aufbaus weiter auf dem alten V_all und
+# warten höchstens für die Dauer des Umbenennens auf die Sperren.
+def h2v_swap(table_name, lock_timeout="5s", covering=False):
+    try:
+        conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+        cur = conn.cursor()
+
+        # 1. Aufbau unter Schattennamen, die aktiven Objekte bleiben unangetastet
+        start_build = time.perf_counter()
+        build_vertical(cur, table_name, suffix="_new", covering=covering)
+        conn.commit()
+        build_time = time.perf_counter() - start_build
+
+        # 2. Kurzer Tausch: aktive Objekte -> _old, Schattenobjekte -> aktive Namen.
+        # V_all kann aus phase2.py noch eine einfache Sicht sein, daher je nach relkind umbenennen.
+        # Schlägt der Tausch fehl (z.B. lock_timeout), bleiben die aktiven Objekte unverändert
+        # und die Schattenobjekte werden entfernt.
+        start_swap = time.perf_counter()
+        try:
+            cur.execute(f"SET LOCAL lock_timeout = '{lock_timeout}';")
+            cur.execute("DROP TABLE IF EXISTS V_string_old CASCADE;")
+            cur.execute("DROP TABLE IF EXISTS V_integer_old CASCADE;")
+            old_kind = view_kind(cur, "V_all_old")
+            if old_kind:
+                cur.execute(f"DROP {old_kind} V_all_old CASCADE;")
+            active_kind = view_kind(cur, "V_all")
+            if active_kind:
+                cur.execute(f"ALTER {active_kind} V_all RENAME TO V_all_old;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vall_attr_val RENAME TO idx_vall_attr_val_old;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vall_oid_attr RENAME TO idx_vall_oid_attr_old;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vstring_attr_val RENAME TO idx_vstring_attr_val_old;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vinteger_attr_val RENAME TO idx_vinteger_attr_val_old;")
+            cur.execute("ALTER TABLE IF EXISTS V_string RENAME TO V_string_old;")
+            cur.execute("ALTER TABLE IF EXISTS V_integer RENAME TO V_integer_old;")
+            cur.execute("ALTER TABLE V_string_new RENAME TO V_string;")
+            cur.execute("ALTER TABLE V_integer_new RENAME TO V_integer;")
+            cur.execute("ALTER MATERIALIZED VIEW V_all_new RENAME TO V_all;")
+            cur.execute("ALTER INDEX idx_vall_attr_val_new RENAME TO idx_vall_attr_val;")
+            cur.execute("ALTER INDEX idx_vall_oid_attr_new RENAME TO idx_vall_oid_attr;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vstring_attr_val_new RENAME TO idx_vstring_attr_val;")
+            cur.execute("ALTER INDEX IF EXISTS idx_vinteger_attr_val_new RENAME TO idx_vinteger_attr_val;")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            drop_shadow_objects(cur)
+            conn.commit()
+            raise
+        swap_time = time.perf_counter() - start_swap
+
+        # 3. Alte Objekte außerhalb der Tausch-Transaktion entfernen
+        # (wie bei h2v() fällt dabei eine auf V_all aufbauende H_VIEW mit weg)
+        cur.execute("DROP TABLE IF EXISTS V_string_old CASCADE;")
+        cur.execute("DROP TABLE IF EXISTS V_integer_old CASCADE;")
+        conn.commit()
+
+        print("\nH2V-Operator (Swap) erfolgreich ausgeführt. V_string, V_integer und V_all wurden ausgetauscht.")
+        print(f"Aufbau: {build_time:.3f}s, Tausch: {swap_time * 1000:.1f}ms")
+
+        if covering:
+            prepare_index_only(conn)
+
+        cur.close()
+        conn.close()
+
+    except Exception as e:
+        print(f"Fehler bei der Ausführung des H2V-Operators (Swap): {e}")
+
+# VACUUM setzt die Visibility Map, erst dann kann ein Index-Only-Scan auf Heap-Zugriffe verzichten.
+# Anschließend wird an einem zufälligen (attribute, value)-Paar geprüft, ob der Planer ihn nutzt.
+def prepare_index_only(conn):
+    conn.commit()
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM (ANALYZE) V_string, V_integer, V_all;")
+        cur.execute("SELECT attribute, value FROM V_all WHERE attribute IS NOT NULL ORDER BY RANDOM() LIMIT 1;")
+        sample = cur.fetchone()
+    print("VACUUM (ANALYZE) auf V_string, V_integer und V_all ausgeführt.")
+    if sample:
+        report_index_only(explain_index_only(conn, *sample))
+
+# Prüft per EXPLAIN (wie run_explain_analyze in projekt1_demo.py), ob Query Typ ii auf V_all
+# als Index-Only-Scan ausgeführt wird, und zählt die trotzdem nötigen Heap-Zugriffe.
+def explain_index_only(conn, attribute, value):
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT oid FROM V_all WHERE attribute = %s AND value = %s",
+                    (attribute, value))
+        plan = cur.fetchone()[0][0]["Plan"]
+    nodes = list(walk_plan(plan))
+    index_only = [n for n in nodes if n["Node Type"] == "Index Only Scan"]
+    rows = sum(n.get("Actual Rows", 0) * n.get("Actual Loops", 1) for n in index_only)
+    heap_fetches = sum(n.get("Heap Fetches", 0) for n in index_only)
+    return {
+        "attribute": attribute,
+        "value": value,
+        "node_types": [n["Node Type"] for n in nodes],
+        "index_only": bool(index_only),
+        "rows": rows,
+        "heap_fetches": heap_fetches,
+        # Ohne Index-Only-Scan müsste jede gefundene Zeile im Heap nachgeschlagen werden
+        "heap_fetches_avoided": rows - heap_fetches,
+    }
+
+def report_index_only(result):
+    print(f"EXPLAIN für {result['attribute']} = {result['value']}: {' -> '.join(result['node_types'])}")
+    if result["index_only"]:
+        print(f"Index-Only-Scan wird genutzt: {result['rows']} Zeilen, {result['heap_fetches']} Heap Fetches, "
+              f"{result['heap_fetches_avoided']} Heap-Zugriffe vermieden.")
+    else:
+        print("Kein Index-Only-Scan, der Planer greift weiterhin auf den Heap zu.")
+
 # Vertikal zu Horizontal (V2H) umwandeln
 def v2h(table_name):
     try:
         conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
         cur = conn.cursor()
 
+        # Abfragen der eindeutigen Attribute in der vertikalen Tabelle
+        cur.execute(f"SELECT DISTINCT attribute FROM {table_name};")
+        attributes = [row[0] for row in cur.fetchall()]
+
         # Löschen der Tabelle H_VIEW, falls sie existiert
         # cur.execute("DROP TABLE IF EXISTS H_VIEW CASCADE;")
         # Löschen der Sicht H_VIEW, falls sie existiert
         cur.execute("DROP MATERIALIZED VIEW IF EXISTS H_VIEW CASCADE;")
 
-        # Abfragen der eindeutigen Attribute in der vertikalen Tabelle
-        cur.execute(f"SELECT DISTINCT attribute FROM {table_name};")
-        attributes = [row[0] for row in cur.fetchall()]
-
         # Dynamische Erstellung der SELECT-Abfrage für die Sicht
         create_view_query = f"CREATE MATERIALIZED VIEW H_VIEW AS SELECT o.oid"
         for index, attribute in enumerate(attributes, start=1):
@@ -116,6 +309,8 @@ def v2h(table_name):
 
         # Erstellen der Sicht H_VIEW
         cur.execute(create_view_query)
+        # Eindeutiger Index auf oid, Voraussetzung für REFRESH MATERIALIZED VIEW CONCURRENTLY
+        cur.execute("CREATE UNIQUE INDEX idx_h_view_oid ON H_VIEW (oid);")
 
         print("\nv2h-Operator erfolgreich ausgeführt. Sicht H_VIEW wurde erstellt und Index angelegt.")
 
@@ -154,13 +349,19 @@ def checkCorrectness():
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Datenbankoperationen")
-    parser.add_argument('operation', choices=['h2v', 'v2h', 'check'], help="Wählen Sie die Operation: h2v, v2h oder check")
+    parser.add_argument('operation', choices=['h2v', 'h2v_swap', 'v2h', 'refresh', 'check'],
+                        help="Wählen Sie die Operation: h2v, h2v_swap, v2h, refresh (V_all/H_VIEW aus table_name aktualisieren) oder check")
     parser.add_argument('table_name', help="Name der Tabelle, auf die die Operation angewendet werden soll")
+    parser.add_argument('--covering', action='store_true', help="h2v/h2v_swap: Indizes mit INCLUDE (oid) für Index-Only-Scans anlegen")
     args = parser.parse_args()
 
     if args.operation == 'h2v':
-        h2v(args.table_name)
+        h2v(args.table_name, covering=args.covering)
+    elif args.operation == 'h2v_swap':
+        h2v_swap(args.table_name, covering=args.covering)
     elif args.operation == 'v2h':
         v2h(args.table_name)
+    elif args.operation == 'refresh':
+        refresh_views(args.table_name)
     elif args.operation == 'check':
         checkCorrectness()
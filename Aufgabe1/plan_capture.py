@@ -0,0 +1,120 @@
+import json
+import os
+import time
+import psycopg
+import config
+
+# Ablage der Pläne je Benchmark-Zelle (|H|, |A|, S, Layout, Typ), nur der jeweils letzte Lauf
+PLAN_HISTORY_PATH = "plan_history.json"
+
+# Anzahl der Queries pro Zelle, für die EXPLAIN ANALYZE ausgeführt wird
+SAMPLE_SIZE = 5
+
+# Ab diesem Faktor gilt eine Änderung der Buffer-Hits als auffällig
+BUFFER_TOLERANCE = 2.0
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+def walk_plan(node):
+    """Liefert alle Knoten eines EXPLAIN-(FORMAT JSON)-Plans in Vorordnung."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+def summarize_plan(explain_output):
+    """Verdichtet die EXPLAIN-Ausgabe auf Scan-Arten, Buffer-Zahlen und Ausführungszeit."""
+    plan = explain_output[0]["Plan"]
+    nodes = list(walk_plan(plan))
+    scans = sorted({
+        f"{n['Node Type']} on {n.get('Relation Name') or n.get('Index Name', '?')}"
+        for n in nodes if n["Node Type"] in SCAN_NODES
+    })
+    return {
+        "node_types": [n["Node Type"] for n in nodes],
+        "scans": scans,
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "execution_time": explain_output[0].get("Execution Time"),
+    }
+
+def capture_plans(samples):
+    """
+    Führt EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) für die gegebenen (query, params)-Paare aus
+    und liefert je Query die Zusammenfassung und den vollständigen Plan.
+    """
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    conn.autocommit = True
+    captured = []
+    with conn.cursor() as cur:
+        for query, params in samples:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+            explain_output = cur.fetchone()[0]
+            captured.append({
+                "query": query,
+                "params": [str(p) for p in params],
+                "summary": summarize_plan(explain_output),
+                "plan": explain_output,
+            })
+    conn.close()
+    return captured
+
+def median(values):
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+def compare_plans(previous, current, buffer_tolerance=BUFFER_TOLERANCE):
+    """
+    Vergleicht zwei Einträge derselben Zelle und liefert eine Liste von Hinweisen:
+    geänderte Scan-Arten (z.B. Seq Scan statt Index Scan) und stark veränderte Buffer-Hits.
+    """
+    flags = []
+    prev_scans = sorted({s for p in previous["plans"] for s in p["summary"]["scans"]})
+    curr_scans = sorted({s for p in current["plans"] for s in p["summary"]["scans"]})
+    if prev_scans != curr_scans:
+        flags.append(f"Scan-Arten geändert: {prev_scans} -> {curr_scans}")
+
+    prev_hits = median([p["summary"]["shared_hit"] for p in previous["plans"]])
+    curr_hits = median([p["summary"]["shared_hit"] for p in current["plans"]])
+    low, high = sorted((prev_hits, curr_hits))
+    if high > 0 and (low == 0 or high / low > buffer_tolerance):
+        flags.append(f"Buffer-Hits (Median) geändert: {prev_hits} -> {curr_hits}")
+    return flags
+
+def load_history(path=PLAN_HISTORY_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(history, path=PLAN_HISTORY_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1, default=str)
+
+def cell_key(H, A, S, layout, qtype):
+    return f"{H}|{A}|{S:.3f}|{layout}|{qtype}"
+
+def record_cell(cell, samples, throughput, path=PLAN_HISTORY_PATH):
+    """
+    Instrumentierungs-Hook für die Benchmarks: erfasst die Pläne einer Stichprobe von Queries
+    der Zelle, speichert sie zusammen mit dem gemessenen Durchsatz und meldet Planänderungen
+    gegenüber dem letzten Lauf derselben Zelle. Je Zelle wird nur dieser Lauf aufbewahrt.
+    """
+    key = cell_key(*cell)
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "throughput": throughput,
+        "plans": capture_plans(samples[:SAMPLE_SIZE]),
+    }
+    history = load_history(path)
+    previous = history.get(key)
+    flags = compare_plans(previous, entry) if previous else []
+    entry["flags"] = flags
+    history[key] = entry
+    save_history(history, path)
+
+    for flag in flags:
+        print(f"  [Planänderung {key}] {flag}")
+    return flags
@@ -0,0 +1,112 @@
+import psycopg
+import argparse
+import time
+import config
+
+# Materialisierte Sichten aus phase3.py in Abhängigkeitsreihenfolge (H_VIEW baut auf V_all auf)
+MATERIALIZED_VIEWS = ["V_all", "H_VIEW"]
+
+# Basistabellen, deren Änderungen V_all veralten lassen
+BASE_TABLES = ["v_string", "v_integer"]
+
+def connect():
+    conn = psycopg.connect(f"dbname={config.DB_NAME} user={config.DB_USER}")
+    conn.autocommit = True
+    return conn
+
+def view_exists(conn, view_name):
+    """Prüft, ob die materialisierte Sicht existiert."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_matviews WHERE matviewname = %s;", (view_name.lower(),))
+        return cur.fetchone() is not None
+
+def refresh_view(conn, view_name, concurrently=True):
+    """
+    Aktualisiert eine materialisierte Sicht und liefert die Dauer in Sekunden.
+    Mit concurrently=True werden Leser nicht blockiert; dafür ist ein eindeutiger
+    Index auf der Sicht nötig (idx_vall_oid_attr bzw. idx_h_view_oid, angelegt in phase3.py).
+    """
+    mode = "CONCURRENTLY " if concurrently else ""
+    start_time = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(f"REFRESH MATERIALIZED VIEW {mode}{view_name};")
+    return time.perf_counter() - start_time
+
+def refresh_all(conn, concurrently=True):
+    """Aktualisiert alle vorhandenen materialisierten Sichten und liefert {Sicht: Dauer}."""
+    durations = {}
+    for view_name in MATERIALIZED_VIEWS:
+        if view_exists(conn, view_name):
+            durations[view_name] = refresh_view(conn, view_name, concurrently)
+    return durations
+
+def row_change_count(conn):
+    """
+    Summe aller eingefügten, geänderten und gelöschten Tupel der Basistabellen laut
+    pg_stat_user_tables. Die Zähler sind kumulativ, der Scheduler betrachtet die Differenz.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%s);
+        """, (BASE_TABLES,))
+        return int(cur.fetchone()[0])
+
+def schedule(max_staleness, max_changes, poll_interval=1.0, duration=None, concurrently=True):
+    """
+    Einfacher Refresh-Scheduler: Sobald sich die Basistabellen geändert haben und entweder
+    das Staleness-Budget (Sekunden seit dem letzten Refresh) oder die Anzahl geänderter
+    Tupel überschritten ist, werden alle materialisierten Sichten aktualisiert.
+    Liefert die Liste der durchgeführten Refreshes (Zeitpunkt, Änderungen, Dauern).
+    """
+    conn = connect()
+    baseline = row_change_count(conn)
+    last_refresh = time.perf_counter()
+    end_time = None if duration is None else time.perf_counter() + duration
+    history = []
+
+    try:
+        while end_time is None or time.perf_counter() < end_time:
+            current = row_change_count(conn)
+            # Nach einem h2v_swap gehören die Zähler zu neuen Tabellen und beginnen wieder bei 0
+            changes = current - baseline if current >= baseline else current
+            staleness = time.perf_counter() - last_refresh
+
+            if changes > 0 and (staleness >= max_staleness or changes >= max_changes):
+                durations = refresh_all(conn, concurrently)
+                history.append({"time": time.time(), "changes": changes,
+                                "staleness": staleness, "durations": durations})
+                total = sum(durations.values())
+                print(f"Refresh nach {changes} Änderungen / {staleness:.1f}s Staleness: "
+                      + ", ".join(f"{v} {d:.3f}s" for v, d in durations.items())
+                      + f" (gesamt {total:.3f}s)")
+                baseline = current
+                last_refresh = time.perf_counter()
+
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    return history
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Refresh der materialisierten Sichten V_all und H_VIEW")
+    parser.add_argument('operation', choices=['once', 'schedule'], help="Einmalig aktualisieren oder Scheduler starten")
+    parser.add_argument('--max-staleness', type=float, default=30.0, help="Staleness-Budget in Sekunden")
+    parser.add_argument('--max-changes', type=int, default=1000, help="Anzahl geänderter Tupel, die einen Refresh auslöst")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Prüfintervall des Schedulers in Sekunden")
+    parser.add_argument('--duration', type=float, default=None, help="Laufzeit des Schedulers in Sekunden (Standard: unbegrenzt)")
+    parser.add_argument('--blocking', action='store_true', help="REFRESH ohne CONCURRENTLY ausführen")
+    args = parser.parse_args()
+
+    if args.operation == 'once':
+        conn = connect()
+        durations = refresh_all(conn, concurrently=not args.blocking)
+        conn.close()
+        for view_name, d in durations.items():
+            print(f"{view_name} aktualisiert in {d:.3f}s")
+    elif args.operation == 'schedule':
+        schedule(args.max_staleness, args.max_changes, args.poll_interval, args.duration,
+                 concurrently=not args.blocking)
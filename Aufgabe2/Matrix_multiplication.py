@@ -1,63 +1,67 @@
-import numpy as np 
-import psycopg2
+import numpy as np
 import time
+from generate import generate_np, to_coo
+from phase2_setup import connect_db
+from loader import copy_triples
+import config
 
-# Datenbankverbindung
-try:
-    conn = psycopg2.connect(
-        dbname="matrix_multiplication",
-        user="postgres",
-        password="meinpasswort",  
-        host="localhost",
-        port="5432"
-    )
-    print("Datenbankverbindung erfolgreich!")
-except Exception as e:
-    print("Fehler bei der Datenbankverbindung:", e)
-    exit()
+# Datenbankverbindung, erst beim ersten Zugriff aufgebaut (siehe get_connection)
+_conn = None
 
-# Datengenerator für zwei Matrizen A= (l-1) x 1 und B= l x (l-1) 
-def generate(l, sparsity):
-    m = l - 1
-    n = l - 1
-    A = np.random.rand(m, l) #fülle Matrizen mit Zufallswerten 
-    B = np.random.rand(l, n)
-    A[np.random.rand(m, l) < sparsity] = 0
-    B[np.random.rand(l, n) < sparsity] = 0
-    return A, B
+def get_connection():
+    """
+    Liefert die gemeinsame Datenbankverbindung (Zugangsdaten aus config.py).
+    Sie wird erst beim ersten Aufruf aufgebaut, der Import des Moduls verbindet nicht.
+    """
+    global _conn
+    if _conn is None or _conn.closed:
+        _conn = connect_db(dbname=config.DB_NAME, user=config.DB_USER)
+    return _conn
+
+def close_connection():
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+# Datengenerator für zwei Matrizen A= (l-1) x l und B= l x (l-1), vektorisiert in generate.py
+generate = generate_np
 
 # Import der Matrizen in die Datenbank, speichert nur Nicht-Null-Werte, um die Effizienz zu erhöhen
-def import_matrices(A, B, conn):
-    cur = conn.cursor()
-    cur.execute("DROP TABLE IF EXISTS A; DROP TABLE IF EXISTS B;")
-    cur.execute("CREATE TABLE A (i INT, j INT, val DOUBLE PRECISION, PRIMARY KEY (i, j))")
-    cur.execute("CREATE TABLE B (i INT, j INT, val DOUBLE PRECISION, PRIMARY KEY (i, j))")
-    
-    a_values = [(i + 1, j + 1, float(A[i, j])) for i in range(A.shape[0]) for j in range(A.shape[1]) if A[i, j] != 0]
-    b_values = [(i + 1, j + 1, float(B[i, j])) for i in range(B.shape[0]) for j in range(B.shape[1]) if B[i, j] != 0]
-    
-    cur.executemany("INSERT INTO A (i, j, val) VALUES (%s, %s, %s)", a_values)
-    cur.executemany("INSERT INTO B (i, j, val) VALUES (%s, %s, %s)", b_values)
-    
+def import_matrices(A, B, conn=None):
+    """
+    Legt die Tabellen A und B (i, j, val) mit 1-basierten Indizes an und lädt die
+    Nicht-Null-Werte per binärem COPY (loader.py) statt zeilenweisem INSERT.
+    Rückgabe: Ladestatistik je Tabelle (siehe loader.copy_binary)
+    """
+    conn = conn or get_connection()
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS A; DROP TABLE IF EXISTS B;")
+        cur.execute("CREATE TABLE A (i INT, j INT, val DOUBLE PRECISION, PRIMARY KEY (i, j))")
+        cur.execute("CREATE TABLE B (i INT, j INT, val DOUBLE PRECISION, PRIMARY KEY (i, j))")
     conn.commit()
-    cur.close()
 
-# Ansatz 0 (Matrixmultiplikation auf Computer) Laufzeitmessung 
+    stats = []
+    for table_name, M in (("A", A), ("B", B)):
+        rows, cols, vals = to_coo(M)
+        stats.append(copy_triples(conn, table_name, rows + 1, cols + 1, vals))
+    return stats
+
+# Ansatz 0 (Matrixmultiplikation auf Computer) Laufzeitmessung
 def approach_0(A, B):
+    """Multiplikation im Prozess per np.einsum (vektorisiert statt Schleife je Element)."""
     start = time.time()
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
     if A.shape[1] != B.shape[0]:
         raise ValueError("Anzahl der Spalten von A muss gleich der Anzahl der Zeilen von B sein.")
-    m, n = A.shape[0], B.shape[1]
-    C = np.zeros((m, n)) #Ergebnismatrix mit Größe m x n
-    for i in range(m):
-        for j in range(n):
-            for k in range(A.shape[1]):
-                C[i, j] += A[i, k] * B[k, j]
+    C = np.einsum("ik,kj->ij", A, B, optimize=True)  # Ergebnismatrix mit Größe m x n
     end = time.time() #misst Laufzeit
-    return C, end - start 
+    return C, end - start
 
 # Ansatz 1 (Matrixmultiplikation in Datenbank)
-def approach_1(conn):
+def approach_1(conn=None):
+    conn = conn or get_connection()
     cur = conn.cursor()
     start = time.time()
     cur.execute("""
@@ -92,15 +96,16 @@ C[2,2] = 1*2 + 0*1 + 2*0 = 2
 Ergebnis C = [[7, 8], [9, 2]]
 """
 
-# testlauf
-print("Teste Toy-Beispiel...")
-import_matrices(A_toy, B_toy, conn)
-C_0, time_0 = approach_0(A_toy, B_toy)
-result_1, time_1 = approach_1(conn)
+if __name__ == "__main__":
+    # testlauf
+    print("Teste Toy-Beispiel...")
+    import_matrices(A_toy, B_toy)
+    C_0, time_0 = approach_0(A_toy, B_toy)
+    result_1, time_1 = approach_1()
 
-print("Ansatz 0 Ergebnis:\n", C_0)
-print("Zeit:", time_0, "Sekunden")
-print("Ansatz 1 Ergebnis:", result_1)
-print("Zeit:", time_1, "Sekunden")
+    print("Ansatz 0 Ergebnis:\n", C_0)
+    print("Zeit:", time_0, "Sekunden")
+    print("Ansatz 1 Ergebnis:", sorted(result_1))
+    print("Zeit:", time_1, "Sekunden")
 
-conn.close()
+    close_connection()
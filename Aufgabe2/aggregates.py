@@ -0,0 +1,184 @@
+import numpy as np
+from sparse_multiply import CSRMatrix, spgemm, spgemm_row
+from spmv import spmv_csr
+from phase2_setup import connect_db, create_tables_sparse
+import matrix_store
+from timing import timed
+import config
+
+# Aggregate von C = A * B, ohne C zu bilden: Zeilensummen C 1 = A (B 1),
+# Spaltensummen 1^T C = (1^T A) B, jeweils zwei SpMV in O(nnz(A) + nnz(B)).
+
+def row_sums_csr(A: CSRMatrix, B: CSRMatrix):
+    """Zeilensummen von C = A * B als A (B 1). Rückgabe: NumPy-Array der Länge m."""
+    return spmv_csr(A, spmv_csr(B, np.ones(B.shape[1])))
+
+def col_sums_csr(A: CSRMatrix, B: CSRMatrix):
+    """Spaltensummen von C = A * B als (1^T A) B. Rückgabe: NumPy-Array der Länge n."""
+    u = np.bincount(A.indices, weights=A.data, minlength=A.shape[1])
+    return np.bincount(B.indices, weights=B.data * u[B.row_ids()], minlength=B.shape[1])
+
+def top_k_csr(A: CSRMatrix, B: CSRMatrix, k: int = 1):
+    """
+    Die k größten Einträge je Zeile von C = A * B. Jede Zeile wird nach Gustavson einzeln
+    berechnet (spgemm_row) und sofort auf k Einträge reduziert, C liegt nie vollständig vor.
+    Berücksichtigt werden nur Nicht-Null-Einträge von C (wie bei den SQL-Ansätzen).
+    Rückgabe: Liste von (i, j, val), je Zeile absteigend nach val
+    """
+    b_lengths = np.diff(B.indptr)
+    result = []
+    for i in range(A.shape[0]):
+        cols, vals = spgemm_row(A, B, i, b_lengths)
+        if len(vals) > k:
+            best = np.argpartition(vals, -k)[-k:]
+            cols, vals = cols[best], vals[best]
+        order = np.argsort(-vals, kind="stable")
+        result.extend((i, j, val) for j, val in zip(cols[order].tolist(), vals[order].tolist()))
+    return result
+
+def row_sums_sql(conn, a_table: str = "A_sparse", b_table: str = "B_sparse"):
+    """
+    Zeilensummen von C = A * B in der Datenbank: erst B 1 (GROUP BY B.i), dann ein Join
+    mit A über nur l Tupel statt des vollständigen Joins.
+    Rückgabe: Liste von (i, Summe) für alle Zeilen mit Beitrag
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            WITH b1 AS (
+                SELECT i, SUM(val) AS val
+                FROM {b_table}
+                GROUP BY i
+            )
+            SELECT A.i, SUM(A.val * b1.val)
+            FROM {a_table} A
+            JOIN b1 ON A.j = b1.i
+            GROUP BY A.i;
+        """)
+        return cur.fetchall()
+
+def col_sums_sql(conn, a_table: str = "A_sparse", b_table: str = "B_sparse"):
+    """Spaltensummen von C = A * B in der Datenbank als (1^T A) B. Rückgabe: Liste von (j, Summe)."""
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            WITH a1 AS (
+                SELECT j, SUM(val) AS val
+                FROM {a_table}
+                GROUP BY j
+            )
+            SELECT B.j, SUM(a1.val * B.val)
+            FROM a1
+            JOIN {b_table} B ON a1.j = B.i
+            GROUP BY B.j;
+        """)
+        return cur.fetchall()
+
+def top_k_sql(conn, k: int = 1, a_table: str = "A_sparse", b_table: str = "B_sparse"):
+    """
+    Die k größten Einträge je Zeile von C = A * B per Fensterfunktion: C wird nur innerhalb
+    der Anfrage berechnet, übertragen werden höchstens k Tupel je Zeile.
+    Rückgabe: Liste von (i, j, val), je Zeile absteigend nach val
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT i, j, val
+            FROM (
+                SELECT i, j, val, ROW_NUMBER() OVER (PARTITION BY i ORDER BY val DESC, j) AS rank
+                FROM (
+                    SELECT A.i, B.j, SUM(A.val * B.val) AS val
+                    FROM {a_table} A
+                    JOIN {b_table} B ON A.j = B.i
+                    GROUP BY A.i, B.j
+                ) c
+            ) ranked
+            WHERE rank <= %s
+            ORDER BY i, rank;
+        """, (k,))
+        return cur.fetchall()
+
+def sums_from_triples(result, axis: int, size: int):
+    """Zeilen- (axis=0) bzw. Spaltensummen (axis=1) aus einer Liste von (i, j, val)."""
+    sums = np.zeros(size)
+    for entry in result:
+        sums[entry[axis]] += entry[2]
+    return sums
+
+def top_k_from_triples(result, k: int):
+    """Die k größten Einträge je Zeile aus einer Liste von (i, j, val), wie top_k_sql sortiert."""
+    rows = {}
+    for i, j, val in result:
+        rows.setdefault(i, []).append((i, j, val))
+    return [entry for i in sorted(rows) for entry in sorted(rows[i], key=lambda e: (-e[2], e[1]))[:k]]
+
+def triples_from_csr(C: CSRMatrix):
+    return list(zip(C.row_ids().tolist(), C.indices.tolist(), C.data.tolist()))
+
+def dense_vector(pairs, size: int):
+    x = np.zeros(size)
+    for idx, val in pairs:
+        x[idx] = val
+    return x
+
+def aggregate_benchmark(conn, sizes, sparsity: float = 0.99, k: int = 5, repeats: int = 3):
+    """
+    Vergleicht Zeilensummen, Spaltensummen und Top-k je Zeile direkt aus A/B (pushdown)
+    mit der Berechnung über das vollständige Produkt C (SQL-Join bzw. SpGEMM), in SQL
+    und im Prozess auf CSR. Operanden kommen aus matrix_store.cached_operands.
+    Rückgabe: {Aggregat: {Variante: [(l, Laufzeit), ...]}}
+    """
+    variants = ("sql", "sql_full", "csr", "csr_full")
+    results = {agg: {v: [] for v in variants} for agg in ("row_sums", "col_sums", "top_k")}
+
+    def sql_full():
+        # Vollständiges Produkt wie Ansatz 1
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT A.i, B.j, SUM(A.val * B.val)
+                FROM A_sparse A
+                JOIN B_sparse B ON A.j = B.i
+                GROUP BY A.i, B.j;
+            """)
+            return cur.fetchall()
+
+    for l in sizes:
+        A, B = matrix_store.cached_operands(l, sparsity)
+        m, n = A.shape[0], B.shape[1]
+        create_tables_sparse(conn)
+        matrix_store.load_sparse_csr(conn, A, B)
+
+        computations = {
+            "row_sums": {
+                "sql": lambda: dense_vector(row_sums_sql(conn), m),
+                "sql_full": lambda: sums_from_triples(sql_full(), 0, m),
+                "csr": lambda: row_sums_csr(A, B),
+                "csr_full": lambda: spgemm(A, B).toarray().sum(axis=1),
+            },
+            "col_sums": {
+                "sql": lambda: dense_vector(col_sums_sql(conn), n),
+                "sql_full": lambda: sums_from_triples(sql_full(), 1, n),
+                "csr": lambda: col_sums_csr(A, B),
+                "csr_full": lambda: spgemm(A, B).toarray().sum(axis=0),
+            },
+            "top_k": {
+                "sql": lambda: [row[2] for row in top_k_sql(conn, k)],
+                "sql_full": lambda: [row[2] for row in top_k_from_triples(sql_full(), k)],
+                "csr": lambda: [row[2] for row in top_k_csr(A, B, k)],
+                "csr_full": lambda: [row[2] for row in top_k_from_triples(triples_from_csr(spgemm(A, B)), k)],
+            },
+        }
+
+        print(f"\n---- Aggregate: l = {l}, s = {sparsity} (nnz(A) = {A.nnz}, nnz(B) = {B.nnz}) ----")
+        for agg, funcs in computations.items():
+            values = {}
+            for variant, func in funcs.items():
+                values[variant], seconds = timed(func, repeats)
+                results[agg][variant].append((l, seconds))
+            reference = np.asarray(values["csr_full"])
+            correct = all(len(v) == len(reference) and np.allclose(v, reference) for v in values.values())
+            print(f"{agg}: " + ", ".join(f"{v} {results[agg][v][-1][1]:.4f}s" for v in variants)
+                  + f", übereinstimmend: {correct}")
+    return results
+
+if __name__ == "__main__":
+    conn = connect_db(dbname=config.DB_NAME, user=config.DB_USER)
+    aggregate_benchmark(conn, [256, 1024, 4096], sparsity=0.99)
+    conn.close()
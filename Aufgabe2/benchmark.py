@@ -1,123 +1,271 @@
+import argparse
+import csv
+import os
+import resource
 import time
+import tracemalloc
+import numpy as np
 import matplotlib.pyplot as plt
-from generate import generate
+from generate import generate_np
 from multiply import multiply_naive
+from sparse_multiply import multiply_sparse, multiply_auto
 from phase2_setup import (
     connect_db,
     create_tables_sparse,
     create_tables_vector,
+    create_tables_tiled,
+    create_tables_svector,
     create_dotproduct_function,
-    insert_sparse,
-    insert_vector,
+    create_tile_functions,
+    create_sparse_dotproduct_function,
+    DOTPRODUCT_VARIANTS,
 )
+from parallel_multiply import scaling_benchmark
+import parallel_sql
+import chain
+import spmv
+import aggregates
+import matrix_store
+import dense_multiply
+from dense_multiply import multiply_blocked, multiply_strassen
+import Matrix_multiplication
+from db_multiply import (
+    timed_persist_and_fetch,
+    persist_product,
+    multiply_sql_sparse,
+    multiply_sql_vector,
+    multiply_sql_svector,
+    SQL_SPARSE,
+    SQL_VECTOR,
+    CALIBRATION_PATH,
+    CALIBRATION_FIELDS,
+)
+from selector import FEATURES
+from verify import freivalds, freivalds_sql
+from timing import measure
+from loader import load_sparse, load_vector, load_svector, load_tiled, report
 import psycopg
 import config
 
-def multiply_sql_sparse(conn):
+# Messwerte für selector.py (CALIBRATION_PATH, CALIBRATION_FIELDS aus db_multiply.py),
+# nur für Ansätze mit Kostenmodell in selector.FEATURES
+def write_calibration(rows, path=CALIBRATION_PATH):
+    """Schreibt Messwerte (Dictionaries mit CALIBRATION_FIELDS) als CSV."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CALIBRATION_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+# Ansätze mit Linienstil für die Plots
+APPROACHES = [
+    ('python', '--'),   # Ansatz 0: drei geschachtelte Python-Schleifen
+    ('sparse', '-'),    # Ansatz 1: SQL-Join auf A_sparse/B_sparse
+    ('vector', ':'),    # Ansatz 2: SQL mit dotproduct auf A_vec/B_vec
+    ('vector_sql', (0, (1, 3))),         # Ansatz 2 mit dotproduct als SQL-Funktion
+    ('vector_sparse', (0, (1, 1, 3, 1))),  # Ansatz 2 mit dotproduct nur über die Nicht-Null-Positionen
+    ('vector_plpython', (0, (2, 2, 1, 2))),  # Ansatz 2 mit dotproduct in PL/Python (NumPy)
+    ('svector', (0, (3, 3))),   # Ansatz 2 auf A_svec/B_svec mit sparse_dotproduct
+    ('sparse_persist', (0, (4, 1))),   # Ansatz 1, Ergebnis per CREATE TABLE AS im Server (nur Berechnung)
+    ('sparse_transfer', (0, (1, 2))),  # Übertragung von C_sparse per binärem COPY in ein NumPy-Array
+    ('vector_persist', (0, (4, 1, 1, 1))),  # Ansatz 2, Ergebnis per CREATE TABLE AS (nur Berechnung)
+    ('vector_transfer', (0, (1, 4))),  # Übertragung von C_vec per binärem COPY in ein NumPy-Array
+    ('csr', '-.'),      # SpGEMM (Gustavson) auf CSR-Arrays im Prozess
+    ('auto', (0, (3, 1, 1, 1, 1, 1))),  # CSR oder dicht über NumPy/BLAS, je nach Dichte
+    ('tiled', (0, (5, 2))),  # SQL-Join auf b×b-Kacheln A_tile/B_tile mit tile_multiply
+    ('blocked', (0, (2, 1))),   # dicht in b×b-Kacheln über NumPy im Prozess
+    ('strassen', (0, (6, 1, 1, 1))),  # dicht, rekursiv nach Strassen oberhalb des Cutoffs
+    ('einsum', (0, (1, 1, 1, 3))),  # Ansatz 0 aus Matrix_multiplication.py (np.einsum)
+]
+
+def setup_dotproduct_variants(conn):
     """
-    Ansatz 1: SQL-Join auf sparse Darstellung.
+    Legt jede dotproduct-Variante als eigene Funktion dotproduct_<variante> an
+    (dotproduct selbst bleibt die PL/pgSQL-Variante).
+    Rückgabe: Liste der Varianten, die in dieser Datenbank angelegt werden konnten.
     """
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT A_sparse.i, B_sparse.j, SUM(A_sparse.val * B_sparse.val)
-            FROM A_sparse
-            JOIN B_sparse ON A_sparse.j = B_sparse.i
-            GROUP BY A_sparse.i, B_sparse.j;
-        """)
-        return cur.fetchall()
+    create_dotproduct_function(conn)
+    available = []
+    for variant in DOTPRODUCT_VARIANTS:
+        if variant == "plpgsql":
+            continue
+        try:
+            create_dotproduct_function(conn, variant, name=f"dotproduct_{variant}")
+            available.append(variant)
+        except psycopg.Error as e:
+            conn.rollback()
+            print(f"dotproduct-Variante {variant} nicht verfügbar: {e}")
+    return available
+
+def report_all(stats_list):
+    """Gibt die Ladestatistiken aus und liefert die gesamte Lade- und Indexzeit."""
+    for stats in stats_list:
+        report(stats)
+    return sum(stats["load_time"] + stats["index_time"] for stats in stats_list)
 
-def multiply_sql_vector(conn):
+def multiply_sql_tiled(conn, block_size: int):
     """
-    Ansatz 2: CROSS JOIN auf Vektor-Tabellen mit UDF dotproduct.
+    Block-Ansatz: Join auf Kachelebene (A.bj = B.bi), Kachelprodukt per UDF tile_multiply
+    und elementweise Summe der Teilprodukte je Ergebniskachel mit dem Aggregat tile_sum.
+    Rückgabe: Liste von (bi, bj, tile) für alle nicht leeren Ergebniskacheln.
     """
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT A_vec.i, B_vec.j, dotproduct(A_vec.row, B_vec.col)
-            FROM A_vec
-            CROSS JOIN B_vec;
-        """)
+            SELECT A_tile.bi, B_tile.bj, tile_sum(tile_multiply(A_tile.tile, B_tile.tile, %s))
+            FROM A_tile
+            JOIN B_tile ON A_tile.bj = B_tile.bi
+            GROUP BY A_tile.bi, B_tile.bj;
+        """, (block_size,))
         return cur.fetchall()
 
-def run_benchmark(conn, sizes, sparsities, repeats=3):
+def run_benchmark(conn, sizes, sparsities, repeats=3, block_size=64, dot_variants=(),
+                  calibration_path=CALIBRATION_PATH):
     """
-    Führt die drei Multiplikationsansätze für alle Kombinationen von
+    Führt die Multiplikationsansätze für alle Kombinationen von
     Matrixgröße l und Sparsity s aus und sammelt die mittleren Laufzeiten.
+    block_size ist die Kantenlänge b der Kacheln für den Block-Ansatz,
+    dot_variants die zusätzlich gemessenen dotproduct-Varianten (siehe setup_dotproduct_variants).
+    Die Messwerte werden zusätzlich nach calibration_path geschrieben (None: nicht schreiben).
     """
-    results = {
-        'python': {s: [] for s in sparsities},
-        'sparse': {s: [] for s in sparsities},
-        'vector': {s: [] for s in sparsities},
-    }
+    results = {approach: {s: [] for s in sparsities} for approach, _ in APPROACHES}
+    calibration = []
 
     for l in sizes:
         print(f"\n---- Matrixgröße l = {l} ----")
         for s in sparsities:
-            # Zufallsdaten generieren
-            A, B = generate(l, s)
+            # Zufallsdaten generieren (NumPy), Ansatz 0 arbeitet auf 2D-Listen
+            A, B = generate_np(l, s)
+            A_list, B_list = A.tolist(), B.tolist()
 
-            # Tabelle sparse neu anlegen und Daten laden
+            # Ladezeiten (COPY + Indizes) je Darstellung, für die Kalibrierung von selector.py
+            load_times = {}
+            # Tabelle sparse neu anlegen und Daten per binärem COPY laden
             create_tables_sparse(conn)
-            insert_sparse(conn, A, B)
-            # Tabelle vector neu anlegen und Daten laden
+            load_times['sparse'] = report_all(load_sparse(conn, A, B))
+            # Tabelle vector neu anlegen und Daten per binärem COPY laden
             create_tables_vector(conn, l)
-            insert_vector(conn, A, B)
+            load_times['vector'] = report_all(load_vector(conn, A, B))
+            # Komprimierte Vektoren (Index- und Wertearrays ohne Nullen) laden
+            create_tables_svector(conn)
+            load_times['svector'] = report_all(load_svector(conn, A, B))
+            # Tabelle tiled neu anlegen und b×b-Kacheln laden
+            create_tables_tiled(conn)
+            load_times['tiled'] = report_all(load_tiled(conn, A, B, block_size))
 
             # 1) Python-Ansatz
-            times = []
-            for _ in range(repeats):
-                start = time.perf_counter()
-                multiply_naive(A, B)
-                times.append(time.perf_counter() - start)
-            t_py = sum(times) / repeats
+            t_py = measure(lambda: multiply_naive(A_list, B_list), repeats)
             results['python'][s].append((l, t_py))
 
             # 2) SQL sparse
-            times = []
-            for _ in range(repeats):
-                start = time.perf_counter()
-                multiply_sql_sparse(conn)
-                times.append(time.perf_counter() - start)
-            t_sp = sum(times) / repeats
+            t_sp = measure(lambda: multiply_sql_sparse(conn), repeats)
             results['sparse'][s].append((l, t_sp))
 
             # 3) SQL vector
-            times = []
-            for _ in range(repeats):
-                start = time.perf_counter()
-                multiply_sql_vector(conn)
-                times.append(time.perf_counter() - start)
-            t_vec = sum(times) / repeats
+            t_vec = measure(lambda: multiply_sql_vector(conn), repeats)
             results['vector'][s].append((l, t_vec))
+            for variant in dot_variants:
+                t_var = measure(lambda: multiply_sql_vector(conn, f"dotproduct_{variant}"), repeats)
+                results[f'vector_{variant}'][s].append((l, t_var))
+                print(f"s={s:.1f} ➞ vector SQL ({variant}) {t_var:.3f}s")
+
+            # 2b/3a) Ergebnis im Server persistieren; Berechnung und Übertragung getrennt messen
+            shape = (A.shape[0], B.shape[1])
+            for name, select_sql, target in (('sparse', SQL_SPARSE, "C_sparse"),
+                                             ('vector', SQL_VECTOR.format(func="dotproduct"), "C_vec")):
+                timings = [timed_persist_and_fetch(conn, select_sql, target, shape)[1:] for _ in range(repeats)]
+                t_compute = sum(t for t, _ in timings) / repeats
+                t_transfer = sum(t for _, t in timings) / repeats
+                results[f'{name}_persist'][s].append((l, t_compute))
+                results[f'{name}_transfer'][s].append((l, t_transfer))
+                print(f"s={s:.1f} ➞ {name} SQL persistiert: Berechnung {t_compute:.3f}s, Übertragung {t_transfer:.3f}s")
+
+            # Korrektheit in O(nnz) prüfen (Freivalds), die persistierten Ergebnisse direkt in SQL
+            checks = {
+                "sparse SQL": freivalds_sql(conn, "A_sparse", "B_sparse", "C_sparse"),
+                "vector SQL": freivalds_sql(conn, "A_sparse", "B_sparse", "C_vec"),
+                "CSR": freivalds(A, B, multiply_sparse(A, B)),
+            }
+            failed = [name for name, ok in checks.items() if not ok]
+            print(f"s={s:.1f} ➞ Verifikation (Freivalds): " + ("ok" if not failed else "FEHLER bei " + ", ".join(failed)))
+
+            # 3b) SQL vector auf komprimierten Vektoren
+            t_svec = measure(lambda: multiply_sql_svector(conn), repeats)
+            results['svector'][s].append((l, t_svec))
 
-            print(f"s={s:.1f} ➞ Python {t_py:.3f}s, sparse SQL {t_sp:.3f}s, vector SQL {t_vec:.3f}s")
+            # 4) CSR/SpGEMM im Prozess (inkl. Umwandlung der Listen in CSR)
+            t_csr = measure(lambda: multiply_sparse(A, B), repeats)
+            results['csr'][s].append((l, t_csr))
 
+            # 5) Automatische Wahl zwischen CSR und dichtem BLAS-Pfad
+            t_auto = measure(lambda: multiply_auto(A, B), repeats)
+            results['auto'][s].append((l, t_auto))
+
+            # 6) SQL tiled (Kachelprodukte statt skalarer Tupel)
+            t_tile = measure(lambda: multiply_sql_tiled(conn, block_size), repeats)
+            results['tiled'][s].append((l, t_tile))
+
+            # 7) Dicht im Prozess: Kacheln bzw. Strassen (für niedrige Sparsity)
+            t_blk = measure(lambda: multiply_blocked(A, B, block_size), repeats)
+            results['blocked'][s].append((l, t_blk))
+            t_str = measure(lambda: multiply_strassen(A, B, block_size=block_size), repeats)
+            results['strassen'][s].append((l, t_str))
+            # 8) Ansatz 0 aus Matrix_multiplication.py (vektorisiert per einsum)
+            t_ein = measure(lambda: Matrix_multiplication.approach_0(A, B), repeats)
+            results['einsum'][s].append((l, t_ein))
+
+            print(f"s={s:.1f} ➞ Python {t_py:.3f}s, sparse SQL {t_sp:.3f}s, vector SQL {t_vec:.3f}s, "
+                  f"svector SQL {t_svec:.3f}s, CSR {t_csr:.3f}s, auto {t_auto:.3f}s, tiled SQL (b={block_size}) {t_tile:.3f}s, "
+                  f"blocked {t_blk:.3f}s, Strassen {t_str:.3f}s, einsum {t_ein:.3f}s")
+
+            nnz_a, nnz_b = int(np.count_nonzero(A)), int(np.count_nonzero(B))
+            for approach, _ in APPROACHES:
+                measured = results[approach][s]
+                if approach in FEATURES and measured and measured[-1][0] == l:
+                    calibration.append({"approach": approach, "m": A.shape[0], "l": l, "n": B.shape[1],
+                                        "nnz_a": nnz_a, "nnz_b": nnz_b, "seconds": measured[-1][1]})
+            for name, seconds in load_times.items():
+                if f"load_{name}" not in FEATURES:
+                    continue
+                calibration.append({"approach": f"load_{name}", "m": A.shape[0], "l": l, "n": B.shape[1],
+                                    "nnz_a": nnz_a, "nnz_b": nnz_b, "seconds": seconds})
+
+    if calibration_path is not None:
+        write_calibration(calibration, calibration_path)
     return results
 
-def plot_results(results, sizes, sparsities):
+def show_or_save(path=None):
+    """Speichert die aktuelle Abbildung unter path oder zeigt sie an, wenn kein Pfad angegeben ist."""
+    if path is None:
+        plt.show()
+    else:
+        plt.savefig(path)
+        plt.close()
+
+def plot_results(results, sizes, sparsities, path=None):
     """
     Zeichnet mit Matplotlib:
      - Für jeden Ansatz eine Kurve pro Sparsity
     """
     plt.figure(figsize=(12, 8))
-    for approach, style in [('python', '--'), ('sparse', '-'), ('vector', ':')]:
+    for approach, style in APPROACHES:
+        if not any(results[approach].values()):
+            continue
         for s in sparsities:
             xs = [l for (l, _) in results[approach][s]]
             ys = [t for (_, t) in results[approach][s]]
-            label = f"{approach} s={s:.1f}"
-            plt.plot(xs, ys, style, marker='o', label=label)
+            label = f"{approach} s={s:g}"
+            plt.plot(xs, ys, linestyle=style, marker='o', label=label)
     plt.xlabel("Matrixgröße l")
     plt.ylabel("Durchschnittliche Laufzeit [s]")
-    plt.title("Benchmark: Matrixmultiplikation (3 Ansätze)")
+    plt.title(f"Benchmark: Matrixmultiplikation ({len(APPROACHES)} Ansätze)")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    show_or_save(path)
 
-def plot_bar_results(results, sizes, sparsities):
+def plot_bar_results(results, sizes, sparsities, path=None):
     # Gruppiertes Balkendiagramm pro Sparsity
-    import numpy as np
 
-    approaches = ['python', 'sparse', 'vector']
+    approaches = [approach for approach, _ in APPROACHES if any(results[approach].values())]
     x = np.arange(len(sizes))  # Position der Gruppen
     total_width = 0.8
     single_width = total_width / len(approaches)
@@ -125,31 +273,353 @@ def plot_bar_results(results, sizes, sparsities):
     plt.figure(figsize=(14, 8))
     for idx, approach in enumerate(approaches):
         for jdx, s in enumerate(sparsities):
+            # Position über l, da übersprungene Größen (Modus suite) fehlen können
+            xs = np.array([sizes.index(l) for (l, _) in results[approach][s]], dtype=float)
             ys = [t for (_, t) in results[approach][s]]
             # Offset für jede Sparsity-Kurve
-            offset = (idx - 1) * single_width + (jdx - len(sparsities)/2) * (single_width/len(sparsities))
-            plt.bar(x + offset, ys, width=single_width/len(sparsities), align='center',
-                    label=f"{approach} s={s:.1f}" if idx == 0 else None)
+            offset = (idx - (len(approaches) - 1) / 2) * single_width + (jdx - len(sparsities)/2) * (single_width/len(sparsities))
+            plt.bar(xs + offset, ys, width=single_width/len(sparsities), align='center',
+                    label=f"{approach} s={s:g}" if idx == 0 else None)
     plt.xticks(x, sizes)
     plt.xlabel("Matrixgröße l")
     plt.ylabel("Durchschnittliche Laufzeit [s]")
     plt.title("Benchmark: Matrixmultiplikation (Balkendiagramm)")
     plt.legend()
     plt.tight_layout()
+    show_or_save(path)
+
+# Ansätze des Modus suite: Ansatz 0 und vector benötigen dichte Matrizen und
+# fallen bei großen l über das Zeitbudget weg, die sparse Ansätze laufen bis 8192+
+SUITE_APPROACHES = ['python', 'sparse', 'sparse_persist', 'vector', 'csr', 'auto']
+SUITE_SQL_APPROACHES = {'sparse', 'sparse_persist', 'vector'}
+SUITE_PATH = "suite_results.csv"
+SUITE_FIELDS = ["approach", "l", "sparsity", "nnz_a", "nnz_b", "seconds",
+                "peak_python_mb", "max_rss_cum_mb", "temp_bytes", "verified", "status"]
+
+def server_temp_bytes(conn):
+    """
+    Bisher von der Datenbank in temporäre Dateien geschriebene Bytes (pg_stat_database).
+    Vorher werden die Statistiken der eigenen Verbindung übertragen (ab PostgreSQL 15).
+    """
+    with conn.cursor() as cur:
+        if conn.info.server_version >= 150000:
+            cur.execute("SELECT pg_stat_force_next_flush();")
+        conn.commit()
+        cur.execute("SELECT pg_stat_clear_snapshot();")
+        cur.execute("SELECT temp_bytes FROM pg_stat_database WHERE datname = current_database();")
+        temp_bytes = cur.fetchone()[0]
+    conn.commit()
+    return temp_bytes
+
+def peak_python_memory(func):
+    """Führt func einmal unter tracemalloc aus und liefert die Spitze der Python-/NumPy-Allokationen in MB."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def max_rss_mb():
+    """
+    Bisheriger Höchstwert des residenten Speichers dieses Prozesses (ru_maxrss, unter Linux in KB).
+    Der Wert ist kumulativ über alle bisherigen Messungen, nicht je Ansatz.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def write_suite(rows, path=SUITE_PATH):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUITE_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def results_from_csv(path=SUITE_PATH):
+    """
+    Liest gespeicherte Ergebnisse des Modus suite und bringt sie in die Form von
+    run_benchmark ({Ansatz: {s: [(l, t), ...]}}), damit die Plots daraus entstehen können.
+    Rückgabe: (results, sizes, sparsities)
+    """
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if row["status"] == "ok"]
+    sizes = sorted({int(row["l"]) for row in rows})
+    sparsities = sorted({float(row["sparsity"]) for row in rows})
+    results = {approach: {s: [] for s in sparsities} for approach, _ in APPROACHES}
+    for row in rows:
+        results[row["approach"]][float(row["sparsity"])].append((int(row["l"]), float(row["seconds"])))
+    for per_s in results.values():
+        for points in per_s.values():
+            points.sort()
+    return results, sizes, sparsities
+
+def run_suite(conn, sizes, sparsities, time_budget=60.0, repeats=1, path=SUITE_PATH,
+              cache_dir=matrix_store.CACHE_DIR):
+    """
+    Skalierbarer Benchmark für große l: Operanden werden direkt als CSR erzeugt und in
+    cache_dir gespeichert (matrix_store.py), spätere Läufe verwenden sie ohne Neuerzeugung
+    (dichte Matrizen nur, solange ein dichter Ansatz noch im Budget ist). Ein Ansatz
+    wird für größere l übersprungen, sobald seine aus der letzten Messung kubisch
+    hochgerechnete Gesamtzeit (alle Wiederholungen und der tracemalloc-Lauf) das
+    Zeitbudget (Sekunden) übersteigt.
+    Je Messung werden Laufzeit, Spitze der Python-Allokationen (tracemalloc, entfällt für
+    sparse_persist, dessen Ergebnis im Server bleibt), ru_maxrss als kumulativer Höchstwert
+    des Prozesses und die Bytes temporärer Dateien im Server festgehalten und als CSV geschrieben.
+    Bricht ein Ansatz mit einem Datenbankfehler ab, wird er mit status 'error' vermerkt.
+    Die UDF dotproduct für 'vector' muss angelegt sein (create_dotproduct_function).
+    """
+    rows = []
+    for s in sparsities:
+        last = {}
+        skipped = set()
+        for l in sizes:
+            print(f"\n---- Suite: l = {l}, s = {s} ----")
+            # Operanden einmal erzeugen und in matrix_cache/ ablegen, danach per memmap öffnen
+            A, B = matrix_store.cached_operands(l, s, directory=cache_dir)
+            dense = {}
+            loaded = set()
+
+            def dense_operands():
+                if not dense:
+                    dense["A"], dense["B"] = A.toarray(), B.toarray()
+                return dense["A"], dense["B"]
+
+            for approach in SUITE_APPROACHES:
+                row = {"approach": approach, "l": l, "sparsity": s, "nnz_a": A.nnz, "nnz_b": B.nnz}
+                prev = last.get(approach)
+                if approach in skipped or (prev and prev[1] * (l / prev[0]) ** 3 > time_budget):
+                    skipped.add(approach)
+                    rows.append({**row, "status": "skipped"})
+                    print(f"{approach}: übersprungen (Zeitbudget {time_budget:.0f}s)")
+                    continue
+
+                # Fehler eines Ansatzes (z.B. fehlende UDF) werden als status 'error' festgehalten,
+                # der Lauf geht mit den übrigen Ansätzen weiter
+                try:
+                    # Daten für den Ansatz bereitstellen (nicht Teil der Messung)
+                    if approach in ('sparse', 'sparse_persist') and 'sparse' not in loaded:
+                        create_tables_sparse(conn)
+                        matrix_store.load_sparse_csr(conn, A, B)
+                        loaded.add('sparse')
+                    if approach == 'vector' and 'vector' not in loaded:
+                        create_tables_vector(conn, l)
+                        load_vector(conn, *dense_operands())
+                        loaded.add('vector')
+
+                    if approach == 'python':
+                        A_list, B_list = (M.tolist() for M in dense_operands())
+                        func = lambda: multiply_naive(A_list, B_list)
+                    elif approach == 'sparse':
+                        func = lambda: multiply_sql_sparse(conn)
+                    elif approach == 'sparse_persist':
+                        func = lambda: persist_product(conn, SQL_SPARSE, "C_sparse")
+                    elif approach == 'vector':
+                        func = lambda: multiply_sql_vector(conn)
+                    elif approach == 'csr':
+                        func = lambda: multiply_sparse(A, B)
+                    else:
+                        func = lambda: multiply_auto(A, B)
+
+                    temp_before = server_temp_bytes(conn) if approach in SUITE_SQL_APPROACHES else 0
+                    t = measure(func, repeats)
+                    temp_bytes = server_temp_bytes(conn) - temp_before if approach in SUITE_SQL_APPROACHES else 0
+                    # Eigener Lauf unter tracemalloc (verlangsamt die Ausführung, daher nicht in t)
+                    start = time.perf_counter()
+                    peak = peak_python_memory(func) if approach != 'sparse_persist' else None
+                    t_peak = time.perf_counter() - start
+                    last[approach] = (l, t * repeats + t_peak)
+
+                    # Verifikation per Freivalds in O(nnz): persistiertes Ergebnis in SQL, CSR im Prozess
+                    verified = ""
+                    if approach == 'sparse_persist':
+                        verified = freivalds_sql(conn, "A_sparse", "B_sparse", "C_sparse")
+                    elif approach == 'csr':
+                        verified = freivalds(A, B, multiply_sparse(A, B))
+
+                    rows.append({**row, "seconds": t, "peak_python_mb": round(peak, 2) if peak is not None else "",
+                                 "max_rss_cum_mb": round(max_rss_mb(), 2), "temp_bytes": temp_bytes,
+                                 "verified": verified, "status": "ok"})
+                    print(f"{approach}: {t:.3f}s"
+                          + (f", Python-Spitze {peak:.1f} MB" if peak is not None else "")
+                          + f", maxrss bisher {max_rss_mb():.1f} MB, temp {temp_bytes / 1e6:.1f} MB"
+                          + (f", verifiziert: {verified}" if verified != "" else ""))
+                except psycopg.Error as e:
+                    conn.rollback()
+                    rows.append({**row, "status": "error"})
+                    print(f"{approach}: Fehler ({e})")
+
+            # Zwischenstand schreiben, damit lange Läufe nicht verloren gehen
+            write_suite(rows, path)
+    return rows
+
+def plot_scaling(results, sizes):
+    """
+    Zeichnet den Speedup der parallelen Multiplikation (parallel_multiply.py)
+    gegenüber einem Prozess, eine Kurve pro Matrixgröße.
+    """
+    workers = sorted(results)
+    plt.figure(figsize=(10, 6))
+    for idx, l in enumerate(sizes):
+        base = results[1][idx][1]
+        plt.plot(workers, [base / results[w][idx][1] for w in workers], marker='o', label=f"l={l}")
+    plt.plot(workers, workers, linestyle='--', color='gray', label="ideal")
+    plt.xlabel("Anzahl Prozesse")
+    plt.ylabel("Speedup")
+    plt.title("Skalierung: parallele Matrixmultiplikation (Shared Memory)")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
+
+def run_sql_scaling(conn, sizes, ks, sparsity=0.5, repeats=3, parallel_workers=None):
+    """
+    Lädt für jede Matrixgröße A und B in A_sparse/B_sparse und misst den auf
+    K Verbindungen verteilten Join (parallel_sql.py). Rückgabe: {l: [(K, Laufzeit), ...]}
+    """
+    results = {}
+    for l in sizes:
+        print(f"\n---- Matrixgröße l = {l} ----")
+        A, B = generate_np(l, sparsity)
+        create_tables_sparse(conn)
+        load_sparse(conn, A, B)
+        results[l] = parallel_sql.scaling_benchmark(ks, repeats, parallel_workers)
+    return results
+
+def plot_crossover(results, path=None):
+    """Zeichnet die Laufzeit von multiply_blocked und multiply_strassen (je Cutoff) über l."""
+    plt.figure(figsize=(10, 6))
+    for engine, points in results.items():
+        plt.plot([l for l, _ in points], [t for _, t in points], marker='o', label=engine)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel("Matrixgröße l")
+    plt.ylabel("Laufzeit [s]")
+    plt.title("Dichte Multiplikation: Strassen vs. Kacheln")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    show_or_save(path)
+
+def plot_spmv(results):
+    """Zeichnet die Iterationen pro Sekunde der Potenzmethode (spmv.py) über l."""
+    plt.figure(figsize=(10, 6))
+    for engine, points in results.items():
+        plt.plot([l for l, _ in points], [r for _, r in points], marker='o', label=engine)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel("Matrixgröße l")
+    plt.ylabel("Iterationen pro Sekunde")
+    plt.title("SpMV: Potenzmethode auf A_sparse")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
+
+def plot_sql_scaling(results):
+    """Zeichnet die Wandzeit des parallelen SQL-Joins über der Anzahl Verbindungen K."""
+    plt.figure(figsize=(10, 6))
+    for l, points in results.items():
+        plt.plot([k for k, _ in points], [t for _, t in points], marker='o', label=f"l={l}")
+    plt.xlabel("Anzahl Verbindungen K")
+    plt.ylabel("Wandzeit [s]")
+    plt.title("Skalierung: SQL-Join auf K Verbindungen verteilt")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
     plt.show()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark der Matrixmultiplikation")
+    parser.add_argument('--mode', choices=['approaches', 'scaling', 'sql_scaling', 'chain', 'spmv', 'strassen', 'aggregates', 'suite', 'plot'], default='approaches',
+                        help="approaches: alle Ansätze vergleichen, scaling: parallele Multiplikation über 1..N Prozesse, "
+                             "sql_scaling: SQL-Join auf 1..N Verbindungen verteilt, "
+                             "chain: Kettenmultiplikation optimiert vs. von links nach rechts, "
+                             "spmv: Potenzmethode (SpMV) in Iterationen pro Sekunde, "
+                             "strassen: Crossover von Strassen gegenüber dichter Kachelmultiplikation, "
+                             "aggregates: Zeilen-/Spaltensummen und Top-k ohne vs. mit vollständigem C, "
+                             "suite: große l mit Zeitbudget und Speichermessung (CSV), "
+                             "plot: Plots aus einer gespeicherten CSV der suite")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Maximale Anzahl Prozesse bzw. Verbindungen")
+    parser.add_argument('--parallel-workers', type=int, default=None,
+                        help="max_parallel_workers_per_gather je Verbindung im Modus sql_scaling")
+    parser.add_argument('--budget', type=float, default=60.0, help="Zeitbudget pro Ansatz und l in Sekunden im Modus suite (inkl. aller Wiederholungen)")
+    parser.add_argument('--output', default=SUITE_PATH, help="CSV-Datei der suite")
+    parser.add_argument('--cache-dir', default=matrix_store.CACHE_DIR,
+                        help="Verzeichnis der gespeicherten Operanden im Modus suite")
+    args = parser.parse_args()
+
+    sizes = [32, 64, 128, 256]
+
+    if args.mode == 'plot':
+        results, suite_sizes, suite_sparsities = results_from_csv(args.output)
+        stem = os.path.splitext(args.output)[0]
+        plot_results(results, suite_sizes, suite_sparsities, path=f"{stem}_lines.png")
+        plot_bar_results(results, suite_sizes, suite_sparsities, path=f"{stem}_bars.png")
+        raise SystemExit
+
+    if args.mode == 'strassen':
+        # Bis 4096, damit ein Crossover oberhalb der Cutoffs sichtbar werden kann; der Lauf dauert
+        # einige Minuten, die Abbildung wird daher gespeichert
+        results = dense_multiply.crossover_benchmark([128, 256, 512, 1024, 2048, 3072, 4096], sparsity=0.1)
+        plot_crossover(results, path="strassen_lines.png")
+        raise SystemExit
+
+    if args.mode == 'scaling':
+        results = scaling_benchmark(sizes, sparsity=0.5, max_workers=args.workers)
+        plot_scaling(results, sizes)
+        raise SystemExit
+
     # 1) DB-Verbindung und Setup
     conn = connect_db(dbname=config.DB_NAME, user=config.DB_USER)
-    create_dotproduct_function(conn)
+
+    if args.mode == 'suite':
+        suite_sizes = [256, 512, 1024, 2048, 4096, 8192]
+        suite_sparsities = [0.99, 0.999]
+        create_dotproduct_function(conn)
+        run_suite(conn, suite_sizes, suite_sparsities, time_budget=args.budget, path=args.output,
+                  cache_dir=args.cache_dir)
+        conn.close()
+        results, suite_sizes, suite_sparsities = results_from_csv(args.output)
+        stem = os.path.splitext(args.output)[0]
+        plot_results(results, suite_sizes, suite_sparsities, path=f"{stem}_lines.png")
+        plot_bar_results(results, suite_sizes, suite_sparsities, path=f"{stem}_bars.png")
+        raise SystemExit
+
+    if args.mode == 'spmv':
+        results = spmv.spmv_benchmark(conn, [1000, 10000, 100000], sparsity=0.999)
+        plot_spmv(results)
+        conn.close()
+        raise SystemExit
+
+    if args.mode == 'aggregates':
+        aggregates.aggregate_benchmark(conn, [256, 1024, 4096], sparsity=0.99)
+        conn.close()
+        raise SystemExit
+
+    if args.mode == 'chain':
+        # Ketten aus abwechselnd breiten und schmalen bzw. dichten und dünnen Faktoren
+        for l in sizes:
+            print(f"\n---- Kette mit l = {l} ----")
+            chain.chain_benchmark(conn, dims=[l, l // 8, l, l // 8, l], densities=[0.5, 0.5, 0.5, 0.5])
+            chain.chain_benchmark(conn, dims=[l] * 5, densities=[0.5, 0.5, 0.5, 0.02])
+        conn.close()
+        raise SystemExit
+
+    if args.mode == 'sql_scaling':
+        results = run_sql_scaling(conn, sizes, range(1, args.workers + 1),
+                                  parallel_workers=args.parallel_workers)
+        plot_sql_scaling(results)
+        conn.close()
+        raise SystemExit
+    dot_variants = setup_dotproduct_variants(conn)
+    create_sparse_dotproduct_function(conn)
+    create_tile_functions(conn)
 
     # 2) Benchmark-Parameter
-    sizes = [32, 64, 128, 256]
     sparsities = [0.1, 0.3, 0.5, 0.7, 0.9]
     repeats = 3
+    block_size = 64
 
     # 3) Benchmark durchführen
-    results = run_benchmark(conn, sizes, sparsities, repeats)
+    results = run_benchmark(conn, sizes, sparsities, repeats, block_size, dot_variants)
 
     # 4) Ergebnisse plotten
     plot_results(results, sizes, sparsities)
@@ -0,0 +1,194 @@
+import numpy as np
+from generate import generate_matrix
+from loader import copy_matrix
+from db_multiply import persist_product, fetch_dense
+from phase2_setup import connect_db
+from timing import timed
+import config
+
+# Präfix der Tabellen für Zwischenergebnisse einer Kette
+TEMP_PREFIX = "chain_tmp"
+
+def create_sparse_table(conn, table_name: str):
+    """Erstellt (oder ersetzt) eine Tabelle (i, j, val) in der sparse Darstellung."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {table_name};")
+        cur.execute(f"""
+            CREATE TABLE {table_name} (
+                i   INT,
+                j   INT,
+                val DOUBLE PRECISION
+            );
+        """)
+    conn.commit()
+
+def store_chain(conn, matrices, prefix: str = "M"):
+    """
+    Legt die Matrizen einer Kette als sparse Tabellen M0, M1, ... an und lädt sie per COPY.
+    Rückgabe: Liste von (Tabellenname, Dimension, nnz) je Matrix.
+    """
+    stored = []
+    for k, M in enumerate(matrices):
+        name = f"{prefix}{k}"
+        create_sparse_table(conn, name)
+        stats = copy_matrix(conn, name, M)
+        stored.append((name, M.shape, stats["rows"]))
+    return stored
+
+def estimate_product(shape_a, nnz_a, shape_b, nnz_b):
+    """
+    Schätzt für A (m x l) * B (l x n) unter Annahme gleichverteilter Nicht-Null-Werte:
+     - join:   Anzahl der Tupel des Joins vor GROUP BY, nnz(A) * nnz(B) / l
+     - nnz:    erwartete Nicht-Null-Werte von C, m * n * (1 - (1 - dA * dB)^l)
+    Rückgabe: (join, nnz)
+    """
+    (m, l), (_, n) = shape_a, shape_b
+    if m * l == 0 or l * n == 0:
+        return 0.0, 0.0
+    d_a = nnz_a / (m * l)
+    d_b = nnz_b / (l * n)
+    join = nnz_a * nnz_b / l
+    nnz = m * n * (1.0 - (1.0 - d_a * d_b) ** l)
+    return join, min(nnz, join)
+
+def optimal_order(shapes, nnzs):
+    """
+    Dynamische Programmierung über alle Klammerungen der Kette (wie beim klassischen
+    Matrix-Chain-Problem), Kosten sind aber die geschätzten Join-Tupel statt m * l * n:
+    so werden dünn besetzte Teilprodukte bevorzugt.
+    Rückgabe: (Klammerung als verschachtelte Tupel von Indizes, geschätzte Kosten)
+    """
+    k = len(shapes)
+    cost = [[0.0] * k for _ in range(k)]
+    nnz = [[0.0] * k for _ in range(k)]
+    split = [[None] * k for _ in range(k)]
+    for i in range(k):
+        nnz[i][i] = nnzs[i]
+
+    for length in range(2, k + 1):
+        for i in range(k - length + 1):
+            j = i + length - 1
+            cost[i][j] = float("inf")
+            for s in range(i, j):
+                shape_left = (shapes[i][0], shapes[s][1])
+                shape_right = (shapes[s + 1][0], shapes[j][1])
+                join, est = estimate_product(shape_left, nnz[i][s], shape_right, nnz[s + 1][j])
+                total = cost[i][s] + cost[s + 1][j] + join
+                if total < cost[i][j]:
+                    cost[i][j], nnz[i][j], split[i][j] = total, est, s
+
+    def build(i, j):
+        if i == j:
+            return i
+        s = split[i][j]
+        return (build(i, s), build(s + 1, j))
+
+    return build(0, k - 1), cost[0][k - 1]
+
+def left_to_right_order(k: int):
+    """Klammerung ((M0 M1) M2) ... der Auswertung von links nach rechts."""
+    order = 0
+    for idx in range(1, k):
+        order = (order, idx)
+    return order
+
+def order_cost(order, shapes, nnzs):
+    """Geschätzte Kosten (Join-Tupel) einer gegebenen Klammerung."""
+    def walk(node):
+        if isinstance(node, int):
+            return shapes[node], nnzs[node], 0.0
+        shape_a, nnz_a, cost_a = walk(node[0])
+        shape_b, nnz_b, cost_b = walk(node[1])
+        join, est = estimate_product(shape_a, nnz_a, shape_b, nnz_b)
+        return (shape_a[0], shape_b[1]), est, cost_a + cost_b + join
+    return walk(order)[2]
+
+def format_order(order, names):
+    if isinstance(order, int):
+        return names[order]
+    return f"({format_order(order[0], names)} {format_order(order[1], names)})"
+
+def execute_order(conn, order, names, shapes, target: str = "C_chain"):
+    """
+    Wertet die Klammerung in der Datenbank aus: jedes Teilprodukt wird per Join wie in
+    Ansatz 1 berechnet und als sparse Tabelle (Zwischenergebnis) gespeichert.
+    Zwischentabellen werden nach ihrer Verwendung gelöscht.
+    Rückgabe: (Tabellenname des Ergebnisses, Dimension)
+    """
+    counter = [0]
+
+    def walk(node, table_name=None):
+        if isinstance(node, int):
+            return names[node], shapes[node], False
+        left, shape_left, temp_left = walk(node[0])
+        right, shape_right, temp_right = walk(node[1])
+        if table_name is None:
+            table_name = f"{TEMP_PREFIX}_{counter[0]}"
+            counter[0] += 1
+        persist_product(conn, f"""
+            SELECT L.i, R.j, SUM(L.val * R.val)
+            FROM {left} L
+            JOIN {right} R ON L.j = R.i
+            GROUP BY L.i, R.j
+        """, table_name)
+        with conn.cursor() as cur:
+            for name, temp in ((left, temp_left), (right, temp_right)):
+                if temp:
+                    cur.execute(f"DROP TABLE {name};")
+        conn.commit()
+        return table_name, (shape_left[0], shape_right[1]), True
+
+    if isinstance(order, int):
+        return names[order], shapes[order]
+    table_name, shape, _ = walk(order, target)
+    return table_name, shape
+
+def multiply_chain(conn, stored, optimize: bool = True, target: str = "C_chain"):
+    """
+    Multipliziert die Kette stored (Ausgabe von store_chain) in der Datenbank.
+    optimize=True wählt die Reihenfolge per optimal_order, sonst von links nach rechts.
+    Rückgabe: (Tabellenname des Ergebnisses, Dimension, Klammerung)
+    """
+    names = [name for name, _, _ in stored]
+    shapes = [shape for _, shape, _ in stored]
+    nnzs = [nnz for _, _, nnz in stored]
+    order = optimal_order(shapes, nnzs)[0] if optimize else left_to_right_order(len(stored))
+    table_name, shape = execute_order(conn, order, names, shapes, target)
+    return table_name, shape, order
+
+def generate_chain(dims, densities, seed=None):
+    """
+    Erzeugt eine Kette M0 (dims[0] x dims[1]), M1 (dims[1] x dims[2]), ...
+    mit den Dichten densities (Anteil der Nicht-Null-Werte) je Matrix.
+    """
+    rng = np.random.default_rng(seed)
+    return [generate_matrix(dims[k], dims[k + 1], 1.0 - densities[k], rng) for k in range(len(densities))]
+
+def chain_benchmark(conn, dims, densities, repeats: int = 3, seed=None):
+    """
+    Vergleicht die optimierte Reihenfolge mit der Auswertung von links nach rechts
+    und prüft beide Ergebnisse gegen das NumPy-Produkt der Kette.
+    Rückgabe: {'optimized': Laufzeit, 'left_to_right': Laufzeit}
+    """
+    matrices = generate_chain(dims, densities, seed)
+    stored = store_chain(conn, matrices)
+    names = [name for name, _, _ in stored]
+    shapes = [shape for _, shape, _ in stored]
+    nnzs = [nnz for _, _, nnz in stored]
+    expected = matrices[0]
+    for M in matrices[1:]:
+        expected = expected @ M
+
+    results = {}
+    for label, optimize in (("optimized", True), ("left_to_right", False)):
+        (table_name, shape, order), results[label] = timed(lambda: multiply_chain(conn, stored, optimize), repeats)
+        correct = np.allclose(fetch_dense(conn, table_name, shape), expected)
+        print(f"{label}: {format_order(order, names)} ➞ {results[label]:.3f}s "
+              f"(geschätzte Kosten {order_cost(order, shapes, nnzs):,.0f} Join-Tupel, korrekt: {correct})")
+    return results
+
+if __name__ == "__main__":
+    conn = connect_db(dbname=config.DB_NAME, user=config.DB_USER)
+    # Kette mit einem sehr dünn besetzten letzten Faktor: die Reihenfolge hängt von der Dichte ab
+    chain_benchmark(conn, dims=[200, 200, 200, 200, 200], densities=[0.5, 0.5, 0.5, 0.01])
+    conn.close()
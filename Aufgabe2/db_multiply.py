@@ -1,4 +1,7 @@
+import time
+import numpy as np
 import psycopg
+from loader import decode_triples
 
 def multiply_sql(conn):
     """
@@ -17,3 +20,119 @@ def multiply_sql(conn):
     # Optional: sortieren nach i,j für konsistente Ausgabe (falls gewünscht)
     result.sort(key=lambda x: (x[0], x[1]))
     return result
+
+SQL_SPARSE = """
+    SELECT A_sparse.i, B_sparse.j, SUM(A_sparse.val * B_sparse.val)
+    FROM A_sparse
+    JOIN B_sparse ON A_sparse.j = B_sparse.i
+    GROUP BY A_sparse.i, B_sparse.j
+"""
+
+SQL_VECTOR = """
+    SELECT A_vec.i, B_vec.j, {func}(A_vec.row, B_vec.col)
+    FROM A_vec
+    CROSS JOIN B_vec
+"""
+
+def multiply_sql_sparse(conn):
+    """
+    Ansatz 1: SQL-Join auf sparse Darstellung.
+    """
+    with conn.cursor() as cur:
+        cur.execute(SQL_SPARSE)
+        return cur.fetchall()
+
+def multiply_sql_vector(conn, func: str = "dotproduct"):
+    """
+    Ansatz 2: CROSS JOIN auf Vektor-Tabellen mit UDF dotproduct.
+    func wählt die Implementierung, z.B. dotproduct_sql (siehe benchmark.setup_dotproduct_variants).
+    """
+    with conn.cursor() as cur:
+        cur.execute(SQL_VECTOR.format(func=func))
+        return cur.fetchall()
+
+def multiply_sql_svector(conn):
+    """
+    Ansatz 2 auf komprimierten Vektoren: CROSS JOIN von A_svec und B_svec
+    mit UDF sparse_dotproduct (Merge über die Indexarrays).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT A_svec.i, B_svec.j, sparse_dotproduct(A_svec.idx, A_svec.val, B_svec.idx, B_svec.val)
+            FROM A_svec
+            CROSS JOIN B_svec;
+        """)
+        return cur.fetchall()
+
+# Messwerte für selector.py (geschrieben von benchmark.py): ein Tupel pro Ansatz, l und Sparsity
+CALIBRATION_PATH = "calibration.csv"
+CALIBRATION_FIELDS = ["approach", "m", "l", "n", "nnz_a", "nnz_b", "seconds"]
+
+def persist_product(conn, select_sql: str, target: str = "C"):
+    """
+    Berechnet ein Produkt vollständig im Server: das Ergebnis der Anfrage select_sql
+    (Spalten i, j, Wert) wird per CREATE TABLE ... AS in die Tabelle target geschrieben,
+    ohne Tupel zum Client zu übertragen.
+    Rückgabe: Anzahl der geschriebenen Tupel.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {target};")
+        cur.execute(f"""
+            CREATE TABLE {target} AS
+            SELECT t.i::INT AS i, t.j::INT AS j, t.val::DOUBLE PRECISION AS val
+            FROM ({select_sql.strip().rstrip(';')}) AS t(i, j, val);
+        """)
+        count = cur.rowcount
+    conn.commit()
+    return count
+
+def multiply_sql_persist(conn, target: str = "C"):
+    """Ansatz 1 mit Ergebnis in der Tabelle target (i, j, val) statt als Liste im Client."""
+    return persist_product(conn, """
+        SELECT A.i, B.j, SUM(A.val * B.val)
+        FROM A
+        JOIN B ON A.j = B.i
+        GROUP BY A.i, B.j
+    """, target)
+
+def fetch_dense(conn, table_name: str, shape, method: str = "copy", itersize: int = 10000):
+    """
+    Liest eine Ergebnistabelle (i, j, val) als dichtes NumPy-Array der Form shape.
+    method:
+     - 'copy':   COPY ... TO STDOUT (FORMAT BINARY), dekodiert mit NumPy (decode_triples)
+     - 'cursor': serverseitiger Cursor, der in Blöcken von itersize Tupeln liest
+    """
+    C = np.zeros(shape)
+    if method == "copy":
+        with conn.cursor() as cur:
+            with cur.copy(f"COPY (SELECT i, j, val FROM {table_name}) TO STDOUT (FORMAT BINARY)") as copy:
+                data = b"".join(bytes(block) for block in copy)
+        rows, cols, vals = decode_triples(data)
+        C[rows, cols] = vals
+    else:
+        with conn.cursor(name=f"fetch_{table_name.lower()}") as cur:
+            cur.itersize = itersize
+            cur.execute(f"SELECT i, j, val FROM {table_name};")
+            while True:
+                block = cur.fetchmany(itersize)
+                if not block:
+                    break
+                rows, cols, vals = zip(*block)
+                C[list(rows), list(cols)] = vals
+        conn.commit()
+    return C
+
+def timed_persist_and_fetch(conn, select_sql: str, target: str, shape, method: str = "copy"):
+    """
+    Trennt Berechnung und Übertragung: Laufzeit von persist_product (nur Server)
+    und von fetch_dense (Übertragung in ein NumPy-Array).
+    Rückgabe: (Ergebnismatrix, Rechenzeit, Übertragungszeit).
+    """
+    start = time.perf_counter()
+    persist_product(conn, select_sql, target)
+    t_compute = time.perf_counter() - start
+
+    start = time.perf_counter()
+    C = fetch_dense(conn, target, shape, method)
+    t_transfer = time.perf_counter() - start
+    return C, t_compute, t_transfer
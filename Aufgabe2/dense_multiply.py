@@ -0,0 +1,112 @@
+import numpy as np
+from generate import generate_np
+from timing import measure
+
+# Kantenlänge der Kacheln: drei 64x64-Kacheln (je 32 KB) passen gemeinsam in den L2-Cache
+BLOCK_SIZE = 64
+# Unterhalb dieser Dimension rechnet Strassen nicht weiter rekursiv, sondern blockweise
+STRASSEN_CUTOFF = 128
+
+def multiply_blocked(A, B, block_size: int = BLOCK_SIZE):
+    """
+    Dichte Multiplikation in b x b-Kacheln: C[I, J] += A[I, K] * B[K, J], jedes Kachelprodukt
+    über NumPy. Die Kacheln bleiben im Cache, solange sie über K wiederverwendet werden.
+    Beliebige Dimensionen m x l und l x n, Randkacheln sind entsprechend kleiner.
+    Rückgabe: NumPy-Array C = A * B
+    """
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    m, l = A.shape
+    assert B.shape[0] == l, "DimensionMismatch: Die Spaltenzahl von A entspricht nicht der Zeilenzahl von B."
+    n = B.shape[1]
+    C = np.zeros((m, n))
+    for i in range(0, m, block_size):
+        for k in range(0, l, block_size):
+            A_ik = A[i:i + block_size, k:k + block_size]
+            for j in range(0, n, block_size):
+                C[i:i + block_size, j:j + block_size] += A_ik @ B[k:k + block_size, j:j + block_size]
+    return C
+
+def pad_even(M):
+    """Füllt M mit einer Nullzeile bzw. -spalte auf, falls die Dimension ungerade ist."""
+    m, n = M.shape
+    if m % 2 == 0 and n % 2 == 0:
+        return M
+    return np.pad(M, ((0, m % 2), (0, n % 2)))
+
+def multiply_strassen(A, B, cutoff: int = STRASSEN_CUTOFF, block_size: int = BLOCK_SIZE):
+    """
+    Rekursive Strassen-Multiplikation: 7 statt 8 Teilprodukte je Halbierung von m, l und n.
+    Ungerade Dimensionen (z.B. (l-1) x l * l x (l-1) aus generate) werden je Ebene mit
+    einer Nullzeile/-spalte aufgefüllt und das Ergebnis wieder zugeschnitten.
+    Ist eine Dimension <= cutoff, wird mit multiply_blocked weitergerechnet.
+    Rückgabe: NumPy-Array C = A * B
+    """
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    m, l = A.shape
+    assert B.shape[0] == l, "DimensionMismatch: Die Spaltenzahl von A entspricht nicht der Zeilenzahl von B."
+    n = B.shape[1]
+    if min(m, l, n) <= cutoff:
+        return multiply_blocked(A, B, block_size)
+
+    A, B = pad_even(A), pad_even(B)
+    h_m, h_l, h_n = A.shape[0] // 2, A.shape[1] // 2, B.shape[1] // 2
+    A11, A12, A21, A22 = A[:h_m, :h_l], A[:h_m, h_l:], A[h_m:, :h_l], A[h_m:, h_l:]
+    B11, B12, B21, B22 = B[:h_l, :h_n], B[:h_l, h_n:], B[h_l:, :h_n], B[h_l:, h_n:]
+
+    def rec(X, Y):
+        return multiply_strassen(X, Y, cutoff, block_size)
+
+    M1 = rec(A11 + A22, B11 + B22)
+    M2 = rec(A21 + A22, B11)
+    M3 = rec(A11, B12 - B22)
+    M4 = rec(A22, B21 - B11)
+    M5 = rec(A11 + A12, B22)
+    M6 = rec(A21 - A11, B11 + B12)
+    M7 = rec(A12 - A22, B21 + B22)
+
+    C = np.empty((2 * h_m, 2 * h_n))
+    C[:h_m, :h_n] = M1 + M4 - M5 + M7
+    C[:h_m, h_n:] = M3 + M5
+    C[h_m:, :h_n] = M2 + M4
+    C[h_m:, h_n:] = M1 - M2 + M3 + M6
+    return C[:m, :n]
+
+def crossover_benchmark(sizes, cutoffs=(64, 128, 256), sparsity: float = 0.1, repeats: int = 3,
+                        block_size: int = BLOCK_SIZE):
+    """
+    Vergleicht multiply_strassen (für mehrere cutoffs) mit multiply_blocked auf Matrizen
+    aus generate_np (l-1 x l und l x l-1) und gibt je cutoff den Crossover aus, d.h. das
+    kleinste l, ab dem Strassen bei allen größeren gemessenen l schneller bleibt.
+    Rückgabe: {'blocked': [(l, Laufzeit), ...], 'strassen_<cutoff>': [...], ...}
+    """
+    results = {"blocked": []}
+    results.update({f"strassen_{c}": [] for c in cutoffs})
+
+    for l in sizes:
+        A, B = generate_np(l, sparsity)
+        results["blocked"].append((l, measure(lambda: multiply_blocked(A, B, block_size), repeats)))
+        line = f"l = {l}: blocked {results['blocked'][-1][1]:.4f}s"
+        for c in cutoffs:
+            C = multiply_strassen(A, B, c, block_size)
+            assert np.allclose(C, A @ B), f"Strassen (cutoff {c}) liefert ein falsches Ergebnis"
+            results[f"strassen_{c}"].append((l, measure(lambda: multiply_strassen(A, B, c, block_size), repeats)))
+            line += f", Strassen (cutoff {c}) {results[f'strassen_{c}'][-1][1]:.4f}s"
+        print(line)
+
+    for c in cutoffs:
+        # Von der größten Matrix abwärts, bis Strassen erstmals nicht schneller ist
+        crossover = "nicht erreicht"
+        for (l, t_s), (_, t_b) in reversed(list(zip(results[f"strassen_{c}"], results["blocked"]))):
+            if t_s >= t_b:
+                break
+            crossover = f"ab l = {l}"
+        print(f"Crossover Strassen (cutoff {c}) vs. blocked: {crossover}")
+    return results
+
+if __name__ == "__main__":
+    A, B = generate_np(301, 0.2)
+    print("Blocked korrekt:", np.allclose(multiply_blocked(A, B), A @ B))
+    print("Strassen korrekt:", np.allclose(multiply_strassen(A, B, cutoff=32), A @ B))
+    crossover_benchmark([256, 512, 1024])
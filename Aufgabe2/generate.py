@@ -1,35 +1,100 @@
-import random
+import numpy as np
 
-def generate(l: int, sparsity: float):
+def generate_matrix(rows: int, cols: int, sparsity: float, rng=None):
+    """
+    Erzeugt eine dichte NumPy-Matrix (rows x cols), deren Einträge mit Wahrscheinlichkeit
+    sparsity Null sind. Nicht-Null-Werte liegen zwischen 1.0 und 10.0 (2 Nachkommastellen).
+    Alle Einträge werden vektorisiert über eine Zufallsmaske gesetzt.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    M = np.round(rng.uniform(1.0, 10.0, size=(rows, cols)), 2)
+    M[rng.random((rows, cols)) < sparsity] = 0.0
+    return M
+
+def generate_np(l: int, sparsity: float, seed=None):
     """
     Erzeugt zwei Matrizen A und B mit gegebenem sparsity-Anteil an Nullwerten.
     - Dimensionen: A ist (m x l) und B ist (l x n), wobei m = l-1 und n = l-1.
     - sparsity: Anteil der Einträge, die Null sein sollen (Wertebereich 0 bis 1).
-    Rückgabe: Tupel (A, B) mit A und B als 2D-Listen (List of Lists).
+    - seed: optionaler Seed für reproduzierbare Matrizen.
+    Rückgabe: Tupel (A, B) als NumPy-Arrays (float64).
     """
-    # Berechne m und n aus l (m+1 = l = n+1)
+    rng = np.random.default_rng(seed)
     m = l - 1  # Zeilenanzahl von A
     n = l - 1  # Spaltenanzahl von B
-    # Initialisiere A und B mit Nullen
-    A = [[0 for _ in range(l)] for _ in range(m)]
-    B = [[0 for _ in range(n)] for _ in range(l)]
-    # Fülle Matrix A
-    for i in range(m):
-        for j in range(l):
-            # Erzeuge einen Wert ungleich 0 mit Wahrscheinlichkeit (1 - sparsity)
-            if random.random() >= sparsity:
-                # Zufälligen Double-Wert erzeugen (hier z.B. zwischen 1.0 und 10.0)
-                value = random.uniform(1.0, 10.0)
-                # Optional: auf 2 Nachkommastellen runden für Übersichtlichkeit
-                A[i][j] = round(value, 2)
-            else:
-                A[i][j] = 0.0  # mit gegebener Wahrscheinlichkeit sparsity -> Null
-    # Fülle Matrix B
-    for i in range(l):
-        for j in range(n):
-            if random.random() >= sparsity:
-                value = random.uniform(1.0, 10.0)
-                B[i][j] = round(value, 2)
-            else:
-                B[i][j] = 0.0
+    A = generate_matrix(m, l, sparsity, rng)
+    B = generate_matrix(l, n, sparsity, rng)
     return A, B
+
+def to_coo(M):
+    """
+    COO-Tripel (SciPy-Stil) einer dichten Matrix: (rows, cols, vals) als NumPy-Arrays,
+    passend für die Tabellen A_sparse/B_sparse (i, j, val).
+    """
+    M = np.asarray(M, dtype=np.float64)
+    rows, cols = np.nonzero(M)
+    return rows, cols, M[rows, cols]
+
+def to_tiles(M, b: int):
+    """
+    Zerlegt M in b×b-Kacheln (Ränder mit Nullen aufgefüllt), passend für A_tile/B_tile.
+    Kacheln ohne Nicht-Null-Wert werden ausgelassen.
+    Rückgabe: (bi, bj, tiles) mit tiles als Array der Form (Anzahl, b*b), zeilenweise.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    mb = -(-M.shape[0] // b)
+    nb = -(-M.shape[1] // b)
+    padded = np.zeros((mb * b, nb * b))
+    padded[:M.shape[0], :M.shape[1]] = M
+    tiles = padded.reshape(mb, b, nb, b).swapaxes(1, 2).reshape(mb, nb, b * b)
+    bi, bj = np.nonzero(tiles.any(axis=2))
+    return bi, bj, tiles[bi, bj]
+
+def from_tiles(bi, bj, tiles, shape, b: int):
+    """Setzt Kacheln (z.B. das Ergebnis von multiply_sql_tiled) zu einer dichten Matrix der Form shape zusammen."""
+    mb = -(-shape[0] // b)
+    nb = -(-shape[1] // b)
+    padded = np.zeros((mb, nb, b, b))
+    padded[np.asarray(bi, dtype=np.int64), np.asarray(bj, dtype=np.int64)] = np.asarray(tiles, dtype=np.float64).reshape(-1, b, b)
+    return padded.swapaxes(1, 2).reshape(mb * b, nb * b)[:shape[0], :shape[1]]
+
+def generate_coo(l: int, sparsity: float, seed=None):
+    """
+    Wie generate_np, liefert aber direkt die COO-Tripel von A und B.
+    Rückgabe: ((rows_A, cols_A, vals_A), (rows_B, cols_B, vals_B)).
+    """
+    A, B = generate_np(l, sparsity, seed)
+    return to_coo(A), to_coo(B)
+
+def unique_sorted(keys):
+    """Sortierte, eindeutige Werte; bei großen Arrays schneller als np.unique."""
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+def generate_sparse_coo(rows: int, cols: int, sparsity: float, seed=None):
+    """
+    Erzeugt eine sehr dünn besetzte Matrix (rows x cols) direkt als COO-Tripel, ohne die
+    dichte Matrix anzulegen (z.B. l = 100000 bei sparsity >= 0.99). Es werden
+    rows * cols * (1 - sparsity) verschiedene Positionen gezogen, Werte wie in generate_matrix.
+    Rückgabe: (rows, cols, vals) zeilenweise sortiert.
+    """
+    rng = np.random.default_rng(seed)
+    total = rows * cols
+    nnz = int(round(total * (1.0 - sparsity)))
+    # Positionen ziehen, Duplikate entfernen und nachziehen, bis nnz verschiedene vorliegen
+    keys = unique_sorted(rng.integers(0, total, size=nnz, dtype=np.int64))
+    while len(keys) < nnz:
+        extra = rng.integers(0, total, size=nnz - len(keys), dtype=np.int64)
+        keys = unique_sorted(np.concatenate([keys, extra]))
+    vals = np.round(rng.uniform(1.0, 10.0, size=nnz), 2)
+    return keys // cols, keys % cols, vals
+
+def generate(l: int, sparsity: float):
+    """
+    Erzeugt zwei Matrizen A und B mit gegebenem sparsity-Anteil an Nullwerten.
+    - Dimensionen: A ist (m x l) und B ist (l x n), wobei m = l-1 und n = l-1.
+    - sparsity: Anteil der Einträge, die Null sein sollen (Wertebereich 0 bis 1).
+    Rückgabe: Tupel (A, B) mit A und B als 2D-Listen (List of Lists).
+    """
+    A, B = generate_np(l, sparsity)
+    return A.tolist(), B.tolist()
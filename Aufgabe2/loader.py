@@ -0,0 +1,275 @@
+import struct
+import time
+import numpy as np
+from generate import to_coo, to_tiles
+
+# Rahmen des binären COPY-Formats von PostgreSQL (Signatur, Flags, Länge der Header-Erweiterung)
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+# OID des Elementtyps DOUBLE PRECISION (float8) für binär kodierte Arrays
+FLOAT8_OID = 701
+
+# Obergrenze für die Größe eines auf einmal kodierten Blocks
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Binäres Tupel (i INT, j INT, val DOUBLE PRECISION): Feldanzahl, dann je Feld Länge + Wert (Big Endian)
+TRIPLE_DTYPE = np.dtype([
+    ("nfields", ">i2"),
+    ("len_i", ">i4"), ("i", ">i4"),
+    ("len_j", ">i4"), ("j", ">i4"),
+    ("len_val", ">i4"), ("val", ">f8"),
+])
+
+def decode_triples(data: bytes):
+    """
+    Liest die Ausgabe von COPY (SELECT i, j, val ...) TO STDOUT (FORMAT BINARY) ohne Python-Schleife.
+    Voraussetzung: Spaltentypen INT, INT, DOUBLE PRECISION und keine NULL-Werte.
+    Rückgabe: (rows, cols, vals) als NumPy-Arrays.
+    """
+    body = memoryview(data)[len(PGCOPY_HEADER):len(data) - len(PGCOPY_TRAILER)]
+    buf = np.frombuffer(body, dtype=TRIPLE_DTYPE)
+    if len(buf) and not ((buf["nfields"] == 3).all() and (buf["len_val"] == 8).all()):
+        raise ValueError("COPY-Ausgabe entspricht nicht (INT, INT, DOUBLE PRECISION) ohne NULL-Werte")
+    return buf["i"].astype(np.int64), buf["j"].astype(np.int64), buf["val"].astype(np.float64)
+
+def array_row_dtype(l: int):
+    """
+    Binäres Tupel (key INT, arr DOUBLE PRECISION[l]). Ein eindimensionales Array besteht aus
+    ndim, hasnull, Elementtyp, Dimensionsgröße, Untergrenze und l Paaren (Länge, Wert).
+    """
+    return np.dtype([
+        ("nfields", ">i2"),
+        ("len_key", ">i4"), ("key", ">i4"),
+        ("len_arr", ">i4"),
+        ("ndim", ">i4"), ("hasnull", ">i4"), ("elemtype", ">i4"),
+        ("dim", ">i4"), ("lbound", ">i4"),
+        ("elems", [("len", ">i4"), ("v", ">f8")], (l,)),
+    ])
+
+def encode_triples(rows, cols, vals):
+    """Kodiert COO-Tripel vektorisiert als binäre COPY-Tupel (ohne Header/Trailer)."""
+    buf = np.empty(len(vals), dtype=TRIPLE_DTYPE)
+    buf["nfields"] = 3
+    buf["len_i"] = 4
+    buf["i"] = rows
+    buf["len_j"] = 4
+    buf["j"] = cols
+    buf["len_val"] = 8
+    buf["val"] = vals
+    return buf.tobytes()
+
+def encode_arrays(keys, M):
+    """Kodiert die Zeilen von M als (key, DOUBLE PRECISION[])-Tupel (ohne Header/Trailer)."""
+    M = np.asarray(M, dtype=np.float64)
+    l = M.shape[1]
+    buf = np.empty(M.shape[0], dtype=array_row_dtype(l))
+    buf["nfields"] = 2
+    buf["len_key"] = 4
+    buf["key"] = keys
+    buf["len_arr"] = 20 + 12 * l
+    buf["ndim"] = 1
+    buf["hasnull"] = 0
+    buf["elemtype"] = FLOAT8_OID
+    buf["dim"] = l
+    buf["lbound"] = 1
+    buf["elems"]["len"] = 8
+    buf["elems"]["v"] = M
+    return buf.tobytes()
+
+def tile_row_dtype(size: int):
+    """Binäres Tupel (bi INT, bj INT, tile DOUBLE PRECISION[size]) für A_tile/B_tile."""
+    return np.dtype([
+        ("nfields", ">i2"),
+        ("len_bi", ">i4"), ("bi", ">i4"),
+        ("len_bj", ">i4"), ("bj", ">i4"),
+        ("len_arr", ">i4"),
+        ("ndim", ">i4"), ("hasnull", ">i4"), ("elemtype", ">i4"),
+        ("dim", ">i4"), ("lbound", ">i4"),
+        ("elems", [("len", ">i4"), ("v", ">f8")], (size,)),
+    ])
+
+def encode_tiles(bi, bj, tiles):
+    """Kodiert Kacheln als (bi, bj, DOUBLE PRECISION[])-Tupel (ohne Header/Trailer)."""
+    tiles = np.asarray(tiles, dtype=np.float64)
+    size = tiles.shape[1]
+    buf = np.empty(tiles.shape[0], dtype=tile_row_dtype(size))
+    buf["nfields"] = 3
+    buf["len_bi"] = 4
+    buf["bi"] = bi
+    buf["len_bj"] = 4
+    buf["bj"] = bj
+    buf["len_arr"] = 20 + 12 * size
+    buf["ndim"] = 1
+    buf["hasnull"] = 0
+    buf["elemtype"] = FLOAT8_OID
+    buf["dim"] = size
+    buf["lbound"] = 1
+    buf["elems"]["len"] = 8
+    buf["elems"]["v"] = tiles
+    return buf.tobytes()
+
+def drop_indexes(cur, table_name: str):
+    """
+    Entfernt Indizes und PRIMARY KEY/UNIQUE-Constraints der Tabelle vor dem Laden.
+    Rückgabe: SQL-Anweisungen, mit denen restore_indexes sie wieder anlegt.
+    """
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u');
+    """, (table_name,))
+    constraints = cur.fetchall()
+    constraint_names = [name for name, _ in constraints]
+
+    cur.execute("""
+        SELECT indexname, indexdef
+        FROM pg_indexes
+        WHERE tablename = %s AND NOT (indexname = ANY(%s));
+    """, (table_name.lower(), constraint_names))
+    indexes = cur.fetchall()
+
+    restore = []
+    for name, definition in constraints:
+        cur.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT {name};")
+        restore.append(f"ALTER TABLE {table_name} ADD CONSTRAINT {name} {definition};")
+    for name, definition in indexes:
+        cur.execute(f"DROP INDEX {name};")
+        restore.append(definition + ";")
+    return restore
+
+def restore_indexes(cur, restore):
+    for statement in restore:
+        cur.execute(statement)
+
+def copy_binary(conn, table_name: str, columns, chunks):
+    """
+    Streamt bereits kodierte Tupel per COPY ... FROM STDIN (FORMAT BINARY) in die Tabelle.
+    Indizes werden vorher entfernt und danach neu aufgebaut, anschließend wird ANALYZE ausgeführt.
+    Rückgabe: Dictionary mit Zeilen, Bytes und Zeiten für Laden und Indexaufbau.
+    """
+    stats = {"table": table_name, "rows": 0, "bytes": 0}
+    with conn.cursor() as cur:
+        restore = drop_indexes(cur, table_name)
+
+        start = time.perf_counter()
+        with cur.copy(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.write(PGCOPY_HEADER)
+            for n_rows, data in chunks:
+                copy.write(data)
+                stats["rows"] += n_rows
+                stats["bytes"] += len(data)
+            copy.write(PGCOPY_TRAILER)
+        stats["load_time"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        restore_indexes(cur, restore)
+        cur.execute(f"ANALYZE {table_name};")
+        stats["index_time"] = time.perf_counter() - start
+    conn.commit()
+    return stats
+
+def copy_rows(conn, table_name: str, columns, types, rows):
+    """
+    Wie copy_binary, aber für Tupel variabler Länge (z.B. Arrays unterschiedlicher Größe):
+    psycopg kodiert die Zeilen anhand der angegebenen Postgres-Typen selbst.
+    """
+    stats = {"table": table_name, "rows": 0, "bytes": 0}
+    with conn.cursor() as cur:
+        restore = drop_indexes(cur, table_name)
+
+        start = time.perf_counter()
+        with cur.copy(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.set_types(types)
+            for row in rows:
+                copy.write_row(row)
+                stats["rows"] += 1
+        stats["load_time"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        restore_indexes(cur, restore)
+        cur.execute(f"ANALYZE {table_name};")
+        stats["index_time"] = time.perf_counter() - start
+    conn.commit()
+    return stats
+
+def copy_triples(conn, table_name: str, rows, cols, vals):
+    """Lädt COO-Tripel (i, j, val) per binärem COPY, z.B. in A_sparse/B_sparse."""
+    rows, cols, vals = np.asarray(rows), np.asarray(cols), np.asarray(vals, dtype=np.float64)
+    step = max(1, CHUNK_BYTES // TRIPLE_DTYPE.itemsize)
+
+    def chunks():
+        for start in range(0, len(vals), step):
+            end = start + step
+            yield len(vals[start:end]), encode_triples(rows[start:end], cols[start:end], vals[start:end])
+
+    return copy_binary(conn, table_name, ("i", "j", "val"), chunks())
+
+def copy_matrix(conn, table_name: str, M):
+    """Lädt alle Nicht-Null-Werte einer 2D-Liste oder eines NumPy-Arrays als (i, j, val)."""
+    return copy_triples(conn, table_name, *to_coo(M))
+
+def copy_arrays(conn, table_name: str, key_column: str, array_column: str, M):
+    """Lädt die Zeilen von M als (key, DOUBLE PRECISION[]), z.B. in A_vec/B_vec."""
+    M = np.asarray(M, dtype=np.float64)
+    step = max(1, CHUNK_BYTES // array_row_dtype(M.shape[1]).itemsize)
+
+    def chunks():
+        for start in range(0, M.shape[0], step):
+            block = M[start:start + step]
+            yield block.shape[0], encode_arrays(np.arange(start, start + block.shape[0]), block)
+
+    return copy_binary(conn, table_name, (key_column, array_column), chunks())
+
+def copy_tiles(conn, table_name: str, M, b: int):
+    """Zerlegt M in b×b-Kacheln und lädt die nicht leeren als (bi, bj, tile), z.B. in A_tile/B_tile."""
+    bi, bj, tiles = to_tiles(M, b)
+    step = max(1, CHUNK_BYTES // tile_row_dtype(b * b).itemsize)
+
+    def chunks():
+        for start in range(0, len(bi), step):
+            end = start + step
+            yield len(bi[start:end]), encode_tiles(bi[start:end], bj[start:end], tiles[start:end])
+
+    return copy_binary(conn, table_name, ("bi", "bj", "tile"), chunks())
+
+def copy_sparse_arrays(conn, table_name: str, key_column: str, M):
+    """Lädt die Zeilen von M komprimiert als (key, idx INT[], val DOUBLE PRECISION[]), z.B. in A_svec/B_svec."""
+    M = np.asarray(M, dtype=np.float64)
+    rows, cols, vals = to_coo(M)
+    # Grenzen der Zeilen in den (zeilenweise sortierten) COO-Tripeln
+    bounds = np.searchsorted(rows, np.arange(M.shape[0] + 1))
+
+    def tuples():
+        for key in range(M.shape[0]):
+            start, end = bounds[key], bounds[key + 1]
+            yield key, cols[start:end].tolist(), vals[start:end].tolist()
+
+    return copy_rows(conn, table_name, (key_column, "idx", "val"), ["int4", "int4[]", "float8[]"], tuples())
+
+def report(stats):
+    """Gibt den Ladedurchsatz einer copy_*-Operation aus."""
+    load_time = max(stats["load_time"], 1e-9)
+    # copy_rows kodiert über psycopg und kennt daher keine Bytezahl
+    throughput = f", {stats['bytes'] / load_time / 1e6:.1f} MB/s" if stats["bytes"] else ""
+    print(f"{stats['table']}: {stats['rows']} Zeilen in {stats['load_time']:.3f}s "
+          f"({stats['rows'] / load_time:,.0f} Zeilen/s{throughput}), "
+          f"Indizes {stats['index_time']:.3f}s")
+
+def load_sparse(conn, A, B):
+    """Binäres Gegenstück zu insert_sparse: lädt A und B in A_sparse/B_sparse."""
+    return [copy_matrix(conn, "A_sparse", A), copy_matrix(conn, "B_sparse", B)]
+
+def load_vector(conn, A, B):
+    """Binäres Gegenstück zu insert_vector: Zeilen von A nach A_vec, Spalten von B nach B_vec."""
+    return [copy_arrays(conn, "A_vec", "i", "row", A),
+            copy_arrays(conn, "B_vec", "j", "col", np.asarray(B, dtype=np.float64).T)]
+
+def load_svector(conn, A, B):
+    """Komprimierte Vektoren: Zeilen von A nach A_svec, Spalten von B nach B_svec."""
+    return [copy_sparse_arrays(conn, "A_svec", "i", A),
+            copy_sparse_arrays(conn, "B_svec", "j", np.asarray(B, dtype=np.float64).T)]
+
+def load_tiled(conn, A, B, b: int):
+    """Lädt A und B als b×b-Kacheln in A_tile/B_tile."""
+    return [copy_tiles(conn, "A_tile", A, b), copy_tiles(conn, "B_tile", B, b)]
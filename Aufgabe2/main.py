@@ -1,7 +1,8 @@
 from generate import generate
 from matrix import connect_db, create_tables, insert_matrix
 from multiply import multiply_naive
-from db_multiply import multiply_sql
+from db_multiply import multiply_sql, multiply_sql_persist
+from verify import freivalds, freivalds_sql
 import config
 
 
@@ -80,18 +81,21 @@ if __name__ == "__main__":
     C_rand_naive = multiply_naive(A_rand, B_rand)
     result_rand_sql = multiply_sql(conn)
     # (Optional: könnten hier z.B. die Anzahl Nicht-Null-Werte oder Dauer messen)
-    # Ergebnismatrizen vergleichen
-    # Konvertiere SQL-Ergebnis in dichte Matrix für Vergleich
-    m2 = len(A_rand)
-    n2 = len(B_rand[0])
-    C_rand_sql_matrix = [[0.0 for _ in range(n2)] for _ in range(m2)]
-    for (i, j, val) in result_rand_sql:
-        C_rand_sql_matrix[i][j] = val
+    # Ergebnisse mit Freivalds' Test prüfen (A·(B·r) gegen C·r, mit Toleranz),
+    # ohne das SQL-Ergebnis in eine dichte Matrix umzuwandeln
     print(f"\nZufälliger Test mit l={l}, sparsity={sparsity}: Vergleich der Resultate...")
-    if C_rand_naive == C_rand_sql_matrix:
-        print("Erfolg: Beide Ansätze liefern identische Ergebnisse für das zufällige Beispiel.")
+    if freivalds(A_rand, B_rand, C_rand_naive) and freivalds(A_rand, B_rand, result_rand_sql):
+        print("Erfolg: Beide Ansätze liefern korrekte Ergebnisse für das zufällige Beispiel.")
     else:
         print("Fehler: Die Ergebnisse unterscheiden sich!")
         # (Bei korrekter Implementierung sollte dieser Fall nicht eintreten.)
+
+    # Ansatz 1 ohne Übertragung der Tupel: Ergebnis im Server in Tabelle C ablegen
+    # und dort gegen A und B prüfen
+    multiply_sql_persist(conn, "C")
+    if freivalds_sql(conn, "A", "B", "C"):
+        print("Erfolg: Das in Tabelle C gespeicherte Ergebnis ist korrekt (Freivalds in SQL).")
+    else:
+        print("Fehler: Tabelle C weicht von A * B ab!")
     # Verbindung schließen
     conn.close()
@@ -1,4 +1,5 @@
 import psycopg
+from loader import copy_matrix
 
 
 def connect_db(dbname: str, user: str):
@@ -39,17 +40,7 @@ def insert_matrix(conn, table_name: str, matrix: list):
     """
     Fügt alle Nicht-Null-Werte der gegebenen Matrix in die angegebene Tabelle ein.
     - table_name: Name der Zieltabelle ('A' oder 'B').
-    - matrix: 2D-Liste mit Matrixwerten.
+    - matrix: 2D-Liste oder NumPy-Array mit Matrixwerten.
+    Die Tupel werden per binärem COPY geladen (siehe loader.py).
     """
-    with conn.cursor() as cur:
-        rows = []
-        for i, row in enumerate(matrix):
-            for j, val in enumerate(row):
-                if val != 0 and val is not None:
-                    # Nur Nicht-Null-Werte einfügen
-                    rows.append((i, j, float(val)))
-        cur.executemany(
-            f"INSERT INTO {table_name} (i, j, val) VALUES (%s, %s, %s);",
-            rows
-        )
-    conn.commit()
+    copy_matrix(conn, table_name, matrix)
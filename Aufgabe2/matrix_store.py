@@ -0,0 +1,69 @@
+import os
+import struct
+import numpy as np
+from generate import generate_sparse_coo
+from sparse_multiply import CSRMatrix, csr_from_triples
+from loader import copy_triples
+
+# Dateiformat: fester Header, danach indptr (int64, m+1), indices (int64, nnz), data (float64, nnz),
+# alles Little Endian und ohne Lücken, damit die Arrays direkt per numpy.memmap gelesen werden können
+MAGIC = b"CSRMAT01"
+HEADER = struct.Struct("<8sqqq")  # Kennung, m, n, nnz
+HEADER_SIZE = 64
+
+# Standardverzeichnis für zwischengespeicherte Operanden
+CACHE_DIR = "matrix_cache"
+
+def save_csr(path: str, A: CSRMatrix):
+    """Schreibt eine CSR-Matrix im Format oben (Header + CSR-Arrays)."""
+    m, n = A.shape
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, m, n, A.nnz).ljust(HEADER_SIZE, b"\0"))
+        f.write(np.ascontiguousarray(A.indptr, dtype="<i8").tobytes())
+        f.write(np.ascontiguousarray(A.indices, dtype="<i8").tobytes())
+        f.write(np.ascontiguousarray(A.data, dtype="<f8").tobytes())
+
+def open_csr(path: str, mode: str = "r"):
+    """
+    Öffnet eine gespeicherte CSR-Matrix ohne sie einzulesen: indptr, indices und data
+    sind numpy.memmap-Sichten auf die Datei, das Betriebssystem lädt nur benötigte Seiten.
+    """
+    with open(path, "rb") as f:
+        magic, m, n, nnz = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} ist keine gespeicherte CSR-Matrix")
+    offset = HEADER_SIZE
+    indptr = np.memmap(path, dtype="<i8", mode=mode, offset=offset, shape=(m + 1,))
+    offset += indptr.nbytes
+    indices = np.memmap(path, dtype="<i8", mode=mode, offset=offset, shape=(nnz,)) if nnz else np.zeros(0, dtype=np.int64)
+    offset += 8 * nnz
+    data = np.memmap(path, dtype="<f8", mode=mode, offset=offset, shape=(nnz,)) if nnz else np.zeros(0)
+    # CSRMatrix übernimmt Arrays passenden Typs ohne Kopie
+    return CSRMatrix(indptr, indices, data, (m, n))
+
+def cache_path(name: str, directory: str = CACHE_DIR):
+    return os.path.join(directory, f"{name}.csr")
+
+def cached_operands(l: int, sparsity: float, seed: int = 0, directory: str = CACHE_DIR):
+    """
+    Liefert A ((l-1) x l) und B (l x (l-1)) wie generate_np, aber als CSR direkt aus dem Cache.
+    Beim ersten Aufruf werden sie als COO erzeugt (ohne dichte Matrix) und gespeichert,
+    spätere Benchmarkläufe öffnen die Dateien nur noch per memmap.
+    """
+    os.makedirs(directory, exist_ok=True)
+    operands = []
+    for name, shape, offset in (("A", (l - 1, l), 0), ("B", (l, l - 1), 1)):
+        path = cache_path(f"{name}_l{l}_s{sparsity:g}_seed{seed}", directory)
+        if not os.path.exists(path):
+            rows, cols, vals = generate_sparse_coo(*shape, sparsity, seed=seed * 2 + offset)
+            save_csr(path, csr_from_triples(rows, cols, vals, shape))
+        operands.append(open_csr(path))
+    return tuple(operands)
+
+def copy_csr(conn, table_name: str, A: CSRMatrix):
+    """Lädt eine (gespeicherte) CSR-Matrix als (i, j, val) per binärem COPY, ohne dichte Matrix."""
+    return copy_triples(conn, table_name, A.row_ids(), A.indices, A.data)
+
+def load_sparse_csr(conn, A: CSRMatrix, B: CSRMatrix):
+    """Wie loader.load_sparse, aber aus CSR-Matrizen (z.B. aus cached_operands)."""
+    return [copy_csr(conn, "A_sparse", A), copy_csr(conn, "B_sparse", B)]
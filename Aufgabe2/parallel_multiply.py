@@ -0,0 +1,181 @@
+import os
+import numpy as np
+from multiprocessing import get_context, resource_tracker, shared_memory
+from generate import generate_np
+from multiply import multiply_naive
+from timing import measure
+
+# Umgebungsvariablen, über die OpenBLAS/MKL/OpenMP beim Laden von NumPy ihre Threadzahl lesen
+BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+def to_shared(M):
+    """
+    Legt ein Shared-Memory-Segment in der Größe von M an und kopiert M hinein.
+    Rückgabe: (Segment, NumPy-Sicht auf das Segment).
+    """
+    M = np.asarray(M, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(M.nbytes, 1))
+    view = np.ndarray(M.shape, dtype=np.float64, buffer=shm.buf)
+    view[:] = M
+    return shm, view
+
+def _init_worker():
+    """
+    Vor Python 3.13 meldet SharedMemory auch bloß geöffnete Segmente beim resource_tracker an,
+    der sie dann doppelt freigeben würde. Eigentümer der Segmente ist der aufrufende Prozess,
+    daher wird die Anmeldung in den Workern abgeschaltet.
+    """
+    resource_tracker.register = lambda name, rtype: None
+
+def _multiply_block(task):
+    """
+    Worker: berechnet die Zeilen start..end-1 von C = A * B und schreibt sie direkt
+    in das gemeinsame Ergebnis-Array. Übertragen werden nur Segmentnamen und Grenzen.
+    """
+    (a_name, a_shape), (b_name, b_shape), (c_name, c_shape), start, end, kernel = task
+    segments = [shared_memory.SharedMemory(name=name) for name in (a_name, b_name, c_name)]
+    try:
+        A, B, C = (np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+                   for shm, shape in zip(segments, (a_shape, b_shape, c_shape)))
+        if kernel == "naive":
+            C[start:end] = multiply_naive(A[start:end].tolist(), B.tolist())
+        else:
+            np.matmul(A[start:end], B, out=C[start:end])
+        # Sichten freigeben, bevor die Segmente geschlossen werden
+        del A, B, C
+    finally:
+        for shm in segments:
+            shm.close()
+    return end - start
+
+def row_blocks(m: int, workers: int, block_rows=None):
+    """Zerlegt die Zeilen 0..m-1 in zusammenhängende Blöcke (Standard: 4 Blöcke pro Worker)."""
+    if block_rows is None:
+        block_rows = max(1, -(-m // (4 * workers)))
+    return [(start, min(start + block_rows, m)) for start in range(0, m, block_rows)]
+
+class SharedOperand:
+    """
+    Von ParallelMultiplier.share() in Shared Memory abgelegter Operand. Nach außen gibt es
+    nur Segment und Form, keine Sicht auf den Speicher; er ist gültig bis zum close() des Pools.
+    """
+
+    def __init__(self, M):
+        self.shm, view = to_shared(M)
+        self.shape = view.shape
+
+class ParallelMultiplier:
+    """
+    Prozess-Pool für C = A * B: A, B und C liegen in Shared Memory, die Worker
+    berechnen zeilenweise Blöcke von C. Der Pool bleibt über mehrere Multiplikationen bestehen.
+    Gewöhnliche Arrays werden bei jedem multiply in Shared Memory kopiert, mit share()
+    abgelegte Operanden (SharedOperand) nicht.
+    kernel: 'numpy' (Block-Produkt über NumPy) oder 'naive' (multiply_naive pro Block wie Ansatz 0).
+    """
+
+    def __init__(self, workers=None, kernel: str = "numpy"):
+        self.workers = workers or os.cpu_count()
+        self.kernel = kernel
+        self.shared = []
+        # Die Worker werden per spawn gestartet und laden NumPy neu, mit BLAS auf einem Thread.
+        # Sonst rechnet jeder der w Prozesse mit allen Kernen und der Speedup misst Überbelegung.
+        saved = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+        os.environ.update({var: "1" for var in BLAS_THREAD_VARS})
+        try:
+            self.pool = get_context("spawn").Pool(self.workers, initializer=_init_worker)
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var)
+                else:
+                    os.environ[var] = value
+
+    def share(self, M):
+        """
+        Legt M einmalig in Shared Memory ab. Der zurückgegebene SharedOperand kann multiply
+        beliebig oft ohne erneute Kopie übergeben werden, bis close() ihn freigibt.
+        """
+        operand = SharedOperand(M)
+        self.shared.append(operand)
+        return operand
+
+    @staticmethod
+    def segment(M, segments):
+        """Segment mit dem Inhalt von M: das des SharedOperand oder eine neue Kopie."""
+        if isinstance(M, SharedOperand):
+            return M.shm
+        shm, _ = to_shared(M)
+        segments.append(shm)
+        return shm
+
+    def multiply(self, A, B, block_rows=None):
+        """A und B: Arrays (bzw. Listen) oder SharedOperand. Rückgabe: NumPy-Array C der Dimension m x n."""
+        A = A if isinstance(A, SharedOperand) else np.asarray(A, dtype=np.float64)
+        B = B if isinstance(B, SharedOperand) else np.asarray(B, dtype=np.float64)
+        m, l = A.shape
+        assert B.shape[0] == l, "DimensionMismatch: Die Spaltenzahl von A entspricht nicht der Zeilenzahl von B."
+        n = B.shape[1]
+
+        segments = []
+        try:
+            shm_a = self.segment(A, segments)
+            shm_b = self.segment(B, segments)
+            shm_c, C = to_shared(np.zeros((m, n)))
+            segments.append(shm_c)
+
+            tasks = [((shm_a.name, A.shape), (shm_b.name, B.shape), (shm_c.name, (m, n)), start, end, self.kernel)
+                     for start, end in row_blocks(m, self.workers, block_rows)]
+            self.pool.map(_multiply_block, tasks)
+            return C.copy()
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for operand in self.shared:
+            operand.shm.close()
+            operand.shm.unlink()
+        self.shared.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def multiply_parallel(A, B, workers=None, kernel: str = "numpy"):
+    """Einmalige parallele Multiplikation (Pool wird angelegt und wieder beendet)."""
+    with ParallelMultiplier(workers, kernel) as pm:
+        return pm.multiply(A, B)
+
+def scaling_benchmark(sizes, sparsity: float = 0.5, max_workers=None, repeats: int = 3, kernel: str = "numpy"):
+    """
+    Misst die Laufzeit von ParallelMultiplier.multiply für 1..max_workers Prozesse.
+    Pool und Operanden (share) werden vorab angelegt, gemessen wird nur die Multiplikation.
+    Rückgabe: {workers: [(l, Laufzeit), ...]}
+    """
+    max_workers = max_workers or os.cpu_count()
+    matrices = {l: generate_np(l, sparsity) for l in sizes}
+    results = {w: [] for w in range(1, max_workers + 1)}
+
+    for w in results:
+        with ParallelMultiplier(w, kernel) as pm:
+            for l, (A, B) in matrices.items():
+                A, B = pm.share(A), pm.share(B)
+                pm.multiply(A, B)  # Aufwärmen: Worker gestartet, NumPy geladen
+                results[w].append((l, measure(lambda: pm.multiply(A, B), repeats)))
+
+    for l_idx, l in enumerate(sizes):
+        base = results[1][l_idx][1]
+        print(f"l = {l}: " + ", ".join(
+            f"{w} Prozess(e) {results[w][l_idx][1]:.4f}s (Speedup {base / results[w][l_idx][1]:.2f})"
+            for w in results))
+    return results
+
+if __name__ == "__main__":
+    A, B = generate_np(200, 0.5)
+    C = multiply_parallel(A, B, workers=2)
+    print("Parallel korrekt:", np.allclose(C, A @ B))
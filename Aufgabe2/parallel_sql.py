@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+import psycopg
+from timing import measure
+import config
+
+def open_connections(k: int, parallel_workers=None):
+    """
+    Öffnet k Verbindungen für die parallele Ausführung (ein einfacher, fester Pool).
+    parallel_workers setzt max_parallel_workers_per_gather je Verbindung,
+    z.B. 0, damit sich K Verbindungen nicht zusätzlich Parallel-Worker teilen.
+    """
+    connections = []
+    for _ in range(k):
+        conn = psycopg.connect(dbname=config.DB_NAME, user=config.DB_USER)
+        conn.autocommit = True
+        if parallel_workers is not None:
+            conn.execute(f"SET max_parallel_workers_per_gather = {int(parallel_workers)};")
+        connections.append(conn)
+    return connections
+
+def close_connections(connections):
+    for conn in connections:
+        conn.close()
+
+def row_range(conn):
+    """Kleinster und größter Zeilenindex von A_sparse."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(i), MAX(i) FROM A_sparse;")
+        return cur.fetchone()
+
+def slices(lo: int, hi: int, k: int):
+    """Zerlegt die Zeilen lo..hi in k zusammenhängende, halboffene Bereiche [start, end)."""
+    step = -(-(hi - lo + 1) // k)
+    return [(start, min(start + step, hi + 1)) for start in range(lo, hi + 1, step)]
+
+def multiply_slice(conn, start: int, end: int):
+    """Ansatz 1 für die Zeilen start..end-1 von A: SQL-Join auf der sparse Darstellung."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT A_sparse.i, B_sparse.j, SUM(A_sparse.val * B_sparse.val)
+            FROM A_sparse
+            JOIN B_sparse ON A_sparse.j = B_sparse.i
+            WHERE A_sparse.i >= %s AND A_sparse.i < %s
+            GROUP BY A_sparse.i, B_sparse.j;
+        """, (start, end))
+        return cur.fetchall()
+
+def multiply_sql_sparse_parallel(connections):
+    """
+    Verteilt den Join von multiply_sql_sparse zeilenweise auf die Verbindungen:
+    jede Verbindung berechnet einen Bereich von Zeilen von C, die Anfragen laufen
+    in Threads gleichzeitig (psycopg gibt den GIL während der Anfrage frei).
+    Rückgabe: Liste von (i, j, value) wie multiply_sql_sparse.
+    """
+    lo, hi = row_range(connections[0])
+    if lo is None:
+        return []
+    parts = slices(lo, hi, len(connections))
+    with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+        futures = [executor.submit(multiply_slice, conn, start, end)
+                   for conn, (start, end) in zip(connections, parts)]
+        result = []
+        for future in futures:
+            result.extend(future.result())
+    return result
+
+def scaling_benchmark(ks, repeats: int = 3, parallel_workers=None):
+    """
+    Misst die Wandzeit von multiply_sql_sparse_parallel für K Verbindungen.
+    A_sparse/B_sparse müssen bereits befüllt sein. Die Verbindungen werden vorab geöffnet.
+    Rückgabe: [(K, Laufzeit), ...]
+    """
+    results = []
+    for k in ks:
+        connections = open_connections(k, parallel_workers)
+        try:
+            multiply_sql_sparse_parallel(connections)  # Aufwärmen (Cache, Katalog)
+            t = measure(lambda: multiply_sql_sparse_parallel(connections), repeats)
+        finally:
+            close_connections(connections)
+        results.append((k, t))
+        print(f"K = {k}: {results[-1][1]:.3f}s (Speedup {results[0][1] / results[-1][1]:.2f})")
+    return results
@@ -1,4 +1,6 @@
+import numpy as np
 import psycopg
+from generate import to_coo
 
 def connect_db(dbname: str, user: str):
     """
@@ -53,75 +55,250 @@ def create_tables_vector(conn, l: int):
         """)
     conn.commit()
 
-def create_dotproduct_function(conn):
+def create_tables_svector(conn):
     """
-    Definiert die UDF dotproduct(array, array) in PL/pgSQL,
-    die das Skalarprodukt zweier gleichlanger Arrays liefert.
+    Erstellt (oder ersetzt) die Tabellen A_svec und B_svec für die komprimierte
+    Vektor-Darstellung: je Zeile von A bzw. Spalte von B nur die Nicht-Null-Werte,
+    als parallele Arrays idx (aufsteigende Positionen, 0-basiert) und val (CSR-Zeilen).
     """
     with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS A_svec;")
+        cur.execute("DROP TABLE IF EXISTS B_svec;")
         cur.execute("""
-        CREATE OR REPLACE FUNCTION dotproduct(vec1 DOUBLE PRECISION[], vec2 DOUBLE PRECISION[])
+            CREATE TABLE A_svec (
+                i   INT PRIMARY KEY,
+                idx INT[],
+                val DOUBLE PRECISION[]
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE B_svec (
+                j   INT PRIMARY KEY,
+                idx INT[],
+                val DOUBLE PRECISION[]
+            );
+        """)
+    conn.commit()
+
+def create_sparse_dotproduct_function(conn):
+    """
+    Definiert die UDF sparse_dotproduct(idx1, val1, idx2, val2) in PL/pgSQL:
+    Skalarprodukt zweier komprimierter Vektoren per Merge über die sortierten Indexarrays.
+    Die Laufzeit hängt von nnz beider Vektoren ab, nicht von der Länge l.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+        CREATE OR REPLACE FUNCTION sparse_dotproduct(idx1 INT[], val1 DOUBLE PRECISION[],
+                                                     idx2 INT[], val2 DOUBLE PRECISION[])
           RETURNS DOUBLE PRECISION AS $$
+        DECLARE
+          i1  INT[] := idx1;
+          v1  DOUBLE PRECISION[] := val1;
+          i2  INT[] := idx2;
+          v2  DOUBLE PRECISION[] := val2;
+          n1  INT := COALESCE(array_length(idx1, 1), 0);
+          n2  INT := COALESCE(array_length(idx2, 1), 0);
+          p   INT := 1;
+          q   INT := 1;
+          s   DOUBLE PRECISION := 0;
         BEGIN
-          RETURN (
-            SELECT SUM(x * y)
-            FROM unnest(vec1, vec2) AS t(x, y)
-          );
+          WHILE p <= n1 AND q <= n2 LOOP
+            IF i1[p] = i2[q] THEN
+              s := s + v1[p] * v2[q];
+              p := p + 1;
+              q := q + 1;
+            ELSIF i1[p] < i2[q] THEN
+              p := p + 1;
+            ELSE
+              q := q + 1;
+            END IF;
+          END LOOP;
+          RETURN s;
         END;
-        $$ LANGUAGE plpgsql IMMUTABLE;
+        $$ LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE;
+        """)
+    conn.commit()
+
+# Verfügbare Implementierungen der UDF dotproduct (siehe create_dotproduct_function)
+DOTPRODUCT_VARIANTS = ["plpgsql", "sql", "sparse", "plpython"]
+
+def create_dotproduct_function(conn, variant: str = "plpgsql", name: str = "dotproduct"):
+    """
+    Definiert die UDF name(array, array), die das Skalarprodukt zweier gleichlanger Arrays liefert.
+    variant:
+     - 'plpgsql':  SUM über unnest(vec1, vec2) in PL/pgSQL (ursprüngliche Variante)
+     - 'sql':      derselbe Ausdruck als SQL-Funktion, ohne PL/pgSQL-Interpreter
+                   (wegen des FROM unnest nicht in die Anfrage inlinebar)
+     - 'sparse':   unnest(vec1) WITH ORDINALITY, Produkte und Zugriffe auf vec2 nur an den
+                   Nicht-Null-Positionen von vec1 (vec1 wird dabei einmal gelesen)
+     - 'plpython': NumPy in PL/Python, erfordert die Erweiterung plpython3u
+    """
+    with conn.cursor() as cur:
+        if variant == "plpgsql":
+            cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}(vec1 DOUBLE PRECISION[], vec2 DOUBLE PRECISION[])
+              RETURNS DOUBLE PRECISION AS $$
+            BEGIN
+              RETURN (
+                SELECT SUM(x * y)
+                FROM unnest(vec1, vec2) AS t(x, y)
+              );
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE;
+            """)
+        elif variant == "sql":
+            cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}(vec1 DOUBLE PRECISION[], vec2 DOUBLE PRECISION[])
+              RETURNS DOUBLE PRECISION AS $$
+                SELECT SUM(x * y)
+                FROM unnest(vec1, vec2) AS t(x, y);
+            $$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+            """)
+        elif variant == "sparse":
+            cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}(vec1 DOUBLE PRECISION[], vec2 DOUBLE PRECISION[])
+              RETURNS DOUBLE PRECISION AS $$
+                SELECT COALESCE(SUM(x * vec2[k::INT]), 0)
+                FROM unnest(vec1) WITH ORDINALITY AS t(x, k)
+                WHERE x <> 0;
+            $$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+            """)
+        elif variant == "plpython":
+            cur.execute("CREATE EXTENSION IF NOT EXISTS plpython3u;")
+            cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}(vec1 DOUBLE PRECISION[], vec2 DOUBLE PRECISION[])
+              RETURNS DOUBLE PRECISION AS $$
+                import numpy as np
+                return float(np.dot(np.asarray(vec1, dtype=np.float64), np.asarray(vec2, dtype=np.float64)))
+            $$ LANGUAGE plpython3u IMMUTABLE STRICT PARALLEL SAFE;
+            """)
+        else:
+            raise ValueError(f"Unbekannte dotproduct-Variante: {variant}")
+    conn.commit()
+
+def create_tables_tiled(conn):
+    """
+    Erstellt (oder ersetzt) die Tabellen A_tile und B_tile für die Block-Darstellung:
+    ein Tupel pro Kachel (bi, bj) mit den b×b Werten zeilenweise als Array.
+    Kacheln, die nur Nullen enthalten, werden nicht gespeichert.
+    """
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS A_tile;")
+        cur.execute("DROP TABLE IF EXISTS B_tile;")
+        cur.execute("""
+            CREATE TABLE A_tile (
+                bi   INT,
+                bj   INT,
+                tile DOUBLE PRECISION[],
+                PRIMARY KEY (bi, bj)
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE B_tile (
+                bi   INT,
+                bj   INT,
+                tile DOUBLE PRECISION[],
+                PRIMARY KEY (bi, bj)
+            );
+        """)
+    conn.commit()
+
+def create_tile_functions(conn, language: str = "plpgsql"):
+    """
+    Definiert die UDF tile_multiply(a, b, bs), die zwei b×b-Kacheln multipliziert,
+    und das Aggregat tile_sum(array), das Kachelprodukte elementweise aufsummiert.
+    language: 'plpgsql' (ohne Erweiterungen, überspringt Nullen in a) oder
+              'plpython3u' (NumPy in PL/Python, erfordert die Erweiterung plpython3u).
+    """
+    with conn.cursor() as cur:
+        if language == "plpython3u":
+            cur.execute("CREATE EXTENSION IF NOT EXISTS plpython3u;")
+            cur.execute("""
+            CREATE OR REPLACE FUNCTION tile_multiply(a DOUBLE PRECISION[], b DOUBLE PRECISION[], bs INT)
+              RETURNS DOUBLE PRECISION[] AS $$
+                import numpy as np
+                A = np.asarray(a, dtype=np.float64).reshape(bs, bs)
+                B = np.asarray(b, dtype=np.float64).reshape(bs, bs)
+                return (A @ B).ravel().tolist()
+            $$ LANGUAGE plpython3u IMMUTABLE STRICT PARALLEL SAFE;
+            """)
+        else:
+            cur.execute("""
+            CREATE OR REPLACE FUNCTION tile_multiply(a DOUBLE PRECISION[], b DOUBLE PRECISION[], bs INT)
+              RETURNS DOUBLE PRECISION[] AS $$
+            DECLARE
+              -- Zuweisung an lokale Variablen: Arrays liegen danach entpackt im Speicher
+              av  DOUBLE PRECISION[] := a;
+              bv  DOUBLE PRECISION[] := b;
+              c   DOUBLE PRECISION[] := array_fill(0::DOUBLE PRECISION, ARRAY[bs * bs]);
+              aik DOUBLE PRECISION;
+            BEGIN
+              FOR i IN 0..bs - 1 LOOP
+                FOR k IN 0..bs - 1 LOOP
+                  aik := av[i * bs + k + 1];
+                  IF aik <> 0 THEN
+                    FOR j IN 0..bs - 1 LOOP
+                      c[i * bs + j + 1] := c[i * bs + j + 1] + aik * bv[k * bs + j + 1];
+                    END LOOP;
+                  END IF;
+                END LOOP;
+              END LOOP;
+              RETURN c;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE;
+            """)
+        cur.execute("""
+        CREATE OR REPLACE FUNCTION tile_add(x DOUBLE PRECISION[], y DOUBLE PRECISION[])
+          RETURNS DOUBLE PRECISION[] AS $$
+            SELECT array_agg(a + b ORDER BY n)
+            FROM unnest(x, y) WITH ORDINALITY AS t(a, b, n);
+        $$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+        """)
+        cur.execute("DROP AGGREGATE IF EXISTS tile_sum(DOUBLE PRECISION[]);")
+        cur.execute("""
+        CREATE AGGREGATE tile_sum(DOUBLE PRECISION[]) (
+          SFUNC = tile_add,
+          STYPE = DOUBLE PRECISION[]
+        );
         """)
     conn.commit()
 
-def insert_sparse(conn, A: list, B: list):
+def insert_sparse(conn, A, B):
     """
     Fügt alle Nicht-Null-Werte aus den Matrizen A und B in A_sparse/B_sparse ein.
-    A: m×l, B: l×n
+    A: m×l, B: l×n (2D-Listen oder NumPy-Arrays)
     """
     with conn.cursor() as cur:
-        # A_sparse
-        rows = [
-            (i, j, float(val))
-            for i, row in enumerate(A)
-            for j, val in enumerate(row)
-            if val != 0
-        ]
+        # A_sparse: Nicht-Null-Werte vektorisiert über np.nonzero bestimmen
+        rows = list(zip(*(x.tolist() for x in to_coo(A))))
         cur.executemany(
             "INSERT INTO A_sparse (i, j, val) VALUES (%s, %s, %s);",
             rows
         )
         # B_sparse
-        rows = [
-            (i, j, float(val))
-            for i, row in enumerate(B)
-            for j, val in enumerate(row)
-            if val != 0
-        ]
+        rows = list(zip(*(x.tolist() for x in to_coo(B))))
         cur.executemany(
             "INSERT INTO B_sparse (i, j, val) VALUES (%s, %s, %s);",
             rows
         )
     conn.commit()
 
-def insert_vector(conn, A: list, B: list):
+def insert_vector(conn, A, B):
     """
     Fügt die ganzen Zeilen von A und Spalten von B als Arrays ein.
     A: m×l  ⇒  A_vec(i, row=array der Länge l)
     B: l×n  ⇒  B_vec(j, col=array der Länge l)
+    A und B dürfen 2D-Listen oder NumPy-Arrays sein.
     """
     with conn.cursor() as cur:
         # A_vec
-        rows = [(i, row) for i, row in enumerate(A)]
+        rows = list(enumerate(np.asarray(A, dtype=np.float64).tolist()))
         cur.executemany(
             "INSERT INTO A_vec (i, row) VALUES (%s, %s);",
             rows
         )
-        # B_vec: für jede Spalte j in B (j < n) das Array [B[0][j], B[1][j], ..., B[l-1][j]]
-        l = len(B)
-        n = len(B[0]) if B else 0
-        rows = []
-        for j in range(n):
-            col = [B[i][j] for i in range(l)]
-            rows.append((j, col))
+        # B_vec: für jede Spalte j in B das Array [B[0][j], B[1][j], ..., B[l-1][j]] (Zeilen von B^T)
+        rows = list(enumerate(np.asarray(B, dtype=np.float64).T.tolist()))
         cur.executemany(
             "INSERT INTO B_vec (j, col) VALUES (%s, %s);",
             rows
@@ -0,0 +1,164 @@
+import csv
+import os
+import time
+import numpy as np
+from multiply import multiply_naive
+from dense_multiply import multiply_blocked, multiply_strassen
+from sparse_multiply import multiply_sparse, multiply_auto, shape_and_nnz, DENSE_COST_FACTOR
+from phase2_setup import (
+    create_tables_sparse,
+    create_tables_vector,
+    create_tables_svector,
+    create_dotproduct_function,
+    create_sparse_dotproduct_function,
+)
+from loader import load_sparse, load_vector, load_svector
+from db_multiply import (
+    multiply_sql_sparse,
+    multiply_sql_vector,
+    multiply_sql_svector,
+    CALIBRATION_PATH,
+    CALIBRATION_FIELDS,
+)
+
+def auto_features(m, l, n, nnz_a, nnz_b):
+    """Merkmale von multiply_auto: je nach Pfad (wie use_dense) BLAS- oder CSR-Aufwand."""
+    sparse_flops = nnz_a * nnz_b / l
+    if sparse_flops * DENSE_COST_FACTOR >= m * l * n:
+        return (m * l * n, 0.0, 0.0)
+    return (0.0, sparse_flops, m)
+
+# Kostenmerkmale je Ansatz aus Dimensionen und Nicht-Null-Werten; die Laufzeit wird
+# als t = a + b1 * Merkmal1 + b2 * Merkmal2 ... angenähert (a: fester Aufwand)
+FEATURES = {
+    'python': lambda m, l, n, nnz_a, nnz_b: (m * l * n,),
+    'sparse': lambda m, l, n, nnz_a, nnz_b: (nnz_a * nnz_b / l,),
+    'vector': lambda m, l, n, nnz_a, nnz_b: (m * n * l,),
+    'svector': lambda m, l, n, nnz_a, nnz_b: (m * n * (nnz_a / m + nnz_b / n),),
+    'csr': lambda m, l, n, nnz_a, nnz_b: (nnz_a * nnz_b / l, m),
+    'auto': lambda m, l, n, nnz_a, nnz_b: auto_features(m, l, n, nnz_a, nnz_b),
+    'blocked': lambda m, l, n, nnz_a, nnz_b: (m * l * n,),
+    # Strassen: O(N^log2(7)) mit N = (m * l * n)^(1/3)
+    'strassen': lambda m, l, n, nnz_a, nnz_b: ((m * l * n) ** (np.log2(7) / 3),),
+    # Laden der Tabellen für die SQL-Ansätze (in benchmark.py als load_<Ansatz> gemessen)
+    'load_sparse': lambda m, l, n, nnz_a, nnz_b: (nnz_a + nnz_b,),
+    'load_vector': lambda m, l, n, nnz_a, nnz_b: (m * l + l * n,),
+    'load_svector': lambda m, l, n, nnz_a, nnz_b: (m + n, nnz_a + nnz_b),
+}
+
+# Ansätze, die eine Datenbankverbindung benötigen und vorher ihre Tabellen laden
+SQL_APPROACHES = {'sparse', 'vector', 'svector'}
+
+def load_calibration(path=CALIBRATION_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [
+            {**row, **{k: float(row[k]) for k in CALIBRATION_FIELDS[1:]}}
+            for row in csv.DictReader(f)
+        ]
+
+def fit_models(rows):
+    """
+    Passt je Ansatz t = a + b * Merkmale per kleinster Quadrate an. Die Gleichungen werden
+    mit 1/t gewichtet, damit kleine Matrizen (relativer Fehler) nicht untergehen.
+    Negative Koeffizienten werden auf 0 gesetzt.
+    Rückgabe: {Ansatz: Koeffizienten (a, b1, b2, ...)}
+    """
+    models = {}
+    for approach, features in FEATURES.items():
+        points = [(features(r["m"], r["l"], r["n"], r["nnz_a"], r["nnz_b"]), r["seconds"])
+                  for r in rows if r["approach"] == approach and r["seconds"] > 0]
+        if len(points) < 2:
+            continue
+        x = np.array([p[0] for p in points], dtype=np.float64)
+        t = np.array([p[1] for p in points])
+        design = np.column_stack([np.ones(len(t)), x]) / t[:, None]
+        coef, *_ = np.linalg.lstsq(design, np.ones_like(t), rcond=None)
+        models[approach] = np.maximum(coef, 0.0)
+    return models
+
+def predict(models, A, B):
+    """
+    Vorhergesagte Laufzeit je kalibriertem Ansatz für A * B;
+    bei SQL-Ansätzen einschließlich des Ladens der Tabellen.
+    """
+    (m, l), nnz_a = shape_and_nnz(A)
+    (_, n), nnz_b = shape_and_nnz(B)
+    estimates = {approach: float(coef @ np.array((1.0,) + tuple(FEATURES[approach](m, l, n, nnz_a, nnz_b))))
+                 for approach, coef in models.items()}
+    predictions = {}
+    for approach, t in estimates.items():
+        if approach.startswith("load_"):
+            continue
+        if approach in SQL_APPROACHES:
+            if f"load_{approach}" not in estimates:
+                continue
+            t += estimates[f"load_{approach}"]
+        predictions[approach] = t
+    return predictions
+
+def triples_to_dense(result, shape):
+    C = np.zeros(shape)
+    for i, j, val in result:
+        C[i, j] = val
+    return C
+
+def run_engine(approach, A, B, conn=None):
+    """Führt A * B mit dem gewählten Ansatz aus. Rückgabe: NumPy-Array m x n."""
+    shape = (A.shape[0], B.shape[1])
+    if approach == 'python':
+        return np.array(multiply_naive(A.tolist(), B.tolist()), dtype=np.float64).reshape(shape)
+    if approach == 'csr':
+        return multiply_sparse(A, B).toarray()
+    if approach == 'auto':
+        return multiply_auto(A, B)
+    if approach == 'blocked':
+        return multiply_blocked(A, B)
+    if approach == 'strassen':
+        return multiply_strassen(A, B)
+    if approach == 'sparse':
+        create_tables_sparse(conn)
+        load_sparse(conn, A, B)
+        return triples_to_dense(multiply_sql_sparse(conn), shape)
+    if approach == 'vector':
+        create_tables_vector(conn, A.shape[1])
+        load_vector(conn, A, B)
+        create_dotproduct_function(conn)
+        return triples_to_dense(multiply_sql_vector(conn), shape)
+    if approach == 'svector':
+        create_tables_svector(conn)
+        load_svector(conn, A, B)
+        create_sparse_dotproduct_function(conn)
+        return triples_to_dense(multiply_sql_svector(conn), shape)
+    raise ValueError(f"Unbekannter Ansatz: {approach}")
+
+# Angepasste Modelle je Kalibrierungsdatei und deren Änderungszeit
+_models = {}
+
+def multiply(A, B, conn=None, calibration=CALIBRATION_PATH):
+    """
+    Einstiegspunkt: schätzt die Laufzeit aller kalibrierten Ansätze aus Dimension und
+    Dichte von A und B, führt den günstigsten aus und gibt Wahl, Vorhersage und
+    tatsächliche Laufzeit aus. SQL-Ansätze kommen nur mit Verbindung conn in Frage.
+    Ohne Kalibrierungsdatei wird multiply_auto verwendet.
+    Rückgabe: NumPy-Array C = A * B.
+    """
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    # Mit der Änderungszeit im Schlüssel wird eine neu geschriebene Kalibrierung neu eingelesen
+    key = (calibration, os.path.getmtime(calibration) if os.path.exists(calibration) else None)
+    if key not in _models:
+        _models[key] = fit_models(load_calibration(calibration))
+    predictions = {approach: t for approach, t in predict(_models[key], A, B).items()
+                   if conn is not None or approach not in SQL_APPROACHES}
+
+    approach = min(predictions, key=predictions.get) if predictions else 'auto'
+    start = time.perf_counter()
+    C = run_engine(approach, A, B, conn)
+    actual = time.perf_counter() - start
+
+    predicted = f"{predictions[approach]:.4f}s" if approach in predictions else "keine Kalibrierung"
+    print(f"multiply {A.shape} x {B.shape}: Ansatz {approach} "
+          f"(vorhergesagt {predicted}, tatsächlich {actual:.4f}s)")
+    return C
@@ -0,0 +1,186 @@
+import numpy as np
+
+# Kostenfaktor eines Sparse-Produkts (Gather + Python-Schleife pro Zeile) gegenüber
+# einer Multiply-Add-Operation in BLAS; bestimmt, ab wann multiply_auto dicht rechnet.
+DENSE_COST_FACTOR = 20
+
+class CSRMatrix:
+    """
+    Matrix im CSR-Format (Compressed Sparse Row):
+    - indptr:  Länge m+1, Zeile i belegt indices/data[indptr[i]:indptr[i+1]]
+    - indices: Spaltenindizes der Nicht-Null-Werte (je Zeile aufsteigend)
+    - data:    Nicht-Null-Werte
+    Die CSC-Darstellung von A entspricht der CSR-Darstellung von A^T (siehe to_csc).
+    """
+
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.float64)
+        self.shape = (int(shape[0]), int(shape[1]))
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @property
+    def density(self):
+        m, n = self.shape
+        return self.nnz / (m * n) if m and n else 0.0
+
+    def row_ids(self):
+        """Zeilenindex zu jedem gespeicherten Wert (COO-Zeilen)."""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def toarray(self):
+        """Dichte NumPy-Matrix."""
+        C = np.zeros(self.shape)
+        C[self.row_ids(), self.indices] = self.data
+        return C
+
+    def transpose(self):
+        """Transponierte Matrix, ebenfalls als CSR."""
+        return csr_from_triples(self.indices, self.row_ids(), self.data, (self.shape[1], self.shape[0]))
+
+    def __repr__(self):
+        return f"CSRMatrix(shape={self.shape}, nnz={self.nnz})"
+
+def csr_from_triples(rows, cols, vals, shape):
+    """
+    Erzeugt eine CSR-Matrix aus COO-Tripeln (i, j, val), z.B. aus A_sparse/B_sparse.
+    Doppelte (i, j) werden aufsummiert.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    vals = np.asarray(vals, dtype=np.float64)
+    m, n = shape
+    # Nach (i, j) sortieren und Duplikate zusammenfassen
+    keys = rows * n + cols
+    order = np.argsort(keys, kind="stable")
+    keys, vals = keys[order], vals[order]
+    uniq, start = np.unique(keys, return_index=True)
+    vals = np.add.reduceat(vals, start) if len(vals) else vals
+    rows, cols = uniq // n, uniq % n
+    indptr = np.zeros(m + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=m), out=indptr[1:])
+    return CSRMatrix(indptr, cols, vals, shape)
+
+def csr_from_dense(A):
+    """Erzeugt eine CSR-Matrix aus einer 2D-Liste (List of Lists) oder einem NumPy-Array."""
+    A = np.asarray(A, dtype=np.float64)
+    rows, cols = np.nonzero(A)
+    indptr = np.zeros(A.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=A.shape[0]), out=indptr[1:])
+    return CSRMatrix(indptr, cols, A[rows, cols], A.shape)
+
+def csr_from_table(conn, table_name: str, shape):
+    """Liest eine Tabelle (i, j, val) wie A_sparse/B_sparse als CSR-Matrix ein."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT i, j, val FROM {table_name};")
+        rows = cur.fetchall()
+    if not rows:
+        return CSRMatrix(np.zeros(shape[0] + 1), [], [], shape)
+    i, j, val = zip(*rows)
+    return csr_from_triples(i, j, val, shape)
+
+def to_csc(A):
+    """
+    CSC-Darstellung von A: (indptr, indices, data) spaltenweise,
+    d.h. indptr hat Länge n+1 und indices enthält Zeilenindizes.
+    """
+    if not isinstance(A, CSRMatrix):
+        A = csr_from_dense(A)
+    T = A.transpose()
+    return T.indptr, T.indices, T.data
+
+def spgemm_row(A: CSRMatrix, B: CSRMatrix, i: int, b_lengths=None):
+    """
+    Zeile i von C = A * B (Gustavson): Rückgabe (Spaltenindizes, Werte) der Nicht-Null-Einträge.
+    b_lengths (np.diff(B.indptr)) kann bei wiederholten Aufrufen vorab berechnet übergeben werden.
+    """
+    if b_lengths is None:
+        b_lengths = np.diff(B.indptr)
+    a_start, a_end = A.indptr[i], A.indptr[i + 1]
+    ks = A.indices[a_start:a_end]
+    lengths = b_lengths[ks]
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    # Positionen aller Einträge der Zeilen B[k, :] für k in ks (ohne Python-Schleife über k)
+    offsets = np.repeat(B.indptr[ks] - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    cols = B.indices[offsets]
+    vals = B.data[offsets] * np.repeat(A.data[a_start:a_end], lengths)
+    # Akkumulation gleicher Spalten
+    uniq, inverse = np.unique(cols, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=vals)
+
+def spgemm(A: CSRMatrix, B: CSRMatrix):
+    """
+    Sparse Matrixmultiplikation C = A * B nach Gustavson (zeilenweise):
+    Zeile i von C ist die mit A[i, k] gewichtete Summe der Zeilen k von B.
+    Es werden nur Produkte von Nicht-Null-Werten gebildet.
+    Rückgabe: CSRMatrix C der Dimension m x n.
+    """
+    m, l = A.shape
+    assert B.shape[0] == l, "DimensionMismatch: Die Spaltenzahl von A entspricht nicht der Zeilenzahl von B."
+    n = B.shape[1]
+
+    indptr = np.zeros(m + 1, dtype=np.int64)
+    out_cols, out_vals = [], []
+    b_lengths = np.diff(B.indptr)
+
+    for i in range(m):
+        uniq, sums = spgemm_row(A, B, i, b_lengths)
+        if len(uniq) == 0:
+            indptr[i + 1] = indptr[i]
+            continue
+        out_cols.append(uniq)
+        out_vals.append(sums)
+        indptr[i + 1] = indptr[i] + len(uniq)
+
+    indices = np.concatenate(out_cols) if out_cols else np.zeros(0, dtype=np.int64)
+    data = np.concatenate(out_vals) if out_vals else np.zeros(0)
+    return CSRMatrix(indptr, indices, data, (m, n))
+
+def multiply_dense(A, B):
+    """Dichte Multiplikation über NumPy/BLAS. Rückgabe: NumPy-Array m x n."""
+    return np.asarray(A, dtype=np.float64) @ np.asarray(B, dtype=np.float64)
+
+def shape_and_nnz(M):
+    """Dimension und Anzahl Nicht-Null-Werte einer CSR-Matrix, 2D-Liste oder eines Arrays."""
+    if isinstance(M, CSRMatrix):
+        return M.shape, M.nnz
+    M = np.asarray(M)
+    return M.shape, int(np.count_nonzero(M))
+
+def use_dense(A, B):
+    """
+    Schätzt, ob der dichte BLAS-Pfad günstiger ist: Das Sparse-Produkt benötigt etwa
+    nnz(A) * nnz(B) / l Multiplikationen, das dichte m * l * n.
+    """
+    (m, l), nnz_a = shape_and_nnz(A)
+    (_, n), nnz_b = shape_and_nnz(B)
+    sparse_flops = nnz_a * nnz_b / l if l else 0
+    return sparse_flops * DENSE_COST_FACTOR >= m * l * n
+
+def as_csr(M):
+    return M if isinstance(M, CSRMatrix) else csr_from_dense(M)
+
+def as_dense(M):
+    return M.toarray() if isinstance(M, CSRMatrix) else np.asarray(M, dtype=np.float64)
+
+def multiply_sparse(A, B):
+    """
+    Wandelt A und B (2D-Listen oder NumPy-Arrays) in CSR um und multipliziert per SpGEMM.
+    Rückgabe: CSRMatrix C.
+    """
+    return spgemm(as_csr(A), as_csr(B))
+
+def multiply_auto(A, B):
+    """
+    Wählt abhängig von der Dichte der Operanden zwischen SpGEMM und BLAS.
+    Rückgabe: NumPy-Array m x n.
+    """
+    if use_dense(A, B):
+        return multiply_dense(as_dense(A), as_dense(B))
+    return spgemm(as_csr(A), as_csr(B)).toarray()
@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from generate import generate_sparse_coo
+from sparse_multiply import CSRMatrix, csr_from_triples
+from phase2_setup import connect_db, create_tables_sparse
+from loader import copy_triples
+import config
+
+def spmv_csr(A: CSRMatrix, x, row_ids=None):
+    """
+    Sparse Matrix-Vektor-Produkt y = A * x auf CSR-Arrays (vektorisiert, ohne Python-Schleife).
+    row_ids (A.row_ids()) kann bei wiederholten Aufrufen vorab berechnet übergeben werden.
+    """
+    if row_ids is None:
+        row_ids = A.row_ids()
+    return np.bincount(row_ids, weights=A.data * np.asarray(x, dtype=np.float64)[A.indices],
+                       minlength=A.shape[0])
+
+def create_vector_table(conn, table_name: str = "x_vec", temporary: bool = True):
+    """Erstellt (oder ersetzt) eine Tabelle (i, val) für einen Vektor, standardmäßig als TEMP-Tabelle."""
+    kind = "TEMP TABLE" if temporary else "TABLE"
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {table_name};")
+        cur.execute(f"""
+            CREATE {kind} {table_name} (
+                i   INT PRIMARY KEY,
+                val DOUBLE PRECISION
+            );
+        """)
+    conn.commit()
+
+def load_vector_values(conn, x, table_name: str = "x_vec"):
+    """Lädt die Nicht-Null-Werte von x als (i, val) per COPY."""
+    x = np.asarray(x, dtype=np.float64)
+    idx = np.nonzero(x)[0]
+    with conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {table_name};")
+        with cur.copy(f"COPY {table_name} (i, val) FROM STDIN") as copy:
+            for i, val in zip(idx.tolist(), x[idx].tolist()):
+                copy.write_row((i, val))
+    conn.commit()
+
+def read_vector(conn, n: int, table_name: str = "x_vec"):
+    """Liest eine Vektortabelle (i, val) als dichtes NumPy-Array der Länge n."""
+    x = np.zeros(n)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT i, val FROM {table_name};")
+        rows = cur.fetchall()
+    if rows:
+        idx, vals = zip(*rows)
+        x[list(idx)] = vals
+    return x
+
+def spmv_sql(conn, matrix_table: str = "A_sparse", vector_table: str = "x_vec"):
+    """
+    SpMV in der Datenbank: Join der sparse Matrix (i, j, val) mit dem Vektor (i, val)
+    über A.j = x.i. Rückgabe: Liste von (i, Wert) für alle Zeilen mit Nicht-Null-Ergebnis.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT A.i, SUM(A.val * x.val)
+            FROM {matrix_table} A
+            JOIN {vector_table} x ON A.j = x.i
+            GROUP BY A.i;
+        """, prepare=True)
+        return cur.fetchall()
+
+def power_iteration_csr(A: CSRMatrix, iterations: int = 50, x0=None):
+    """
+    Potenzmethode x <- A x / ||A x|| im Prozess (z.B. PageRank-artige Iteration).
+    Rückgabe: (x, Schätzung des betragsgrößten Eigenwerts ||A x||).
+    """
+    n = A.shape[1]
+    x = np.full(n, 1.0 / np.sqrt(n)) if x0 is None else np.asarray(x0, dtype=np.float64)
+    row_ids = A.row_ids()
+    norm = 0.0
+    for _ in range(iterations):
+        y = spmv_csr(A, x, row_ids)
+        norm = np.linalg.norm(y)
+        if norm == 0:
+            break
+        x = y / norm
+    return x, norm
+
+def power_iteration_sql(conn, n: int, iterations: int = 50, matrix_table: str = "A_sparse"):
+    """
+    Potenzmethode vollständig in der Datenbank: Der Vektor liegt in der TEMP-Tabelle x_vec,
+    das Produkt in y_vec. Pro Iteration werden dieselben zwei vorbereiteten Anweisungen
+    (prepare=True) ausgeführt, nur die Norm wird zum Client übertragen.
+    Rückgabe: (x als NumPy-Array, Schätzung des betragsgrößten Eigenwerts).
+    """
+    create_vector_table(conn, "x_vec")
+    create_vector_table(conn, "y_vec")
+    load_vector_values(conn, np.full(n, 1.0 / np.sqrt(n)), "x_vec")
+
+    norm = 0.0
+    with conn.cursor() as cur:
+        for _ in range(iterations):
+            # y = A x, gleichzeitig ||y|| berechnen
+            cur.execute("TRUNCATE y_vec;")
+            cur.execute(f"""
+                WITH y AS (
+                    INSERT INTO y_vec (i, val)
+                    SELECT A.i, SUM(A.val * x.val)
+                    FROM {matrix_table} A
+                    JOIN x_vec x ON A.j = x.i
+                    GROUP BY A.i
+                    RETURNING val
+                )
+                SELECT COALESCE(sqrt(SUM(val * val)), 0) FROM y;
+            """, prepare=True)
+            norm = cur.fetchone()[0]
+            if norm == 0:
+                break
+            # x = y / ||y||
+            cur.execute("TRUNCATE x_vec;")
+            cur.execute("INSERT INTO x_vec (i, val) SELECT i, val / %s FROM y_vec;", (norm,), prepare=True)
+        conn.commit()
+    return read_vector(conn, n, "x_vec"), norm
+
+def spmv_benchmark(conn, sizes, sparsity: float = 0.999, iterations: int = 20, seed=None):
+    """
+    Misst Iterationen pro Sekunde der Potenzmethode für CSR im Prozess und in SQL
+    auf quadratischen Matrizen l x l (als COO erzeugt, ohne dichte Zwischenmatrix).
+    Rückgabe: {'csr': [(l, it/s), ...], 'sql': [(l, it/s), ...]}
+    """
+    results = {"csr": [], "sql": []}
+    for l in sizes:
+        rows, cols, vals = generate_sparse_coo(l, l, sparsity, seed)
+        A = csr_from_triples(rows, cols, vals, (l, l))
+        create_tables_sparse(conn)
+        copy_triples(conn, "A_sparse", rows, cols, vals)
+
+        start = time.perf_counter()
+        x_csr, lam_csr = power_iteration_csr(A, iterations)
+        results["csr"].append((l, iterations / (time.perf_counter() - start)))
+
+        start = time.perf_counter()
+        x_sql, lam_sql = power_iteration_sql(conn, l, iterations)
+        results["sql"].append((l, iterations / (time.perf_counter() - start)))
+
+        print(f"l = {l} (nnz = {A.nnz}): CSR {results['csr'][-1][1]:.1f} it/s, "
+              f"SQL {results['sql'][-1][1]:.1f} it/s, Eigenwert {lam_csr:.4f} / {lam_sql:.4f}, "
+              f"übereinstimmend: {np.allclose(x_csr, x_sql)}")
+    return results
+
+if __name__ == "__main__":
+    conn = connect_db(dbname=config.DB_NAME, user=config.DB_USER)
+    spmv_benchmark(conn, [1000, 10000, 100000], sparsity=0.999)
+    conn.close()
@@ -0,0 +1,20 @@
+import time
+
+# Gemeinsamer Messhelfer der Benchmarks: Wandzeit per time.perf_counter, gemittelt über Wiederholungen
+
+def timed(func, repeats: int = 3):
+    """
+    Führt func() repeats-mal aus.
+    Rückgabe: (Ergebnis des letzten Aufrufs, mittlere Laufzeit in Sekunden)
+    """
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, sum(times) / repeats
+
+def measure(func, repeats: int = 3):
+    """Mittlere Laufzeit von func() über repeats Wiederholungen."""
+    return timed(func, repeats)[1]
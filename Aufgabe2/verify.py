@@ -0,0 +1,102 @@
+import numpy as np
+from sparse_multiply import CSRMatrix, csr_from_triples
+
+# Standard-Toleranzen für den Vergleich von A(Br) und Cr (Gleitkomma-Summen in anderer Reihenfolge)
+RTOL = 1e-9
+ATOL = 1e-9
+
+def as_operator(M):
+    """
+    Liefert eine Funktion x -> M x für dichte Matrizen (2D-Liste/NumPy), CSR-Matrizen
+    oder Ergebnislisten von (i, j, val)-Tupeln, jeweils in O(nnz) bzw. O(m * n) bei dichten.
+    """
+    if isinstance(M, CSRMatrix):
+        row_ids = M.row_ids()
+        return lambda x: np.bincount(row_ids, weights=M.data * x[M.indices], minlength=M.shape[0])
+    if isinstance(M, list) and not M:
+        # Leere Ergebnisliste: C = 0
+        return lambda x: np.zeros(0)
+    if isinstance(M, list) and isinstance(M[0], tuple) and len(M[0]) == 3:
+        i, j, val = (np.array(col) for col in zip(*M))
+        i, j, val = i.astype(np.int64), j.astype(np.int64), val.astype(np.float64)
+        return lambda x: np.bincount(i, weights=val * x[j], minlength=int(i.max()) + 1 if len(i) else 0)
+    M = np.asarray(M, dtype=np.float64)
+    return lambda x: M @ x
+
+def close(u, v, rtol=RTOL, atol=ATOL):
+    """Vergleicht zwei Vektoren elementweise; kürzere werden mit Nullen aufgefüllt (leere Endzeilen)."""
+    n = max(len(u), len(v))
+    u = np.pad(u, (0, n - len(u)))
+    v = np.pad(v, (0, n - len(v)))
+    return bool(np.all(np.abs(u - v) <= atol + rtol * np.maximum(np.abs(u), np.abs(v))))
+
+def freivalds(A, B, C, trials: int = 3, rtol=RTOL, atol=ATOL, seed=None):
+    """
+    Randomisierte Prüfung nach Freivalds, ob C = A * B: Für zufällige Vektoren r wird
+    A (B r) mit C r verglichen. Das kostet O(nnz(A) + nnz(B) + nnz(C)) pro Versuch statt
+    einer Multiplikation; ein falsches C wird mit hoher Wahrscheinlichkeit erkannt.
+    A, B, C: dichte Matrizen, CSRMatrix oder (für C) Liste von (i, j, val) wie von den SQL-Ansätzen.
+    n ist die Spaltenzahl von B.
+    """
+    rng = np.random.default_rng(seed)
+    apply_a, apply_b, apply_c = as_operator(A), as_operator(B), as_operator(C)
+    n = B.shape[1] if isinstance(B, CSRMatrix) else np.asarray(B).shape[1]
+    for _ in range(trials):
+        r = rng.uniform(-1.0, 1.0, size=n)
+        if not close(apply_a(apply_b(r)), apply_c(r), rtol, atol):
+            return False
+    return True
+
+def freivalds_sql(conn, a_table="A_sparse", b_table="B_sparse", c_table="C_sparse",
+                  trials: int = 3, rtol=RTOL, atol=ATOL):
+    """
+    Freivalds-Prüfung vollständig in der Datenbank über Tabellen (i, j, val): r liegt in
+    einer TEMP-Tabelle (nur für die in B oder C vorkommenden Spalten), B r, A (B r) und C r
+    werden per Join und GROUP BY gebildet. Übertragen wird nur die Anzahl der Abweichungen.
+    """
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS freivalds_r;")
+        cur.execute("CREATE TEMP TABLE freivalds_r (i INT PRIMARY KEY, val DOUBLE PRECISION);")
+        for _ in range(trials):
+            cur.execute("TRUNCATE freivalds_r;")
+            cur.execute(f"""
+                INSERT INTO freivalds_r (i, val)
+                SELECT j, random() * 2 - 1
+                FROM (SELECT j FROM {b_table} UNION SELECT j FROM {c_table}) s;
+            """)
+            cur.execute(f"""
+                WITH br AS (
+                    SELECT B.i, SUM(B.val * r.val) AS v
+                    FROM {b_table} B JOIN freivalds_r r ON B.j = r.i
+                    GROUP BY B.i
+                ), abr AS (
+                    SELECT A.i, SUM(A.val * br.v) AS v
+                    FROM {a_table} A JOIN br ON A.j = br.i
+                    GROUP BY A.i
+                ), cr AS (
+                    SELECT C.i, SUM(C.val * r.val) AS v
+                    FROM {c_table} C JOIN freivalds_r r ON C.j = r.i
+                    GROUP BY C.i
+                )
+                SELECT COUNT(*)
+                FROM abr FULL JOIN cr ON abr.i = cr.i
+                WHERE ABS(COALESCE(abr.v, 0) - COALESCE(cr.v, 0))
+                      > %s + %s * GREATEST(ABS(COALESCE(abr.v, 0)), ABS(COALESCE(cr.v, 0)));
+            """, (atol, rtol))
+            if cur.fetchone()[0] > 0:
+                conn.commit()
+                return False
+    conn.commit()
+    return True
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    A = rng.random((50, 40))
+    B = rng.random((40, 30))
+    C = A @ B
+    print("Korrektes C:", freivalds(A, B, C))
+    C[3, 7] += 1e-3
+    print("Gestörtes C:", freivalds(A, B, C))
+    rows, cols = np.nonzero(A @ B)
+    print("CSR/Tripel:", freivalds(csr_from_triples(*np.nonzero(A), A[np.nonzero(A)], A.shape), B,
+                                   list(zip(rows.tolist(), cols.tolist(), (A @ B)[rows, cols].tolist()))))
@@ -0,0 +1,122 @@
+import os
+import random
+import sys
+import psycopg
+from lxml import etree
+import xpath
+import xpath_accelerator as xa
+
+# Gemeinsamer Messhelfer der Benchmarks (Aufgabe2/timing.py), ans Ende des Suchpfads,
+# damit gleichnamige Module aus Projekt3 Vorrang behalten
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Aufgabe2"))
+from timing import timed
+
+# =====================================
+# KONFIGURATION
+# =====================================
+# DBLP-Auszug aus xpath_accelerator.py, sonst das Toy-Beispiel
+XML_PATH = xa.MY_SMALL_BIB_PATH if os.path.exists(xa.MY_SMALL_BIB_PATH) else "toy_example.xml"
+SAMPLE_SIZE = 50
+REPEATS = 3
+
+# =====================================
+# BEIDE KODIERUNGEN LADEN
+# =====================================
+def build_edge_tree(xml_path):
+    # Gleicher Elementbaum wie in accel: Node-IDs werden in Präordnung vergeben,
+    # der Text eines Elements wird als content gespeichert
+    xpath.Node._id_counter = 0
+    parser = etree.XMLParser(load_dtd=True, recover=True, huge_tree=True, remove_comments=True, remove_pis=True)
+    root = etree.parse(xml_path, parser).getroot()
+
+    def convert(elem):
+        text = elem.text.strip() if elem.text and elem.text.strip() else None
+        node = xpath.Node(elem.tag, text)
+        for child in elem:
+            node.add_child(convert(child))
+        return node
+
+    return convert(root)
+
+def load_both(conn, xml_path):
+    # Kantenmodell (node/edge) und pre/post-Kodierung (accel) aus derselben Datei
+    xpath.setup_db(conn)
+    xpath.import_to_db(build_edge_tree(xml_path), conn)
+    xa.load_accel(conn, xml_path)
+    with conn.cursor() as cur:
+        # Node-ID k entspricht dem k-ten Element in Dokumentreihenfolge
+        cur.execute("SELECT pre FROM accel WHERE kind = %s ORDER BY pre", (xa.ELEMENT,))
+        element_pres = [row[0] for row in cur.fetchall()]
+        # setup_db legt edge ohne Index an; ohne diese Indizes würden die rekursiven CTEs
+        # in jeder Iteration edge sequentiell lesen und der Vergleich mit accel unfair
+        cur.execute("CREATE INDEX IF NOT EXISTS edge_from ON edge (from_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS edge_to ON edge (to_id)")
+        cur.execute("ANALYZE node")
+        cur.execute("ANALYZE edge")
+    conn.commit()
+    return element_pres
+
+# =====================================
+# MESSUNG
+# =====================================
+def benchmark_axes(conn, xml_path=XML_PATH, sample_size=SAMPLE_SIZE, seed=0):
+    """
+    Vergleicht die Achsen auf accel (Fenster über pre/post) mit den rekursiven CTEs
+    bzw. Joins auf node/edge aus xpath.py für eine Stichprobe von Elementknoten.
+    Verglichen wird die Anzahl der Elemente im Ergebnis.
+    Rückgabe: {Achse: (Zeit Kantenmodell, Zeit accel)} als Mittel je Kontextknoten
+    """
+    element_pres = load_both(conn, xml_path)
+    rng = random.Random(seed)
+    sample = [0] + rng.sample(range(1, len(element_pres)), min(sample_size, len(element_pres) - 1))
+
+    comparisons = {
+        "ancestor": (lambda n: xpath.get_ancestors(conn, n),
+                     lambda n: xa.get_ancestors(conn, element_pres[n], xa.ELEMENT)),
+        "descendant": (lambda n: xpath.get_descendants(conn, n),
+                       lambda n: xa.get_descendants(conn, element_pres[n], xa.ELEMENT)),
+        "following-sibling": (lambda n: xpath.get_siblings(conn, n, "following"),
+                              lambda n: xa.get_siblings(conn, element_pres[n], "following", xa.ELEMENT)),
+        "preceding-sibling": (lambda n: xpath.get_siblings(conn, n, "preceding"),
+                              lambda n: xa.get_siblings(conn, element_pres[n], "preceding", xa.ELEMENT)),
+    }
+    # Nur auf accel vorhanden
+    accel_only = {
+        "child": lambda n: xa.get_children(conn, element_pres[n], xa.ELEMENT),
+        "parent": lambda n: xa.get_parent(conn, element_pres[n]),
+        "following": lambda n: xa.get_following(conn, element_pres[n], xa.ELEMENT),
+        "preceding": lambda n: xa.get_preceding(conn, element_pres[n], xa.ELEMENT),
+    }
+
+    print(f"\n🔎 {len(element_pres)} Elemente, {len(sample)} Kontextknoten, {REPEATS} Wiederholungen")
+    results = {}
+    for name, (edge_func, accel_func) in comparisons.items():
+        t_edge = t_accel = 0.0
+        mismatches = 0
+        for n in sample:
+            edge_rows, t = timed(lambda: edge_func(n), REPEATS)
+            t_edge += t
+            accel_rows, t = timed(lambda: accel_func(n), REPEATS)
+            t_accel += t
+            mismatches += len(edge_rows) != len(accel_rows)
+        results[name] = (t_edge / len(sample), t_accel / len(sample))
+        print(f"{name}: Kantenmodell {results[name][0] * 1000:.2f} ms, accel {results[name][1] * 1000:.2f} ms, "
+              f"Speedup {results[name][0] / results[name][1]:.1f}, abweichende Ergebnisse: {mismatches}")
+
+    for name, accel_func in accel_only.items():
+        t_accel = sum(timed(lambda: accel_func(n), REPEATS)[1] for n in sample)
+        results[name] = (None, t_accel / len(sample))
+        print(f"{name}: accel {results[name][1] * 1000:.2f} ms")
+    return results
+
+def main():
+    with psycopg.connect(
+        dbname=xa.DB_NAME,
+        user=xa.DB_USER,
+        password=xa.DB_PASS,
+        host=xa.DB_HOST,
+        port=xa.DB_PORT) as conn:
+        benchmark_axes(conn)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import os
+import tempfile
+import time
 from lxml import etree
 from collections import defaultdict
 import psycopg
@@ -61,14 +63,16 @@ def build_my_small_bib_xml(venues):
     tree = etree.ElementTree(root)
     tree.write(MY_SMALL_BIB_PATH, pretty_print=True, xml_declaration=True, encoding='utf-8')
 
-def create_accel_schema(conn):
+def create_accel_schema(conn, constraints=True):
+    # constraints=False: Tabellen ohne Schlüssel anlegen (für das Laden per COPY),
+    # die Schlüssel werden danach mit add_accel_constraints ergänzt
     with conn.cursor() as cur:
         cur.execute("DROP TABLE IF EXISTS attribute")
         cur.execute("DROP TABLE IF EXISTS content")
         cur.execute("DROP TABLE IF EXISTS accel")
         cur.execute("""
             CREATE TABLE accel (
-                pre INTEGER PRIMARY KEY,
+                pre INTEGER,
                 post INTEGER,
                 parent INTEGER,
                 kind TEXT,
@@ -77,17 +81,238 @@ def create_accel_schema(conn):
         """)
         cur.execute("""
             CREATE TABLE content (
-                pre INTEGER PRIMARY KEY REFERENCES accel(pre),
+                pre INTEGER,
                 text TEXT
             )
         """)
         cur.execute("""
             CREATE TABLE attribute (
-                pre INTEGER PRIMARY KEY REFERENCES accel(pre),
+                pre INTEGER,
                 text TEXT
             )
         """)
     conn.commit()
+    if constraints:
+        add_accel_constraints(conn)
+
+def add_accel_constraints(conn):
+    with conn.cursor() as cur:
+        cur.execute("ALTER TABLE accel ADD PRIMARY KEY (pre)")
+        cur.execute("ALTER TABLE content ADD PRIMARY KEY (pre)")
+        cur.execute("ALTER TABLE content ADD FOREIGN KEY (pre) REFERENCES accel(pre)")
+        cur.execute("ALTER TABLE attribute ADD PRIMARY KEY (pre)")
+        cur.execute("ALTER TABLE attribute ADD FOREIGN KEY (pre) REFERENCES accel(pre)")
+    conn.commit()
+    create_accel_indexes(conn)
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE accel")
+        cur.execute("ANALYZE content")
+        cur.execute("ANALYZE attribute")
+    conn.commit()
+
+def create_accel_indexes(conn):
+    # (pre, post) und (post, pre) für die Fenster der Achsen, parent für child/sibling,
+    # pre - post (= Tiefe - Anzahl Nachfahren) für die maximale Tiefe des Dokuments
+    with conn.cursor() as cur:
+        cur.execute("CREATE INDEX IF NOT EXISTS accel_pre_post ON accel (pre, post)")
+        cur.execute("CREATE INDEX IF NOT EXISTS accel_post_pre ON accel (post, pre)")
+        cur.execute("CREATE INDEX IF NOT EXISTS accel_parent ON accel (parent, pre)")
+        cur.execute("CREATE INDEX IF NOT EXISTS accel_level ON accel ((pre - post))")
+    conn.commit()
+
+# =====================================
+# XPATH ACCELERATOR LADEN
+# =====================================
+# Knotenarten in accel.kind
+ELEMENT = "element"
+ATTRIBUTE = "attribute"
+TEXT = "text"
+
+# NULL im Textformat von COPY und Anzahl Zeilen je Schreibvorgang
+NULL = "\\N"
+COPY_BATCH = 10000
+
+def copy_escape(value):
+    # Textformat von COPY: Backslash, Tab, Zeilenumbrüche maskieren
+    return (value.replace("\\", "\\\\").replace("\t", "\\t")
+                 .replace("\n", "\\n").replace("\r", "\\r"))
+
+class AccelEncoder:
+    """
+    Vergibt in einem Durchlauf pre- und post-Rang sowie parent (pre des Elternknotens)
+    für Element-, Attribut- und Textknoten. Offene Elemente liegen auf einem expliziten Stack.
+    Knoten werden über emit(pre, post, parent, kind, name) weitergegeben, Texte und
+    Attributwerte über emit_text(table, pre, text).
+    """
+
+    def __init__(self, emit, emit_text):
+        self.emit = emit
+        self.emit_text = emit_text
+        self.pre = 0
+        self.post = 0
+        # Einträge: [pre, Element, letztes Kindelement, pre des Elternknotens]
+        self.stack = []
+
+    def leaf(self, parent, kind, name, table, text):
+        # Attribut- und Textknoten haben keine Kinder: pre und post sofort vergeben
+        pre = self.pre
+        self.pre += 1
+        self.emit(pre, self.post, parent, kind, name)
+        self.post += 1
+        self.emit_text(table, pre, text)
+
+    def text(self, parent, text):
+        # Nur Whitespace (Einrückung) wird nicht als Textknoten gespeichert
+        if text and text.strip():
+            self.leaf(parent, TEXT, None, "content", text.strip())
+
+    def pending_text(self, entry):
+        # Text vor dem nächsten Kind bzw. dem Ende von entry: text des Elements oder tail des letzten Kindes
+        pre, elem, last, _ = entry
+        self.text(pre, elem.text if last is None else last.tail)
+
+    def start(self, elem):
+        parent = None
+        if self.stack:
+            top = self.stack[-1]
+            self.pending_text(top)
+            top[2] = elem
+            parent = top[0]
+        pre = self.pre
+        self.pre += 1
+        self.stack.append([pre, elem, None, parent])
+        for name, value in elem.attrib.items():
+            self.leaf(pre, ATTRIBUTE, name, "attribute", value)
+
+    def end(self, elem):
+        entry = self.stack.pop()
+        self.pending_text(entry)
+        self.emit(entry[0], self.post, entry[3], ELEMENT, elem.tag)
+        self.post += 1
+        # Bereits verarbeitete Knoten freigeben (tail wird noch beim nächsten Geschwister gebraucht)
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+def load_accel(conn, xml_path=MY_SMALL_BIB_PATH, load_dtd=True):
+    """
+    Lädt xml_path in einem Durchlauf (etree.iterparse mit start/end-Ereignissen) in die
+    Tabellen accel, content und attribute. accel wird direkt per COPY gestreamt, Texte und
+    Attributwerte werden in temporären Dateien gesammelt und danach per COPY geladen.
+    Schlüssel werden erst nach dem Laden angelegt.
+    Rückgabe: Anzahl der Knoten
+    """
+    create_accel_schema(conn, constraints=False)
+    start_time = time.perf_counter()
+    spool = {name: tempfile.TemporaryFile("w+", encoding="utf-8") for name in ("content", "attribute")}
+    try:
+        with conn.cursor() as cur:
+            with cur.copy("COPY accel (pre, post, parent, kind, name) FROM STDIN") as copy:
+                # Zeilen im Textformat sammeln und blockweise senden statt write_row je Knoten
+                buffer = []
+
+                def emit(pre, post, parent, kind, name):
+                    buffer.append(f"{pre}\t{post}\t{NULL if parent is None else parent}\t{kind}\t"
+                                  f"{NULL if name is None else copy_escape(name)}\n")
+                    if len(buffer) >= COPY_BATCH:
+                        copy.write("".join(buffer))
+                        buffer.clear()
+
+                def emit_text(table, pre, text):
+                    spool[table].write(f"{pre}\t{copy_escape(text)}\n")
+
+                encoder = AccelEncoder(emit, emit_text)
+                for event, elem in etree.iterparse(xml_path, events=("start", "end"), load_dtd=load_dtd,
+                                                   huge_tree=True, encoding="utf-8"):
+                    if not isinstance(elem.tag, str):
+                        continue
+                    if event == "start":
+                        encoder.start(elem)
+                    else:
+                        encoder.end(elem)
+                copy.write("".join(buffer))
+
+            for table, f in spool.items():
+                f.seek(0)
+                with cur.copy(f"COPY {table} (pre, text) FROM STDIN") as copy:
+                    while data := f.read(1 << 20):
+                        copy.write(data)
+        conn.commit()
+    finally:
+        for f in spool.values():
+            f.close()
+    add_accel_constraints(conn)
+    print(f"✅ {encoder.pre} Knoten in {time.perf_counter() - start_time:.1f}s geladen.")
+    return encoder.pre
+
+# =====================================
+# XPATH-ACHSEN AUF PRE/POST
+# =====================================
+# Jede Achse ist ein Fenster in der pre/post-Ebene relativ zum Kontextknoten v:
+#   ancestor:   pre < v.pre und post > v.post
+#   descendant: pre > v.pre und post < v.post
+#   following:  pre > v.pre und post > v.post
+#   preceding:  pre < v.pre und post < v.post
+# Für descendant gilt zusätzlich pre <= v.post + Höhe (pre - post = Tiefe - Anzahl Nachfahren,
+# die Höhe ist also max(pre - post)), damit der Bereichsscan auf (pre, post) nach oben begrenzt ist.
+# child, parent und die Geschwister laufen über parent bzw. den Primärschlüssel.
+# Attributknoten liegen nur auf der attribute-Achse (wie in XPath).
+AXES = {
+    "ancestor": "n.pre < v.pre AND n.post > v.post",
+    "descendant": "n.pre > v.pre AND n.post < v.post "
+                  "AND n.pre <= v.post + (SELECT MAX(pre - post) FROM accel)",
+    "following": "n.pre > v.pre AND n.post > v.post",
+    "preceding": "n.pre < v.pre AND n.post < v.post",
+    "child": "n.parent = v.pre",
+    "parent": "n.pre = v.parent",
+    "following-sibling": "n.parent = v.parent AND n.pre > v.pre",
+    "preceding-sibling": "n.parent = v.parent AND n.pre < v.pre",
+    "attribute": "n.parent = v.pre",
+}
+
+def axis(conn, name, pre, kind=None):
+    """
+    Knoten der Achse name vom Kontextknoten pre aus, in Dokumentreihenfolge.
+    kind schränkt optional auf eine Knotenart ein (z.B. ELEMENT).
+    Rückgabe: Liste von (pre, post, parent, kind, name)
+    """
+    if name == "attribute":
+        kind_filter, params = "n.kind = %s", [ATTRIBUTE]
+    else:
+        kind_filter, params = "n.kind <> %s", [ATTRIBUTE]
+    if kind is not None:
+        kind_filter += " AND n.kind = %s"
+        params.append(kind)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT n.pre, n.post, n.parent, n.kind, n.name
+            FROM accel v
+            JOIN accel n ON {AXES[name]}
+            WHERE v.pre = %s AND {kind_filter}
+            ORDER BY n.pre
+        """, [pre] + params)
+        return cur.fetchall()
+
+def get_ancestors(conn, pre, kind=None):
+    return axis(conn, "ancestor", pre, kind)
+
+def get_descendants(conn, pre, kind=None):
+    return axis(conn, "descendant", pre, kind)
+
+def get_following(conn, pre, kind=None):
+    return axis(conn, "following", pre, kind)
+
+def get_preceding(conn, pre, kind=None):
+    return axis(conn, "preceding", pre, kind)
+
+def get_children(conn, pre, kind=None):
+    return axis(conn, "child", pre, kind)
+
+def get_parent(conn, pre):
+    return axis(conn, "parent", pre)
+
+def get_siblings(conn, pre, direction="following", kind=None):
+    return axis(conn, f"{direction}-sibling", pre, kind)
 
 # Run all steps
 def main():
@@ -107,7 +332,10 @@ def main():
         host=DB_HOST,
         port=DB_PORT) as conn:
         create_accel_schema(conn)
-    print("✅ Database schema ready.")
+        print("✅ Database schema ready.")
+
+        print("🌲 Loading accel encoding...")
+        load_accel(conn, MY_SMALL_BIB_PATH)
 
 if __name__ == "__main__":
     main()